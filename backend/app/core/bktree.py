@@ -0,0 +1,77 @@
+# backend/app/core/bktree.py
+
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.utils import hamming_distance
+
+class _Node:
+    __slots__ = ("value", "items", "children")
+
+    def __init__(self, value: int):
+        self.value = value
+        self.items: Set[str] = set()
+        self.children: Dict[int, "_Node"] = {}
+
+class BKTree:
+    """
+    Árvore BK sobre a distância de Hamming, usada para encontrar hashes
+    perceptuais próximos sem comparar com todos os documentos.
+    Cada nó guarda os IDs das análises que partilham exatamente o mesmo hash.
+    """
+
+    def __init__(self):
+        self.root: Optional[_Node] = None
+        self._values: Dict[str, int] = {}
+
+    def add(self, value: int, item_id: str):
+        self.remove(item_id)
+        self._values[item_id] = value
+        if self.root is None:
+            self.root = _Node(value)
+            self.root.items.add(item_id)
+            return
+
+        node = self.root
+        while True:
+            distance = hamming_distance(value, node.value)
+            if distance == 0:
+                node.items.add(item_id)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                child = _Node(value)
+                child.items.add(item_id)
+                node.children[distance] = child
+                return
+            node = child
+
+    def remove(self, item_id: str):
+        """Remove o ID; o nó fica na árvore para continuar a servir de caminho."""
+        value = self._values.pop(item_id, None)
+        node = self.root if value is not None else None
+        while node is not None:
+            distance = hamming_distance(value, node.value)
+            if distance == 0:
+                node.items.discard(item_id)
+                return
+            node = node.children.get(distance)
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """Devolve (distância, id) de todos os itens a no máximo `max_distance`, do mais próximo ao mais distante."""
+        results: List[Tuple[int, str]] = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node.value)
+            if distance <= max_distance:
+                results.extend((distance, item_id) for item_id in node.items)
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in node.children.items() if low <= d <= high)
+        results.sort()
+        return results
+
+    def clear(self):
+        self.root = None
+        self._values.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
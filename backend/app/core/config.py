@@ -17,6 +17,26 @@ class Settings(BaseSettings):
     # MongoDB Configuration
     MONGODB_URI: str = "mongodb://localhost:27017/artell"
     MONGODB_DB_NAME: str = "artell"
+
+    # Armazenamento das análises: "mongodb" ou "sqlite" (ficheiro local, para um só servidor;
+    # sem jobs assíncronos nem migrações, que continuam a exigir o MongoDB)
+    STORAGE_BACKEND: str = "mongodb"
+    SQLITE_PATH: str = "data/artell.db"
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = 5.0
+    # As leituras no event loop desistem logo e passam para uma thread (ver SQLiteAnalysisStore)
+    SQLITE_READ_BUSY_TIMEOUT_SECONDS: float = 0.05
+
+    # Cache em memória das respostas (à frente do MongoDB). Com vários processos
+    # (WEB_CONCURRENCY > 1) fica desligado: uma remoção num processo não o invalidaria nos outros
+    ANALYSIS_CACHE_MAX_SIZE: int = 1024
+    ANALYSIS_CACHE_TTL_SECONDS: float = 300.0
+
+    # Com vários processos, cada um lê periodicamente as análises criadas pelos outros
+    # para os seus índices em memória (pesquisa e hashes perceptuais)
+    MEMORY_INDEX_SYNC_INTERVAL_SECONDS: float = 5.0
+
+    # Estatísticas: intervalo de escrita dos contadores de pedidos acumulados em memória
+    STATS_FLUSH_INTERVAL_SECONDS: float = 10.0
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -32,6 +52,40 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE: int = 10 * 1024 * 1024
     ALLOWED_IMAGE_TYPES: List[str] = ["image/jpeg", "image/png", "image/webp"]
+
+    # Pré-processamento das imagens antes das chamadas de visão
+    IMAGE_MAX_EDGE: int = 1280
+    IMAGE_OUTPUT_FORMAT: str = "JPEG"
+    IMAGE_OUTPUT_QUALITY: int = 85
+    IMAGE_PROCESS_WORKERS: int = 2
+
+    # Validação dos URLs de imagem das análises (verificados em paralelo, com cache)
+    IMAGE_URL_PROBE_TIMEOUT: float = 5.0
+    IMAGE_URL_MAX_CONNECTIONS: int = 20
+    IMAGE_URL_CACHE_MAX_SIZE: int = 4096
+    IMAGE_URL_CACHE_TTL_SECONDS: float = 6 * 3600
+    IMAGE_URL_NEGATIVE_CACHE_TTL_SECONDS: float = 600.0
+
+    # Pipeline de visão: "sequential" (identifica e só depois analisa) ou
+    # "concurrent" (identifica e analisa em paralelo; gasta mais tokens, responde mais cedo)
+    VISION_PIPELINE_MODE: str = "sequential"
+
+    # Análise em lote por nome (POST /analise-por-nome/batch)
+    BATCH_MAX_NAMES: int = 50
+    BATCH_CONCURRENCY: int = 4
+
+    # Cache por semelhança visual (hash perceptual)
+    PHASH_ENABLED: bool = True
+    PHASH_MAX_DISTANCE: int = 6
+
+    # Análises assíncronas (jobs): trabalhadores por tipo de modelo (texto / visão)
+    JOB_TEXT_CONCURRENCY: int = 4
+    JOB_VISION_CONCURRENCY: int = 2
+    JOB_LEASE_SECONDS: float = 120.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_MAX_WAIT_SECONDS: float = 60.0
+    JOB_RETENTION_SECONDS: int = 24 * 3600
     
     # Groq Model Configuration
     GROQ_TEXT_MODEL: str = "meta-llama/llama-4-scout-17b-16e-instruct"
@@ -39,8 +93,64 @@ class Settings(BaseSettings):
     GROQ_MAX_TOKENS: int = 2048
     GROQ_TEMPERATURE: float = 0.7
 
+    # Groq HTTP Client (pool partilhado, aberto no arranque da aplicação)
+    GROQ_BASE_URL: str = "https://api.groq.com/openai/v1"
+    GROQ_HTTP2: bool = True
+    GROQ_MAX_CONNECTIONS: int = 20
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    GROQ_KEEPALIVE_EXPIRY: float = 30.0
+    GROQ_CONNECT_TIMEOUT: float = 5.0
+    GROQ_READ_TIMEOUT: float = 90.0
+    GROQ_WRITE_TIMEOUT: float = 30.0
+    GROQ_POOL_TIMEOUT: float = 10.0
+
+    # Limitação de pedidos à Groq (valores iniciais; ajustados pelos cabeçalhos x-ratelimit-*)
+    GROQ_RATE_LIMIT_REQUESTS_PER_MINUTE: float = 30.0
+    GROQ_RATE_LIMIT_TOKENS_PER_MINUTE: float = 30000.0
+    GROQ_RATE_LIMIT_MAX_WAIT_SECONDS: float = 30.0
+    GROQ_MAX_RETRIES: int = 3
+    GROQ_BACKOFF_BASE_SECONDS: float = 0.5
+    GROQ_BACKOFF_MAX_SECONDS: float = 20.0
+
+    # Métricas Prometheus (GET /metrics)
+    METRICS_ENABLED: bool = True
+
+    # Perfis por amostragem dos pedidos /analise-* (flame graphs em formato "folded").
+    # Ativados pelo cabeçalho X-Artell-Profile: <ADMIN_TOKEN> ou para uma fração do tráfego.
+    ADMIN_TOKEN: Optional[str] = None
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_INTERVAL_SECONDS: float = 0.005
+    PROFILER_DIR: str = "profiles"
+    PROFILER_KEEP_SLOWEST: int = 20
+
+    # Servidor de produção (gunicorn -c gunicorn.conf.py): número de processos (um por CPU
+    # se não for indicado), reciclagem ao fim de N pedidos e tempo para terminar os pedidos
+    # e as análises em curso antes de encerrar um processo
+    WEB_CONCURRENCY: Optional[int] = None
+    WORKER_MAX_REQUESTS: int = 5000
+    WORKER_MAX_REQUESTS_JITTER: int = 500
+    SHUTDOWN_DRAIN_SECONDS: float = 30.0
+    # Tempo entre o sinal de saída (a prontidão passa logo a 503) e o fecho do socket,
+    # para o balanceador ver o 503 e deixar de enviar pedidos antes de as ligações falharem
+    SHUTDOWN_READINESS_DELAY_SECONDS: float = 0.0
+
+    # Sondas de saúde (GET /health/ready): cada verificação da base de dados e da Groq é
+    # reutilizada durante HEALTH_PROBE_TTL_SECONDS. Por omissão, uma falha da Groq não
+    # retira o processo do balanceador (as análises em cache continuam a ser servidas)
+    HEALTH_PROBE_TTL_SECONDS: float = 10.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_READY_REQUIRES_GROQ: bool = False
+
     class Config:
         env_file = ".env"
         case_sensitive = True
 
 settings = Settings()
+
+def worker_processes() -> int:
+    """
+    Número de processos do servidor que partilham os limites e os dados. Lido do ambiente
+    em cada chamada: o gunicorn.conf.py só define WEB_CONCURRENCY (no on_starting) depois
+    de as settings já terem sido carregadas no processo principal e herdadas pelos processos.
+    """
+    return int(os.environ.get("WEB_CONCURRENCY") or settings.WEB_CONCURRENCY or 1)
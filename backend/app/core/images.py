@@ -0,0 +1,65 @@
+# backend/app/core/images.py
+"""
+Normalização de imagens antes de serem enviadas aos modelos de visão.
+Estas funções correm num pool de processos, por isso não dependem das
+configurações da aplicação: todos os parâmetros são passados explicitamente.
+"""
+
+import io
+from typing import NamedTuple
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.core.utils import perceptual_hash_from_image
+
+MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+class InvalidImageError(ValueError):
+    """A imagem enviada não pode ser descodificada."""
+
+class PreparedImage(NamedTuple):
+    data: bytes
+    mime_type: str
+    perceptual_hash: str
+    width: int
+    height: int
+
+def prepare_image(image_data: bytes, max_edge: int, output_format: str, quality: int) -> PreparedImage:
+    """
+    Descodifica a imagem, aplica a orientação EXIF, reduz o lado maior para
+    `max_edge` e volta a codificá-la em JPEG ou WebP compacto.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        source_format = image.format
+        source_size = image.size
+        # Em JPEG, o descodificador pode reduzir a imagem durante a leitura (muito mais rápido)
+        image.draft("RGB", (max_edge, max_edge))
+        image.load()
+        # Dados EXIF corrompidos só falham aqui, na leitura da orientação
+        transposed = ImageOps.exif_transpose(image)
+        perceptual_hash = perceptual_hash_from_image(transposed)
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(f"Imagem inválida: {e}")
+
+    changed = transposed is not image or transposed.size != source_size
+    image = transposed
+
+    if max(image.size) > max_edge:
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        changed = True
+
+    if output_format == "JPEG" and image.mode not in ("RGB", "L"):
+        # JPEG não suporta transparência: compõe sobre fundo branco
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=output_format, quality=quality, optimize=True)
+    encoded = buffer.getvalue()
+
+    # Se a imagem original já era compacta e não precisou de ajustes, mantém-se
+    if not changed and source_format in MIME_TYPES and len(image_data) <= len(encoded):
+        return PreparedImage(image_data, MIME_TYPES[source_format], perceptual_hash, *image.size)
+
+    return PreparedImage(encoded, MIME_TYPES[output_format], perceptual_hash, *image.size)
@@ -0,0 +1,119 @@
+# backend/app/core/metrics.py
+"""
+Métricas Prometheus da aplicação, expostas em GET /metrics.
+Cada observação custa alguns microssegundos, por isso ficam sempre ligadas.
+
+Com vários processos (gunicorn.conf.py), cada um escreve as suas métricas em
+PROMETHEUS_MULTIPROC_DIR e o GET /metrics de qualquer processo soma-as todas.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+# Etapas do pipeline: hash_cache_lookup, name_cache_lookup, perceptual_lookup, image_prepare,
+# groq_identify, groq_analyze, groq_limiter_wait, url_probe, mongo_save
+STAGE_SECONDS = Histogram(
+    "artell_stage_duration_seconds",
+    "Duração de cada etapa do pipeline de análise",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 90),
+)
+
+# result: memory_hit (cache em memória), db_hit (MongoDB) ou miss
+CACHE_LOOKUPS = Counter(
+    "artell_cache_lookups_total",
+    "Procuras de análises já existentes, por tipo de chave e resultado",
+    ["key_type", "result"],
+)
+
+GROQ_RESPONSES = Counter(
+    "artell_groq_responses_total",
+    "Respostas da API da Groq por modelo e código HTTP ('error' para falhas de ligação)",
+    ["model", "status"],
+)
+
+GROQ_TOKENS = Counter(
+    "artell_groq_tokens_total",
+    "Tokens gastos na Groq (campo usage das respostas)",
+    ["model", "kind"],
+)
+
+GROQ_IN_FLIGHT = Gauge(
+    "artell_groq_requests_in_flight",
+    "Pedidos à Groq em curso",
+    ["model"],
+    multiprocess_mode="livesum",
+)
+
+ANALYSES_IN_FLIGHT = Gauge(
+    "artell_analyses_in_flight",
+    "Pedidos à espera de uma análise nova, gerada pela Groq (por nome ou por imagem)",
+    ["kind"],
+    multiprocess_mode="livesum",
+)
+
+HTTP_IN_FLIGHT = Gauge(
+    "artell_http_requests_in_flight",
+    "Pedidos HTTP em curso",
+    multiprocess_mode="livesum",
+)
+
+def render_metrics() -> bytes:
+    """Métricas no formato de texto do Prometheus (de todos os processos, se forem vários)."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+# Etapas medidas no pedido atual (lidas pelo ServerTimingMiddleware). A lista é
+# partilhada com as tarefas criadas pelo pedido, que herdam o contexto.
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+def start_request_timings() -> List[Tuple[str, float]]:
+    timings: List[Tuple[str, float]] = []
+    _request_timings.set(timings)
+    return timings
+
+def observe_stage(name: str, seconds: float):
+    STAGE_SECONDS.labels(name).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mede a duração de uma etapa do pipeline."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - started)
+
+def record_cache_lookup(key_type: str, result: str):
+    CACHE_LOOKUPS.labels(key_type, result).inc()
+
+def record_groq_usage(model: str, usage: dict):
+    if usage:
+        GROQ_TOKENS.labels(model, "prompt").inc(usage.get("prompt_tokens") or 0)
+        GROQ_TOKENS.labels(model, "completion").inc(usage.get("completion_tokens") or 0)
+
+class InFlightMiddleware:
+    """Conta os pedidos HTTP em curso (middleware ASGI, sem custo por byte da resposta)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            HTTP_IN_FLIGHT.dec()
@@ -0,0 +1,249 @@
+# backend/app/core/profiling.py
+"""
+Diagnóstico de pedidos lentos nas rotas /analise-*:
+
+- cabeçalho Server-Timing com o tempo de cada etapa do pipeline (medido por
+  metrics.stage), visível no separador Network do navegador;
+- perfil por amostragem, a pedido (cabeçalho X-Artell-Profile com o ADMIN_TOKEN)
+  ou para uma fração do tráfego. Os perfis dos pedidos mais lentos são gravados
+  em PROFILER_DIR no formato "folded" (flamegraph.pl, speedscope, inferno).
+"""
+
+import asyncio
+import heapq
+import hmac
+import logging
+import os
+import random
+import re
+import time
+import weakref
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import start_request_timings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-artell-profile"
+
+def format_server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    """Agrega as etapas pelo nome (ex.: várias chamadas num lote) e junta o tempo total, em ms."""
+    durations: Dict[str, float] = {}
+    counts: Counter = Counter()
+    for name, seconds in timings:
+        durations[name] = durations.get(name, 0.0) + seconds
+        counts[name] += 1
+    entries = []
+    for name, seconds in durations.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if counts[name] > 1:
+            entry += f';desc="{counts[name]}x"'
+        entries.append(entry)
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+class RequestProfile:
+    """Amostras de um pedido: as pilhas de todas as tarefas criadas por ele, pesadas pelo tempo."""
+
+    def __init__(self, label: str, root: asyncio.Task):
+        self.label = label
+        self.root = root
+        # Tarefa -> tarefa que a criou (None se não foi uma tarefa do pedido)
+        self.parents: "weakref.WeakKeyDictionary[asyncio.Task, Optional[asyncio.Task]]" = weakref.WeakKeyDictionary(
+            {root: None}
+        )
+        self.stacks: Counter = Counter()
+        self.sampler: Optional[asyncio.Task] = None
+
+    def add_task(self, task: asyncio.Task, parent: Optional[asyncio.Task]):
+        self.parents[task] = parent if parent in self.parents else None
+
+    def _task_label(self, task: asyncio.Task) -> str:
+        # Calculado na amostragem: o nome da tarefa só é atribuído depois de ela ser criada
+        if task is self.root:
+            return self.label
+        parent = self.parents.get(task)
+        prefix = self._task_label(parent) if parent is not None else self.label
+        return f"{prefix};[{task.get_name()}]"
+
+    def sample(self, weight_us: int):
+        for task in list(self.parents.keys()):
+            if task.done():
+                continue
+            label = self._task_label(task)
+            frames = [
+                f"{frame.f_code.co_qualname} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})"
+                for frame in _suspended_frames(task.get_coro())
+            ]
+            if frames:
+                self.stacks[";".join([label, *frames])] += weight_us
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {weight}\n" for stack, weight in self.stacks.most_common())
+
+def _suspended_frames(coro) -> list:
+    """
+    Pilha de uma tarefa suspensa, seguindo a cadeia de awaits (o Task.get_stack
+    só devolve a corrotina de topo, porque os frames suspensos não têm f_back).
+    """
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+_active_profile: ContextVar[Optional[RequestProfile]] = ContextVar("active_profile", default=None)
+
+class RequestProfiler:
+    """
+    Perfilador por amostragem de tempo real (wall clock) para o event loop: a cada
+    intervalo regista onde está suspensa cada tarefa do pedido (a do próprio pedido
+    e as que ele criou, como os voos partilhados ou as verificações de URLs).
+    Mostra onde o pedido espera; o tempo de CPU que bloqueia o loop é contado no
+    ponto de espera seguinte. As tarefas correm em paralelo, pelo que a soma das
+    pilhas pode exceder a duração do pedido. Os pesos estão em microssegundos.
+    """
+
+    def __init__(self):
+        self.directory = Path(settings.PROFILER_DIR)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._previous_factory = None
+        # Heap (duração, ficheiro) com os perfis mais lentos guardados por este processo
+        self._kept: List[Tuple[float, str]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.ADMIN_TOKEN) or settings.PROFILER_SAMPLE_RATE > 0
+
+    def should_profile(self, scope: Scope) -> bool:
+        requested = Headers(scope=scope).get(PROFILE_HEADER)
+        # Comparados como bytes (o compare_digest recusa str com caracteres não ASCII): o
+        # Starlette descodifica os cabeçalhos em latin-1, que devolve os bytes recebidos
+        if requested and settings.ADMIN_TOKEN and hmac.compare_digest(
+            requested.encode("latin-1"), settings.ADMIN_TOKEN.encode()
+        ):
+            return True
+        return settings.PROFILER_SAMPLE_RATE > 0 and random.random() < settings.PROFILER_SAMPLE_RATE
+
+    def begin(self, scope: Scope) -> RequestProfile:
+        self._install(asyncio.get_running_loop())
+        profile = RequestProfile(f"{scope['method']} {scope['path']}", asyncio.current_task())
+        # O amostrador é criado antes de ativar o perfil, para não se amostrar a si próprio
+        profile.sampler = asyncio.create_task(self._sample(profile), name="request-profiler")
+        _active_profile.set(profile)
+        return profile
+
+    async def finish(self, profile: RequestProfile, duration: float):
+        _active_profile.set(None)
+        profile.sampler.cancel()
+        if not profile.stacks:
+            return
+        keep = settings.PROFILER_KEEP_SLOWEST
+        if len(self._kept) >= keep and duration <= self._kept[0][0]:
+            return
+        path = self.directory / self._file_name(profile, duration)
+        try:
+            await asyncio.to_thread(self._write, path, profile.folded())
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível gravar o perfil {path}: {e}")
+            return
+        heapq.heappush(self._kept, (duration, str(path)))
+        while len(self._kept) > keep:
+            _, evicted = heapq.heappop(self._kept)
+            await asyncio.to_thread(self._remove, evicted)
+        logger.info(f"🔥 Perfil de {profile.label} ({duration * 1000:.0f}ms) gravado em {path}")
+
+    def _install(self, loop: asyncio.AbstractEventLoop):
+        """Regista as tarefas criadas durante um pedido perfilado (instalado uma vez por loop)."""
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._previous_factory = loop.get_task_factory()
+        loop.set_task_factory(self._task_factory)
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        # Corre no contexto de quem cria a tarefa: o perfil ativo é o do pedido criador
+        profile = _active_profile.get()
+        if profile is not None:
+            profile.add_task(task, asyncio.current_task(loop))
+        return task
+
+    async def _sample(self, profile: RequestProfile):
+        interval = settings.PROFILER_INTERVAL_SECONDS
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            profile.sample(int((now - last) * 1_000_000))
+            last = now
+
+    def _file_name(self, profile: RequestProfile, duration: float) -> str:
+        route = re.sub(r"[^A-Za-z0-9]+", "-", profile.label).strip("-").lower()
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        return f"{int(duration * 1000):07d}ms-{route}-{stamp}-{os.getpid()}.folded"
+
+    def _write(self, path: Path, content: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class ServerTimingMiddleware:
+    """
+    Acrescenta o cabeçalho Server-Timing às respostas das rotas com `path_prefix`
+    e, quando pedido, perfila o pedido. Nas respostas em streaming (SSE), o
+    cabeçalho só inclui as etapas terminadas antes do primeiro evento.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/analise-"):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.profiler = get_request_profiler()
+        self.timing_allow_origin = ", ".join(settings.ALLOWED_ORIGINS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request_timings()
+        started = time.perf_counter()
+        profile = None
+        if self.profiler.enabled and self.profiler.should_profile(scope):
+            profile = self.profiler.begin(scope)
+
+        async def timed_send(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", format_server_timing(timings, time.perf_counter() - started))
+                # Sem este cabeçalho o navegador esconde os tempos ao frontend (outra origem)
+                headers.append("Timing-Allow-Origin", self.timing_allow_origin)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            if profile:
+                await self.profiler.finish(profile, time.perf_counter() - started)
+
+@lru_cache()
+def get_request_profiler() -> RequestProfiler:
+    return RequestProfiler()
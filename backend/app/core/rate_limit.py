@@ -0,0 +1,168 @@
+# backend/app/core/rate_limit.py
+
+import asyncio
+import random
+import re
+import time
+from typing import Dict, Mapping, Optional
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Converte durações como '7.66s', '2m59.56s' ou '120ms' (e números simples) em segundos."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Backoff exponencial com jitter total: um valor aleatório entre 0 e base * 2^attempt."""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+class RateLimitExceeded(Exception):
+    """A espera pelo limitador ultrapassaria o máximo permitido."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Limite de pedidos atingido, tente novamente dentro de {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Balde de tokens com capacidade e ritmo de reposição ajustáveis em tempo de execução."""
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_second)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Segundos até existirem `amount` tokens (o pedido nunca excede a capacidade)."""
+        self.refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        if self.per_second <= 0:
+            return float("inf")
+        return (amount - self.tokens) / self.per_second
+
+    def learn(self, limit: Optional[float], remaining: Optional[float], reset: Optional[float]):
+        """
+        Ajusta o balde ao estado anunciado pelo servidor: a capacidade é o limite, o
+        ritmo é o necessário para voltar ao limite no tempo de reset e os tokens locais
+        nunca ficam acima do que o servidor diz restar.
+        """
+        self.refill()
+        if limit and limit > 0:
+            self.capacity = limit
+        if remaining is not None:
+            self.tokens = min(self.tokens, remaining)
+            if limit and reset and reset > 0 and remaining < limit:
+                self.per_second = (limit - remaining) / reset
+
+class RateLimiter:
+    """
+    Limitador do lado do cliente para um par (chave de API, modelo), com um balde
+    de pedidos e outro de tokens. Os pedidos esperam pela sua vez por ordem de
+    chegada, para que um pico de tráfego se transforme em fila em vez de erros 429.
+
+    Os limites são os globais da chave; `share` é a fração que cabe a este processo
+    (1 / número de processos do servidor), aplicada também aos limites aprendidos.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, max_wait: float, share: float = 1.0):
+        self.share = share
+        requests_per_minute, tokens_per_minute = requests_per_minute * share, tokens_per_minute * share
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self.max_wait = max_wait
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_observed_wait = 0.0
+        self.throttled = 0
+
+    async def acquire(self, estimated_tokens: float) -> float:
+        """Reserva um pedido e `estimated_tokens` tokens; devolve o tempo esperado em segundos."""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    delay = max(
+                        self.blocked_until - time.monotonic(),
+                        self.requests.wait_time(1),
+                        self.tokens.wait_time(estimated_tokens),
+                    )
+                    if delay <= 0:
+                        break
+                    if time.monotonic() - started + delay > self.max_wait:
+                        raise RateLimitExceeded(delay)
+                    await asyncio.sleep(delay)
+                self.requests.tokens -= 1
+                self.tokens.tokens -= min(estimated_tokens, self.tokens.capacity)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_observed_wait = max(self.max_observed_wait, waited)
+        return waited
+
+    def refund(self, estimated_tokens: float, used_tokens: Optional[float]):
+        """Devolve ao balde a diferença entre os tokens reservados e os realmente gastos."""
+        if used_tokens is not None and used_tokens < estimated_tokens:
+            self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens + estimated_tokens - used_tokens)
+
+    def learn(self, headers: Mapping[str, str]):
+        """
+        Aprende os limites a partir dos cabeçalhos x-ratelimit-* da resposta. Os valores
+        são da chave inteira: este processo só fica com a sua parte.
+        """
+        def number(name: str) -> Optional[float]:
+            try:
+                return float(headers[name]) * self.share
+            except (KeyError, ValueError):
+                return None
+
+        self.requests.learn(
+            number("x-ratelimit-limit-requests"),
+            number("x-ratelimit-remaining-requests"),
+            parse_duration(headers.get("x-ratelimit-reset-requests")),
+        )
+        self.tokens.learn(
+            number("x-ratelimit-limit-tokens"),
+            number("x-ratelimit-remaining-tokens"),
+            parse_duration(headers.get("x-ratelimit-reset-tokens")),
+        )
+
+    def block_for(self, seconds: float):
+        """Suspende todos os pedidos durante `seconds` (ex.: Retry-After de uma resposta 429)."""
+        self.throttled += 1
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "acquired": self.acquired,
+            "waiting": self.waiting,
+            "throttled": self.throttled,
+            "avg_wait_seconds": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait_seconds": round(self.max_observed_wait, 4),
+            "requests_per_minute": round(self.requests.per_second * 60, 2),
+            "tokens_per_minute": round(self.tokens.per_second * 60, 2),
+        }
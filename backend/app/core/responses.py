@@ -0,0 +1,14 @@
+# backend/app/core/responses.py
+
+from typing import Any, Dict, Optional
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+def model_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Resposta JSON para modelos em que já confiamos (vindos da base de dados ou do cache).
+    Devolver uma Response evita que o FastAPI volte a validar tudo contra o
+    response_model (que continua a servir para a documentação). Os modelos são
+    serializados diretamente para bytes pelo pydantic-core, sem dicionários intermédios.
+    """
+    return Response(content=to_json(content), status_code=status_code, headers=headers, media_type="application/json")
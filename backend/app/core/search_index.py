@@ -0,0 +1,211 @@
+# backend/app/core/search_index.py
+
+import bisect
+import heapq
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from app.core.utils import normalize_artwork_name
+
+# Peso de cada campo no ranking: o nome da obra vale mais do que o artista e o estilo
+FIELD_WEIGHTS = {"artwork_name": 3, "artist": 2, "style": 1}
+# Prefixos mais curtos do que isto só são procurados como palavra exata
+MIN_PREFIX_LENGTH = 2
+# Limite de palavras do vocabulário expandidas a partir de um único prefixo
+MAX_PREFIX_EXPANSIONS = 64
+# Número máximo de candidatos avaliados por pesquisa (os mais recentes primeiro)
+MAX_CANDIDATES = 2000
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Divide o texto em palavras normalizadas (sem acentos nem maiúsculas)."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize_artwork_name(text))
+
+class _Entry(NamedTuple):
+    analysis_id: str
+    artwork_name: str
+    tokens: Tuple[str, ...]
+
+class SearchIndex:
+    """
+    Índice invertido em memória sobre o nome da obra, o artista e o estilo.
+    Cada palavra do pedido pode ser um prefixo (autocomplete); o vocabulário
+    ordenado permite expandir um prefixo com uma pesquisa binária.
+
+    Os IDs internos crescem pela ordem de inserção: carregando as análises por
+    `created_at`, um ID maior corresponde a uma análise mais recente.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_sorted = True
+        self._entries: Dict[int, _Entry] = {}
+        self._internal_ids: Dict[str, int] = {}
+        self._next_id = 0
+
+    def add(
+        self,
+        analysis_id: str,
+        artwork_name: str,
+        artist: Optional[str] = None,
+        style: Optional[str] = None
+    ):
+        self.remove(analysis_id)
+        internal_id = self._next_id
+        self._next_id += 1
+
+        weights: Dict[str, int] = {}
+        for field, text in (("artwork_name", artwork_name), ("artist", artist), ("style", style)):
+            for token in tokenize(text):
+                weights[token] = max(weights.get(token, 0), FIELD_WEIGHTS[field])
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                # Ordenado só quando for preciso: carregar 1M documentos não paga um insort por palavra
+                self._vocabulary.append(token)
+                self._vocabulary_sorted = False
+            postings[internal_id] = weight
+
+        self._internal_ids[analysis_id] = internal_id
+        self._entries[internal_id] = _Entry(analysis_id, artwork_name, tuple(weights))
+
+    def remove(self, analysis_id: str):
+        internal_id = self._internal_ids.pop(analysis_id, None)
+        if internal_id is None:
+            return
+        entry = self._entries.pop(internal_id)
+        for token in entry.tokens:
+            postings = self._postings[token]
+            postings.pop(internal_id, None)
+            if not postings:
+                del self._postings[token]
+                self._sort_vocabulary()
+                position = bisect.bisect_left(self._vocabulary, token)
+                del self._vocabulary[position]
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> Tuple[List[str], int, bool]:
+        """
+        Devolve (IDs ordenados por relevância, total de resultados, total estimado).
+        Todas as palavras do pedido têm de corresponder; correspondências exatas valem
+        o dobro de prefixos. Em caso de empate, as análises mais recentes aparecem primeiro.
+        Para palavras muito frequentes só são avaliados os MAX_CANDIDATES documentos mais
+        recentes (e um prefixo só é expandido em MAX_PREFIX_EXPANSIONS palavras): nesse
+        caso o total conta apenas os candidatos avaliados e é marcado como estimado.
+        """
+        query_tokens = set(tokenize(query))
+        if not query_tokens:
+            return [], 0, False
+
+        expansions = []
+        is_estimate = False
+        for token in query_tokens:
+            expanded, truncated = self._expand(token)
+            if not expanded:
+                return [], 0, False
+            expansions.append((token, expanded))
+            is_estimate = is_estimate or truncated
+
+        # A palavra com menos documentos gera os candidatos; as restantes só filtram
+        expansions.sort(key=lambda item: sum(len(self._postings[t]) for t in item[1]))
+        (lead_token, lead_expanded), others = expansions[0], expansions[1:]
+        scores = self._match(lead_token, lead_expanded, limit=MAX_CANDIDATES)
+        if sum(len(self._postings[t]) for t in lead_expanded) > MAX_CANDIDATES:
+            is_estimate = True
+
+        for token, expanded in others:
+            size = sum(len(self._postings[t]) for t in expanded)
+            if size <= len(scores) * len(expanded):
+                other = self._match(token, expanded)
+                scores = {i: score + other[i] for i, score in scores.items() if i in other}
+            else:
+                probed = {i: self._score(i, token, expanded) for i in scores}
+                scores = {i: score + probed[i] for i, score in scores.items() if probed[i]}
+            if not scores:
+                return [], 0, is_estimate
+
+        ranked = heapq.nsmallest(offset + limit, scores, key=lambda i: (-scores[i], -i))
+        return [self._entries[i].analysis_id for i in ranked[offset:]], len(scores), is_estimate
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Sugere nomes de obras distintos que correspondem ao prefixo escrito."""
+        ids, _, _ = self.search(prefix, limit=limit * 3)
+        names: List[str] = []
+        seen = set()
+        for analysis_id in ids:
+            name = self._entries[self._internal_ids[analysis_id]].artwork_name
+            key = normalize_artwork_name(name)
+            if key not in seen:
+                seen.add(key)
+                names.append(name)
+            if len(names) >= limit:
+                break
+        return names
+
+    def clear(self):
+        self._postings.clear()
+        self._vocabulary.clear()
+        self._vocabulary_sorted = True
+        self._entries.clear()
+        self._internal_ids.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, analysis_id: str) -> bool:
+        return analysis_id in self._internal_ids
+
+    def _match(self, query_token: str, expanded: List[str], limit: Optional[int] = None) -> Dict[int, int]:
+        """
+        Pontuação por documento de uma palavra do pedido (exata ou como prefixo).
+        Com `limit`, são lidos no máximo `limit` registos no total, começando pela
+        palavra exata (a primeira do vocabulário) e pelos documentos mais recentes.
+        """
+        scores: Dict[int, int] = {}
+        remaining = limit
+        for token in expanded:
+            multiplier = 2 if token == query_token else 1
+            postings = self._postings[token]
+            # Os dicionários mantêm a ordem de inserção: percorrê-los ao contrário dá os mais recentes primeiro
+            for internal_id, weight in reversed(postings.items()):
+                if remaining is not None:
+                    if remaining <= 0:
+                        return scores
+                    remaining -= 1
+                score = weight * multiplier
+                if score > scores.get(internal_id, 0):
+                    scores[internal_id] = score
+        return scores
+
+    def _score(self, internal_id: int, query_token: str, expanded: List[str]) -> int:
+        best = 0
+        for token in expanded:
+            weight = self._postings[token].get(internal_id)
+            if weight:
+                best = max(best, weight * (2 if token == query_token else 1))
+        return best
+
+    def _expand(self, query_token: str) -> Tuple[List[str], bool]:
+        """Palavras do vocabulário que começam pelo prefixo; o booleano indica se a lista foi cortada."""
+        if len(query_token) < MIN_PREFIX_LENGTH:
+            return ([query_token] if query_token in self._postings else []), False
+
+        self._sort_vocabulary()
+        tokens = []
+        position = bisect.bisect_left(self._vocabulary, query_token)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(query_token):
+            if len(tokens) >= MAX_PREFIX_EXPANSIONS:
+                return tokens, True
+            tokens.append(self._vocabulary[position])
+            position += 1
+        return tokens, False
+
+    def _sort_vocabulary(self):
+        if not self._vocabulary_sorted:
+            # O timsort junta a sequência já ordenada com as palavras novas em tempo linear
+            self._vocabulary.sort()
+            self._vocabulary_sorted = True
@@ -0,0 +1,68 @@
+# backend/app/core/server.py
+"""
+Trabalhador do Gunicorn para produção (ver gunicorn.conf.py). Só é importado pelo
+Gunicorn: em desenvolvimento a aplicação corre diretamente no Uvicorn.
+"""
+
+import asyncio
+import sys
+from types import FrameType
+from typing import Optional
+from gunicorn.arbiter import Arbiter
+from uvicorn.server import Server
+from uvicorn.workers import UvicornWorker
+from app.core.config import settings
+
+class DrainingServer(Server):
+    """
+    Servidor Uvicorn que marca o processo como "a encerrar" mal recebe o sinal de
+    saída, ainda com o socket aberto: a prontidão responde logo 503, em vez de só
+    depois de o Uvicorn deixar de aceitar ligações. Com SHUTDOWN_READINESS_DELAY_SECONDS,
+    o socket só fecha ao fim desse tempo; um segundo sinal encerra de imediato.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.draining = False
+        self._exit_timer: Optional[asyncio.TimerHandle] = None
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if not self.draining:
+            self.draining = True
+            # Importado aqui: o Gunicorn carrega esta classe no processo principal, sem a aplicação
+            from app.services.health_service import get_health_service
+            get_health_service().mark_stopping()
+            if settings.SHUTDOWN_READINESS_DELAY_SECONDS > 0:
+                self._exit_timer = asyncio.get_event_loop().call_later(
+                    settings.SHUTDOWN_READINESS_DELAY_SECONDS, self._exit, sig, frame
+                )
+                return
+        if self._exit_timer is not None:
+            self._exit_timer.cancel()
+        self._exit(sig, frame)
+
+    def _exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        self._exit_timer = None
+        super().handle_exit(sig, frame)
+
+class GracefulUvicornWorker(UvicornWorker):
+    """
+    UvicornWorker com um limite para o encerramento: ao receber SIGTERM (ou ao ser
+    reciclado), deixa de aceitar ligações e espera até SHUTDOWN_DRAIN_SECONDS pelos
+    pedidos em curso; depois corre sempre o shutdown da aplicação (análises em curso,
+    estatísticas pendentes, ligações), em vez de ser morto pelo graceful_timeout.
+    """
+
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "timeout_graceful_shutdown": settings.SHUTDOWN_DRAIN_SECONDS,
+    }
+
+    async def _serve(self) -> None:
+        # Igual ao UvicornWorker, mas com o DrainingServer
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
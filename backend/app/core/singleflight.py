@@ -0,0 +1,48 @@
+# backend/app/core/singleflight.py
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave numa única execução.
+    O primeiro pedido arranca o trabalho e todos os outros aguardam o mesmo resultado.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            logger.info(f"🔁 [{self.name}] A aguardar execução já em curso para: {key}")
+
+        # O shield impede que o cancelamento de um pedido (ex.: cliente desligou)
+        # cancele o trabalho partilhado pelos restantes.
+        return await asyncio.shield(future)
+
+    async def drain(self, timeout: float) -> int:
+        """Espera que terminem as execuções em curso (no máximo `timeout` segundos); devolve quantas ficaram por terminar."""
+        pending = list(self._inflight.values())
+        if not pending:
+            return 0
+        _, not_done = await asyncio.wait(pending, timeout=timeout)
+        return len(not_done)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Marca a exceção como recuperada caso todos os pedidos tenham desistido
+        if not future.cancelled():
+            future.exception()
@@ -0,0 +1,102 @@
+# backend/app/core/stats.py
+"""
+Estatísticas materializadas das análises. Em vez de agregar a coleção inteira
+a cada pedido, um único documento é atualizado com $inc sempre que uma análise
+é guardada ou removida.
+"""
+
+import bisect
+from typing import Any, Dict, List, Optional
+from app.core.utils import normalize_artwork_name
+
+STATS_DOCUMENT_ID = "global"
+
+# Limites superiores (em segundos) dos baldes do histograma de processing_time
+PROCESSING_TIME_BUCKETS = [0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90]
+
+def _stats_key(value: Optional[str]) -> str:
+    """Chave segura para um campo do MongoDB (sem '.' nem '$' iniciais)."""
+    key = normalize_artwork_name(value or "") or "desconhecido"
+    return key.replace(".", "．").replace("$", "＄")
+
+def _display_key(key: str) -> str:
+    return key.replace("．", ".").replace("＄", "$")
+
+def processing_time_bucket(processing_time: float) -> int:
+    return bisect.bisect_left(PROCESSING_TIME_BUCKETS, processing_time)
+
+def stats_increments(doc: Dict[str, Any], direction: int = 1) -> Dict[str, float]:
+    """Incrementos ($inc) que uma análise provoca nas estatísticas; direction=-1 ao remover."""
+    processing_time = float(doc.get("processing_time") or 0.0)
+    increments: Dict[str, float] = {
+        "total": direction,
+        f"styles.{_stats_key(doc.get('style'))}": direction,
+        f"artists.{_stats_key(doc.get('artist'))}": direction,
+        "processing_time.sum": direction * processing_time,
+        "processing_time.count": direction,
+        f"processing_time.buckets.{processing_time_bucket(processing_time)}": direction,
+    }
+    for emotion in set(doc.get("emotions") or []):
+        if isinstance(emotion, str):
+            increments[f"emotions.{_stats_key(emotion)}"] = direction
+    return increments
+
+def merge_increments(target: Dict[str, float], increments: Dict[str, float]):
+    for key, value in increments.items():
+        target[key] = target.get(key, 0) + value
+
+def apply_increments(doc: Dict[str, Any], increments: Dict[str, float]) -> Dict[str, Any]:
+    """Aplica os incrementos (caminhos com ponto, como o $inc do MongoDB) a um documento aninhado."""
+    for path, value in increments.items():
+        target = doc
+        *parents, leaf = path.split(".")
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = target.get(leaf, 0) + value
+    return doc
+
+def _percentile(buckets: Dict[str, int], count: int, percentile: float) -> Optional[float]:
+    """Estimativa de um percentil por interpolação linear dentro do balde do histograma."""
+    if count <= 0:
+        return None
+    target = percentile * count
+    cumulative = 0
+    for index in range(len(PROCESSING_TIME_BUCKETS) + 1):
+        in_bucket = buckets.get(str(index), 0)
+        if in_bucket > 0 and cumulative + in_bucket >= target:
+            lower = PROCESSING_TIME_BUCKETS[index - 1] if index > 0 else 0.0
+            upper = PROCESSING_TIME_BUCKETS[index] if index < len(PROCESSING_TIME_BUCKETS) else lower
+            return round(lower + (upper - lower) * (target - cumulative) / in_bucket, 3)
+        cumulative += in_bucket
+    return float(PROCESSING_TIME_BUCKETS[-1])
+
+def _top(counters: Dict[str, int], limit: int) -> List[Dict[str, Any]]:
+    ranked = sorted(((k, v) for k, v in counters.items() if v > 0), key=lambda item: -item[1])
+    return [{"name": _display_key(k), "count": v} for k, v in ranked[:limit]]
+
+def summarize_stats(doc: Optional[Dict[str, Any]], top: int = 10) -> Dict[str, Any]:
+    """Converte o documento materializado na resposta de /analyses/stats/summary."""
+    doc = doc or {}
+    timing = doc.get("processing_time", {})
+    count = int(timing.get("count", 0))
+    buckets = timing.get("buckets", {})
+    requests = doc.get("requests", {})
+    hits, misses = int(requests.get("cache_hits", 0)), int(requests.get("cache_misses", 0))
+
+    return {
+        "total_analyses": int(doc.get("total", 0)),
+        "by_style": _top(doc.get("styles", {}), top),
+        "top_artists": _top(doc.get("artists", {}), top),
+        "emotions": _top(doc.get("emotions", {}), top),
+        "requests": {
+            "cache_hits": hits,
+            "cache_misses": misses,
+            "cache_hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        },
+        "processing_time": {
+            "avg": round(timing.get("sum", 0.0) / count, 3) if count else None,
+            "p50": _percentile(buckets, count, 0.50),
+            "p90": _percentile(buckets, count, 0.90),
+            "p99": _percentile(buckets, count, 0.99),
+        },
+    }
@@ -0,0 +1,103 @@
+# backend/app/core/uploads.py
+
+import hashlib
+from typing import Tuple
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+class UploadTooLargeError(Exception):
+    """O upload ultrapassou o tamanho máximo permitido."""
+
+async def read_upload(file: UploadFile, max_size: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Tuple[bytes, str]:
+    """
+    Lê o upload por blocos, calculando o SHA-256 à medida que os bytes chegam.
+    Desiste assim que o limite é ultrapassado, sem nunca ler o ficheiro inteiro.
+    """
+    hasher = hashlib.sha256()
+    chunks = []
+    total = 0
+    while chunk := await file.read(chunk_size):
+        total += len(chunk)
+        if total > max_size:
+            raise UploadTooLargeError(f"Upload maior do que {max_size} bytes")
+        # Um bloco de 256KB é processado em microssegundos: não compensa passá-lo a uma thread
+        hasher.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), hasher.hexdigest()
+
+async def read_image_upload(file: UploadFile) -> Tuple[bytes, str]:
+    """Valida o tipo do ficheiro e lê o upload, devolvendo os bytes e o SHA-256."""
+    if not file.content_type in settings.ALLOWED_IMAGE_TYPES:
+        raise HTTPException(
+            status_code=415, 
+            detail=f"Tipo de ficheiro não suportado. Use um dos seguintes: {', '.join(settings.ALLOWED_IMAGE_TYPES)}"
+        )
+
+    try:
+        return await read_upload(file, settings.MAX_FILE_SIZE)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Ficheiro muito grande. O tamanho máximo é {settings.MAX_FILE_SIZE // (1024*1024)}MB."
+        )
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejeita com 413 os pedidos multipart cujo corpo ultrapassa `max_body_size`,
+    antes de o Starlette os guardar por inteiro: pelo Content-Length quando existe,
+    ou contando os bytes recebidos quando o corpo chega em chunked encoding.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    exceeded = True
+                    raise UploadTooLargeError(f"Upload maior do que {self.max_body_size} bytes")
+            return message
+
+        async def guarded_send(message: Message):
+            # O FastAPI converte erros de leitura do corpo em 400; essa resposta é descartada
+            if not exceeded:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLargeError:
+            pass
+        if exceeded:
+            await self._reject(scope, receive, send)
+
+    def _is_multipart(self, scope: Scope) -> bool:
+        content_type = dict(scope["headers"]).get(b"content-type", b"")
+        return content_type.startswith(b"multipart/form-data")
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Ficheiro muito grande. O tamanho máximo é {self.max_body_size // (1024*1024)}MB."}
+        )
+        await response(scope, receive, send)
@@ -2,6 +2,11 @@
 
 import hashlib
 import base64
+import json
+import unicodedata
+from datetime import datetime
+from typing import Tuple
+from PIL import Image
 
 def generate_image_hash(image_data: bytes) -> str:
     """
@@ -10,9 +15,54 @@ def generate_image_hash(image_data: bytes) -> str:
     """
     return hashlib.sha256(image_data).hexdigest()
 
+def perceptual_hash_from_image(image: Image.Image) -> str:
+    """
+    Gera um hash perceptual (dHash de 64 bits, em hexadecimal) de uma imagem já
+    descodificada pelo Pillow. Ao contrário do SHA-256, imagens visualmente iguais
+    (recomprimidas, redimensionadas ou capturadas do ecrã) produzem hashes muito próximos.
+    """
+    pixels = list(image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).getdata())
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return f"{value:016x}"
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Número de bits diferentes entre dois hashes perceptuais."""
+    return (hash_a ^ hash_b).bit_count()
+
 def image_to_base64(image_data: bytes) -> str:
     """
     Converte os dados binários de uma imagem para uma string no formato base64.
     Isto é necessário para enviar a imagem para a API de IA dentro de um JSON.
     """
-    return base64.b64encode(image_data).decode('utf-8')
\ No newline at end of file
+    return base64.b64encode(image_data).decode('utf-8')
+
+def normalize_artwork_name(artwork_name: str) -> str:
+    """
+    Normaliza o nome de uma obra para ser usado como chave de cache:
+    sem distinção de maiúsculas, sem acentos e com espaços colapsados.
+    """
+    if artwork_name.isascii():
+        return " ".join(artwork_name.lower().split())
+    decomposed = unicodedata.normalize("NFKD", artwork_name)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
+
+def encode_cursor(created_at: datetime, document_id: str) -> str:
+    """Cria o token opaco de paginação a partir da última posição (created_at, _id) devolvida."""
+    raw = json.dumps({"t": created_at.isoformat(), "id": document_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Descodifica um token de paginação. Lança ValueError se o token for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), data["id"]
+    except Exception as e:
+        raise ValueError(f"Cursor de paginação inválido: {e}")
@@ -0,0 +1 @@
+# One-off database migrations and maintenance commands
@@ -0,0 +1,55 @@
+# backend/app/migrations/backfill_artwork_name_key.py
+"""
+Migração única: preenche o campo `artwork_name_key` nas análises antigas,
+para que a pesquisa por nome use o índice em vez de um $regex.
+
+Uso (a partir da pasta backend/):
+    python -m app.migrations.backfill_artwork_name_key
+"""
+
+import asyncio
+import logging
+from pymongo import UpdateOne
+from app.core.utils import normalize_artwork_name
+from app.services.database_service import DatabaseService
+from app.storage import MongoAnalysisStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+async def backfill_artwork_name_key(db_service: DatabaseService) -> int:
+    """Calcula a chave normalizada de todos os documentos que ainda não a têm."""
+    collection = db_service.store.collection
+    cursor = collection.find({"artwork_name_key": None}, {"artwork_name": 1})
+    operations = []
+    updated = 0
+
+    async for doc in cursor:
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"artwork_name_key": normalize_artwork_name(doc.get("artwork_name") or "")}}
+        ))
+        if len(operations) >= BATCH_SIZE:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+            operations = []
+
+    if operations:
+        result = await collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+    return updated
+
+async def main():
+    db_service = DatabaseService(MongoAnalysisStore())
+    await db_service.connect()
+    try:
+        updated = await backfill_artwork_name_key(db_service)
+        logger.info(f"✅ {updated} análises atualizadas com 'artwork_name_key'.")
+    finally:
+        await db_service.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
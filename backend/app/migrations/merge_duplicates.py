@@ -0,0 +1,69 @@
+# backend/app/migrations/merge_duplicates.py
+"""
+Junta as análises duplicadas (mesmo `artwork_name_key` ou mesmo `image_hash`),
+mantendo a mais antiga de cada grupo. Se a análise mantida não tiver hash de
+imagem, herda o de um dos duplicados. No fim, cria os índices únicos e
+reconstrói as estatísticas materializadas.
+
+Uso (a partir da pasta backend/):
+    python -m app.migrations.merge_duplicates
+"""
+
+import asyncio
+import logging
+from app.migrations.rebuild_stats import rebuild_stats
+from app.services.database_service import DatabaseService
+from app.storage import MongoAnalysisStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def merge_duplicates_by(db_service: DatabaseService, field: str) -> int:
+    """Remove os duplicados de um campo; devolve o número de documentos removidos."""
+    collection = db_service.store.collection
+    pipeline = [
+        {"$match": {field: {"$gt": ""}}},
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$group": {"_id": f"${field}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = 0
+
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        keeper_id, duplicate_ids = group["ids"][0], group["ids"][1:]
+        keeper = await collection.find_one({"_id": keeper_id}, {"image_hash": 1, "perceptual_hash": 1})
+        duplicates = await collection.find(
+            {"_id": {"$in": duplicate_ids}}, {"image_hash": 1, "perceptual_hash": 1}
+        ).to_list(length=None)
+
+        result = await collection.delete_many({"_id": {"$in": duplicate_ids}})
+        removed += result.deleted_count
+
+        if not keeper.get("image_hash"):
+            donor = next((doc for doc in duplicates if doc.get("image_hash")), None)
+            if donor:
+                link = {"image_hash": donor["image_hash"]}
+                if donor.get("perceptual_hash"):
+                    link["perceptual_hash"] = donor["perceptual_hash"]
+                await collection.update_one({"_id": keeper_id}, {"$set": link})
+
+        logger.info(f"🔗 {field}={group['_id']}: mantida {keeper_id}, removidas {len(duplicate_ids)}")
+
+    return removed
+
+async def main():
+    db_service = DatabaseService(MongoAnalysisStore())
+    await db_service.connect()
+    try:
+        removed = await merge_duplicates_by(db_service, "artwork_name_key")
+        removed += await merge_duplicates_by(db_service, "image_hash")
+        logger.info(f"✅ {removed} análises duplicadas removidas.")
+        # Sem duplicados, os índices únicos já podem ser criados
+        await db_service.store.create_indexes()
+        total = await rebuild_stats(db_service)
+        logger.info(f"✅ Estatísticas reconstruídas a partir de {total} análises.")
+    finally:
+        await db_service.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
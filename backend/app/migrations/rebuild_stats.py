@@ -0,0 +1,53 @@
+# backend/app/migrations/rebuild_stats.py
+"""
+Reconstrói o documento de estatísticas materializado a partir da coleção de
+análises. Necessário uma vez em instalações antigas (antes de as estatísticas
+serem mantidas com $inc) ou se alguma atualização tiver falhado.
+Os contadores de pedidos (cache hit/miss) são preservados.
+
+Uso (a partir da pasta backend/):
+    python -m app.migrations.rebuild_stats
+"""
+
+import asyncio
+import logging
+from app.core.stats import STATS_DOCUMENT_ID, stats_increments, merge_increments, apply_increments
+from app.services.database_service import DatabaseService
+from app.storage import MongoAnalysisStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def rebuild_stats(db_service: DatabaseService) -> int:
+    """Percorre todas as análises e substitui os totais do documento de estatísticas."""
+    collection = db_service.store.collection
+    stats_collection = db_service.store.stats_collection
+    projection = {"style": 1, "artist": 1, "emotions": 1, "processing_time": 1}
+    increments = {}
+    total = 0
+
+    async for doc in collection.find({}, projection):
+        merge_increments(increments, stats_increments(doc))
+        total += 1
+
+    # Os campos com ponto (ex.: "styles.barroco") passam a documentos aninhados
+    stats = apply_increments({}, increments)
+
+    previous = await stats_collection.find_one({"_id": STATS_DOCUMENT_ID}, {"requests": 1})
+    if previous and "requests" in previous:
+        stats["requests"] = previous["requests"]
+
+    await stats_collection.replace_one({"_id": STATS_DOCUMENT_ID}, stats, upsert=True)
+    return total
+
+async def main():
+    db_service = DatabaseService(MongoAnalysisStore())
+    await db_service.connect()
+    try:
+        total = await rebuild_stats(db_service)
+        logger.info(f"✅ Estatísticas reconstruídas a partir de {total} análises.")
+    finally:
+        await db_service.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
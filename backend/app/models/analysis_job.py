@@ -0,0 +1,30 @@
+# backend/app/models/analysis_job.py
+
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from app.models.artwork_analysis import ArtworkAnalysisResponse
+
+class JobKind(str, Enum):
+    TEXT = "text"
+    VISION = "vision"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class AnalysisJobResponse(BaseModel):
+    """Estado de uma análise assíncrona; `result` fica preenchido quando o job termina com sucesso."""
+    id: str = Field(..., description="ID único do job")
+    kind: JobKind
+    status: JobStatus
+    artwork_name: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[ArtworkAnalysisResponse] = None
@@ -1,13 +1,20 @@
 # backend/app/models/artwork_analysis.py
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Annotated, Optional, List, Literal
 from datetime import datetime
+from app.core.config import settings
 
 class ArtworkAnalysisRequest(BaseModel):
     """Modelo para requisição de análise de obra de arte por nome."""
     artwork_name: str = Field(..., min_length=1, max_length=200)
 
+class ArtworkAnalysisBatchRequest(BaseModel):
+    """Modelo para requisição de análise de várias obras de arte por nome."""
+    artwork_names: List[Annotated[str, Field(max_length=200)]] = Field(
+        ..., min_length=1, max_length=settings.BATCH_MAX_NAMES
+    )
+
 class ArtworkAnalysisCreate(BaseModel):
     """Modelo para validar os dados de uma nova análise antes de serem guardados."""
     artwork_name: str
@@ -18,6 +25,7 @@ class ArtworkAnalysisCreate(BaseModel):
     emotions: Optional[List[str]] = None
     processing_time: float
     image_hash: Optional[str] = None
+    perceptual_hash: Optional[str] = None
     image_url: Optional[str] = None
 
 class ArtworkAnalysisResponse(BaseModel):
@@ -33,9 +41,44 @@ class ArtworkAnalysisResponse(BaseModel):
     cached: bool = False
     image_url: Optional[str] = None
 
+class ArtworkAnalysisBatchItem(BaseModel):
+    """Resultado de um nome do lote: 'cached', 'created', 'invalid' ou 'failed'."""
+    artwork_name: str
+    status: Literal["cached", "created", "invalid", "failed"]
+    analysis: Optional[ArtworkAnalysisResponse] = None
+    error: Optional[str] = None
+
+class ArtworkAnalysisBatchResponse(BaseModel):
+    """Resposta da análise em lote, pela mesma ordem dos nomes pedidos."""
+    results: List[ArtworkAnalysisBatchItem]
+    cached: int
+    created: int
+    failed: int
+
+class ArtworkAnalysisSummary(BaseModel):
+    """Modelo resumido para listagens (galeria): sem o texto longo da análise."""
+    id: str = Field(..., description="ID único da análise")
+    artwork_name: str
+    artist: Optional[str] = None
+    year: Optional[str] = None
+    style: Optional[str] = None
+    emotions: Optional[List[str]] = None
+    image_url: Optional[str] = None
+
+class ArtworkAnalysisSearchResults(BaseModel):
+    """Modelo para os resultados paginados da pesquisa de análises."""
+    query: str
+    total: int
+    # True quando a pesquisa foi limitada aos candidatos mais recentes: `total` é então um mínimo
+    total_is_estimate: bool = False
+    limit: int
+    offset: int
+    results: List[ArtworkAnalysisResponse]
+
 class ArtworkAnalysisDB(BaseModel):
     """Modelo que representa um documento na coleção do MongoDB."""
     artwork_name: str
+    artwork_name_key: str
     analysis: str
     artist: Optional[str] = None
     year: Optional[str] = None
@@ -43,6 +86,7 @@ class ArtworkAnalysisDB(BaseModel):
     emotions: Optional[List[str]] = None
     processing_time: float
     image_hash: Optional[str] = None
+    perceptual_hash: Optional[str] = None
     image_url: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,12 +1,14 @@
 # /backend/app/routers/analyses.py
 
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import Optional, List
+from typing import Optional, List, Literal, Union
 import logging
 from app.services.analysis_service import get_analysis_service, AnalysisService
+from app.services.groq_service import get_groq_service, GroqService
+from app.core.responses import model_response
 
 # ✨ 1. Alterar a importação para usar o modelo correto
-from app.models.artwork_analysis import ArtworkAnalysisResponse
+from app.models.artwork_analysis import ArtworkAnalysisResponse, ArtworkAnalysisSearchResults, ArtworkAnalysisSummary
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -14,25 +16,66 @@ router = APIRouter()
 # ✨ 2. (Opcional, mas recomendado) Criar um modelo para a lista
 #    Como o AnalysisList estava no outro ficheiro, vamos definir um aqui
 #    ou simplesmente devolver uma Lista. Para simplicidade, vamos devolver List.
-@router.get("/", response_model=List[ArtworkAnalysisResponse])
+@router.get("/", response_model=List[Union[ArtworkAnalysisResponse, ArtworkAnalysisSummary]])
 async def get_analyses(
     # ... (o resto da função get_analyses pode ficar como está, mas o response_model muda)
     # NOTE: Para uma implementação completa, você criaria um ArtworkAnalysisList
     # similar ao que tinha, mas usando ArtworkAnalysisResponse.
     # Por agora, vamos focar em corrigir o erro principal.
-    page: int = Query(1, ge=1, description="Número da página"),
+    page: int = Query(1, ge=1, description="Número da página (ignorado quando é enviado um cursor)"),
     limit: int = Query(10, ge=1, le=100, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devolvido no cabeçalho X-Next-Cursor da página anterior"),
+    include_total: bool = Query(False, description="Incluir o total (estimado sem filtros) no cabeçalho X-Total-Count"),
     artwork_name: Optional[str] = Query(None, description="Filtrar por nome da obra"),
     artist_name: Optional[str] = Query(None, description="Filtrar por nome do artista"),
     style: Optional[str] = Query(None, description="Filtrar por estilo artístico"),
+    view: Literal["full", "summary"] = Query("full", description="'summary' devolve só os campos da galeria, sem o texto da análise"),
     analysis_service: AnalysisService = Depends(get_analysis_service)
 ):
-    # Esta função pode precisar de mais ajustes para paginar corretamente,
-    # mas a correção principal é o response_model.
-    analyses, total = await analysis_service.get_analyses(
-        page=page, limit=limit, artwork_name=artwork_name, artist_name=artist_name, style=style
-    )
-    return analyses # Devolve a lista diretamente
+    # A paginação usa um cursor sobre (created_at, _id): cada página custa O(limit)
+    # independentemente da profundidade. O cursor seguinte e o total seguem nos cabeçalhos,
+    # para manter o corpo da resposta como uma lista.
+    try:
+        analyses, next_cursor, total = await analysis_service.get_analyses(
+            page=page, limit=limit, artwork_name=artwork_name, artist_name=artist_name, style=style,
+            cursor=cursor, include_total=include_total, summary=view == "summary"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return model_response(analyses, headers=headers) # Devolve a lista diretamente
+
+# As rotas de pesquisa têm de ser declaradas antes de /{analysis_id}
+@router.get("/search", response_model=ArtworkAnalysisSearchResults)
+async def search_analyses(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a pesquisar (nome, artista ou estilo; aceita prefixos)"),
+    limit: int = Query(10, ge=1, le=50, description="Itens por página"),
+    offset: int = Query(0, ge=0, le=1000, description="Número de resultados a saltar"),
+    analysis_service: AnalysisService = Depends(get_analysis_service)
+):
+    try:
+        results, total, total_is_estimate = await analysis_service.search_analyses(q, limit=limit, offset=offset)
+        return model_response(
+            ArtworkAnalysisSearchResults.model_construct(
+                query=q, total=total, total_is_estimate=total_is_estimate, limit=limit, offset=offset, results=results
+            )
+        )
+    except Exception as e:
+        logger.error(f"Erro na pesquisa de análises: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/search/suggest", response_model=List[str])
+async def suggest_artwork_names(
+    q: str = Query(..., min_length=1, max_length=200, description="Início do nome da obra ou do artista"),
+    limit: int = Query(10, ge=1, le=20, description="Número máximo de sugestões"),
+    analysis_service: AnalysisService = Depends(get_analysis_service)
+):
+    return analysis_service.suggest_artwork_names(q, limit=limit)
 
 @router.get("/{analysis_id}", response_model=ArtworkAnalysisResponse) # ✨ 3. Mudar o response_model aqui
 async def get_analysis_by_id(
@@ -45,7 +88,7 @@ async def get_analysis_by_id(
         analysis = await analysis_service.get_analysis_by_id(analysis_id)
         if not analysis:
             raise HTTPException(status_code=404, detail="Análise não encontrada")
-        return analysis
+        return model_response(analysis)
     except HTTPException:
         raise
     except Exception as e:
@@ -61,7 +104,7 @@ async def get_recent_analyses(
 ):
     try:
         analyses = await analysis_service.get_recent_analyses(limit)
-        return analyses
+        return model_response(analyses)
     except Exception as e:
         logger.error(f"Erro ao buscar análises recentes: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -70,11 +113,12 @@ async def get_recent_analyses(
 
 @router.get("/stats/summary")
 async def get_analysis_stats(
-    analysis_service: AnalysisService = Depends(get_analysis_service) # Injetar
+    analysis_service: AnalysisService = Depends(get_analysis_service), # Injetar
+    groq_service: GroqService = Depends(get_groq_service)
 ):
     try:
         stats = await analysis_service.get_analysis_stats()
-        return stats
+        return {**stats, "rate_limits": groq_service.rate_limit_stats()}
     except Exception as e:
         logger.error(f"Erro ao buscar estatísticas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
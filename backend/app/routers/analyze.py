@@ -1,139 +1,142 @@
 # /backend/app/routers/analyze.py
 
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Tuple
+import json
 import logging
-import httpx # Importe o httpx para fazer as requisições
-from app.models.artwork_analysis import ArtworkAnalysisRequest, ArtworkAnalysisResponse
-from app.services.groq_service import get_groq_service, GroqService
-from app.services.database_service import get_database_service, DatabaseService
+import math
+from app.models.artwork_analysis import (
+    ArtworkAnalysisRequest, ArtworkAnalysisResponse, ArtworkAnalysisBatchRequest, ArtworkAnalysisBatchResponse
+)
+from app.services.pipeline_service import get_pipeline_service, PipelineService
+from app.services.groq_service import GroqRateLimitError
 from app.core.config import settings
-from app.core.utils import generate_image_hash
+from app.core.images import InvalidImageError
+from app.core.responses import model_response
+from app.core.uploads import read_image_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-async def find_valid_image_url(artwork_name: str, artist: str | None) -> str | None:
-    """
-    Busca URLs de imagens e verifica se são válidos antes de retornar o primeiro
-    que encontrar.
-    """
-    # AQUI É ONDE VOCÊ PRECISARÁ INTEGRAR O SEU SERVIÇO DE BUSCA DE IMAGENS.
-    # Esta lista de exemplo simula os URLs que uma API de busca retornaria.
-    # Exemplo de URLs que poderiam vir de uma API de busca:
-    potential_urls = [
-        # Coloque aqui as chamadas à sua API de busca para obter URLs
-        # Por exemplo: google_search(f'{artwork_name} {artist} high quality image')
-        f"https://example.com/images/{artwork_name.replace(' ', '_')}.jpg",
-        "https://www.wikipedia.org/some_other_image.png",
-        "https://broken-link.com/image.jpg"
-    ]
-    
-    # A sua lógica de busca real substituiria esta lista.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        for url in potential_urls:
-            try:
-                # Tenta fazer uma requisição HEAD para verificar se a URL é válida
-                response = await client.head(url, follow_redirects=True)
-                if response.status_code == 200 and response.headers.get('content-type', '').startswith('image'):
-                    logger.info(f"URL de imagem válida encontrada: {url}")
-                    return url
-            except httpx.RequestError as e:
-                logger.warning(f"Erro ao verificar URL {url}: {e}")
-                continue # Continua para a próxima URL em caso de erro
+def _rate_limited(error: GroqRateLimitError) -> HTTPException:
+    """503 com Retry-After: a Groq está a limitar os pedidos, o cliente pode tentar mais tarde."""
+    return HTTPException(
+        status_code=503,
+        detail="O serviço de análise está sobrecarregado. Tente novamente dentro de instantes.",
+        headers={"Retry-After": str(math.ceil(error.retry_after))}
+    )
 
-    logger.warning("Nenhum URL de imagem válido foi encontrado após todas as tentativas.")
-    return None
+async def _to_sse(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    """Formata os eventos do pipeline como Server-Sent Events."""
+    try:
+        async for event, data in events:
+            if event == "delta":
+                payload = json.dumps({"text": data}, ensure_ascii=False)
+            else:
+                payload = data.model_dump_json()
+            yield f"event: {event}\ndata: {payload}\n\n"
+    except GroqRateLimitError as e:
+        logger.warning(f"⏳ Análise em streaming limitada pela Groq: {str(e)}")
+        payload = json.dumps({
+            "detail": "O serviço de análise está sobrecarregado. Tente novamente dentro de instantes.",
+            "retry_after": math.ceil(e.retry_after)
+        }, ensure_ascii=False)
+        yield f"event: error\ndata: {payload}\n\n"
+    except Exception as e:
+        logger.error(f"❌ Erro durante a análise em streaming: {str(e)}")
+        payload = json.dumps({"detail": "Ocorreu um erro interno ao processar a sua solicitação."}, ensure_ascii=False)
+        yield f"event: error\ndata: {payload}\n\n"
 
 @router.post("/analise-por-nome", response_model=ArtworkAnalysisResponse, tags=["Analysis"])
 async def analyze_artwork_by_name(
     request: ArtworkAnalysisRequest,
-    db_service: DatabaseService = Depends(get_database_service),
-    groq_service: GroqService = Depends(get_groq_service)
+    pipeline_service: PipelineService = Depends(get_pipeline_service)
 ):
     try:
         artwork_name = request.artwork_name.strip()
         if not artwork_name:
             raise HTTPException(status_code=400, detail="O nome da obra de arte é obrigatório.")
         
-        cached_analysis = await db_service.get_analysis_by_name(artwork_name)
-        if cached_analysis:
-            return cached_analysis
-        
-        # 1. Obter a análise textual da IA
-        analysis_data = await groq_service.analyze_artwork(artwork_name)
-        
-        # 2. Usar o nome e o artista para encontrar e validar um URL de imagem
-        confirmed_artwork_name = analysis_data.get("artwork_name")
-        artist = analysis_data.get("artist")
-        image_url = await find_valid_image_url(confirmed_artwork_name, artist)
-        
-        # 3. Adicionar o URL encontrado à análise
-        analysis_data["image_url"] = image_url
-        
-        saved_analysis = await db_service.save_analysis(analysis_data)
-        return saved_analysis
+        return model_response(await pipeline_service.analyze_by_name(artwork_name))
         
+    except GroqRateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
         logger.error(f"Erro na análise da obra {request.artwork_name}: {str(e)}")
         raise HTTPException(status_code=500, detail="Ocorreu um erro interno ao processar a sua solicitação.")
 
+@router.post("/analise-por-nome/batch", response_model=ArtworkAnalysisBatchResponse, tags=["Analysis"])
+async def analyze_artworks_by_name(
+    request: ArtworkAnalysisBatchRequest,
+    pipeline_service: PipelineService = Depends(get_pipeline_service)
+):
+    """
+    Analisa vários nomes de uma vez. Os resultados vêm pela ordem pedida, cada um com
+    o seu estado: um nome inválido ou uma falha da IA não invalidam o lote inteiro.
+    """
+    try:
+        items = await pipeline_service.analyze_batch_by_name(request.artwork_names)
+    except Exception as e:
+        logger.error(f"Erro na análise em lote: {str(e)}")
+        raise HTTPException(status_code=500, detail="Ocorreu um erro interno ao processar a sua solicitação.")
+
+    return ArtworkAnalysisBatchResponse(
+        results=items,
+        cached=sum(item.status == "cached" for item in items),
+        created=sum(item.status == "created" for item in items),
+        failed=sum(item.status in ("failed", "invalid") for item in items),
+    )
+
 @router.post("/analise-por-imagem", response_model=ArtworkAnalysisResponse, tags=["Analysis"])
 async def analyze_artwork_by_image(
     file: UploadFile = File(...),
-    db_service: DatabaseService = Depends(get_database_service),
-    groq_service: GroqService = Depends(get_groq_service)
+    pipeline_service: PipelineService = Depends(get_pipeline_service)
 ):
-    # ... (código de validação e cache permanece o mesmo)
-    if not file.content_type in settings.ALLOWED_IMAGE_TYPES:
-        raise HTTPException(
-            status_code=415, 
-            detail=f"Tipo de ficheiro não suportado. Use um dos seguintes: {', '.join(settings.ALLOWED_IMAGE_TYPES)}"
-        )
-
-    image_data = await file.read()
-    if len(image_data) > settings.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"Ficheiro muito grande. O tamanho máximo é {settings.MAX_FILE_SIZE // (1024*1024)}MB."
-        )
+    image_data, image_hash = await read_image_upload(file)
 
     try:
-        image_hash = generate_image_hash(image_data)
-        cached_analysis = await db_service.get_analysis_by_image_hash(image_hash)
-        if cached_analysis:
-            logger.info(f"✅ Análise encontrada em cache pelo HASH da imagem.")
-            return cached_analysis
-
-        logger.info("🔍 Hash não encontrado. A tentar identificar a obra na imagem...")
-        identification_result = await groq_service.identify_artwork_from_image(image_data)
-        
-        if identification_result:
-            artwork_name = identification_result.get("artwork_name")
-            cached_by_name = await db_service.get_analysis_by_name(artwork_name)
-            if cached_by_name:
-                logger.info(f"✅ Obra identificada como '{artwork_name}'. Análise encontrada em cache pelo nome.")
-                return cached_by_name
-
-        logger.info(f"🤖 Nenhuma análise em cache. A gerar nova análise completa para a imagem...")
-        analysis_data = await groq_service.analyze_artwork_from_image(image_data)
-        
-        if identification_result and identification_result.get("artwork_name"):
-             analysis_data["artwork_name"] = identification_result.get("artwork_name")
-             
-        # Usar o nome da obra para encontrar uma imagem válida para a análise
-        confirmed_artwork_name = analysis_data.get("artwork_name")
-        artist = analysis_data.get("artist")
-        image_url = await find_valid_image_url(confirmed_artwork_name, artist)
-        analysis_data["image_url"] = image_url
-        
-        saved_analysis = await db_service.save_analysis(analysis_data, image_hash=image_hash)
-        logger.info(f"💾 Nova análise de imagem salva na base de dados.")
-        
-        return saved_analysis
+        return model_response(await pipeline_service.analyze_by_image(image_data, image_hash=image_hash))
 
     except HTTPException:
         raise
+    except InvalidImageError:
+        raise HTTPException(status_code=400, detail="Não foi possível ler a imagem enviada.")
+    except GroqRateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
         logger.error(f"❌ Erro crítico na análise da imagem: {str(e)}")
-        raise HTTPException(status_code=500, detail="Ocorreu um erro interno ao processar a imagem.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Ocorreu um erro interno ao processar a imagem.")
+
+@router.post("/analise-por-nome/stream", tags=["Analysis"])
+async def stream_artwork_by_name(
+    request: ArtworkAnalysisRequest,
+    pipeline_service: PipelineService = Depends(get_pipeline_service)
+):
+    """
+    Versão em streaming (SSE) de /analise-por-nome: emite eventos `delta` com o texto
+    gerado pela IA e um evento final `result` com a análise guardada.
+    """
+    artwork_name = request.artwork_name.strip()
+    if not artwork_name:
+        raise HTTPException(status_code=400, detail="O nome da obra de arte é obrigatório.")
+
+    events = pipeline_service.stream_analysis(
+        lambda on_delta: pipeline_service.analyze_by_name(artwork_name, on_delta=on_delta)
+    )
+    return StreamingResponse(_to_sse(events), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/analise-por-imagem/stream", tags=["Analysis"])
+async def stream_artwork_by_image(
+    file: UploadFile = File(...),
+    pipeline_service: PipelineService = Depends(get_pipeline_service)
+):
+    """Versão em streaming (SSE) de /analise-por-imagem, com os mesmos eventos da análise por nome."""
+    image_data, image_hash = await read_image_upload(file)
+
+    events = pipeline_service.stream_analysis(
+        lambda on_delta: pipeline_service.analyze_by_image(image_data, image_hash=image_hash, on_delta=on_delta)
+    )
+    return StreamingResponse(_to_sse(events), media_type="text/event-stream", headers=SSE_HEADERS)
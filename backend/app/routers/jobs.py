@@ -0,0 +1,73 @@
+# /backend/app/routers/jobs.py
+
+from fastapi import APIRouter, HTTPException, Query, Depends, Response, UploadFile, File
+import logging
+from app.models.artwork_analysis import ArtworkAnalysisRequest
+from app.models.analysis_job import AnalysisJobResponse
+from app.services.job_service import get_job_service, JobService
+from app.core.config import settings
+from app.core.uploads import read_image_upload
+
+logger = logging.getLogger(__name__)
+
+def require_jobs(job_service: JobService = Depends(get_job_service)):
+    if not job_service.available:
+        raise HTTPException(
+            status_code=503, detail="As análises assíncronas não estão disponíveis com o armazenamento SQLite."
+        )
+
+router = APIRouter(dependencies=[Depends(require_jobs)])
+
+# Versões assíncronas das análises: o pedido devolve logo um job (202) e o
+# cliente consulta GET /jobs/{id}, opcionalmente com ?wait= para esperar pelo fim.
+
+@router.post("/analise-por-nome", response_model=AnalysisJobResponse, status_code=202)
+async def submit_analysis_by_name(
+    request: ArtworkAnalysisRequest,
+    response: Response,
+    job_service: JobService = Depends(get_job_service)
+):
+    artwork_name = request.artwork_name.strip()
+    if not artwork_name:
+        raise HTTPException(status_code=400, detail="O nome da obra de arte é obrigatório.")
+
+    try:
+        job = await job_service.submit_by_name(artwork_name)
+    except Exception as e:
+        logger.error(f"Erro ao criar job para a obra {artwork_name}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Ocorreu um erro interno ao processar a sua solicitação.")
+
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
+
+@router.post("/analise-por-imagem", response_model=AnalysisJobResponse, status_code=202)
+async def submit_analysis_by_image(
+    response: Response,
+    file: UploadFile = File(...),
+    job_service: JobService = Depends(get_job_service)
+):
+    image_data, image_hash = await read_image_upload(file)
+
+    try:
+        job = await job_service.submit_by_image(image_data, image_hash)
+    except Exception as e:
+        logger.error(f"Erro ao criar job para a imagem: {str(e)}")
+        raise HTTPException(status_code=500, detail="Ocorreu um erro interno ao processar a imagem.")
+
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
+
+@router.get("/{job_id}", response_model=AnalysisJobResponse)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=settings.JOB_MAX_WAIT_SECONDS, description="Segundos a esperar que o job termine"),
+    job_service: JobService = Depends(get_job_service)
+):
+    try:
+        job = await job_service.get_job(job_id, wait=wait)
+    except Exception as e:
+        logger.error(f"Erro ao buscar job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
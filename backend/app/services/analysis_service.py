@@ -2,10 +2,11 @@
 
 from fastapi import Depends
 from functools import lru_cache
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 import logging
 
 from app.models.analysis import AnalysisCreate, AnalysisResponse
+from app.models.artwork_analysis import ArtworkAnalysisResponse, ArtworkAnalysisSummary
 from app.services.database_service import get_database_service, DatabaseService
 
 logger = logging.getLogger(__name__)
@@ -49,22 +50,31 @@ class AnalysisService:
         limit: int = 10,
         artwork_name: Optional[str] = None,
         artist_name: Optional[str] = None,
-        style: Optional[str] = None
-    ) -> Tuple[List[AnalysisResponse], int]:
+        style: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        summary: bool = False
+    ) -> Tuple[List[Union[ArtworkAnalysisResponse, ArtworkAnalysisSummary]], Optional[str], Optional[int]]:
         try:
             return await self.db_service.get_analyses(
-                page=page, limit=limit, artwork_name=artwork_name, artist_name=artist_name, style=style
+                page=page, limit=limit, artwork_name=artwork_name, artist_name=artist_name, style=style,
+                cursor=cursor, include_total=include_total, summary=summary
             )
         except Exception as e:
             logger.error(f"Erro ao buscar análises no service: {e}")
             raise e
     
-    async def search_analyses_by_name(self, artwork_name: str) -> List[AnalysisResponse]:
+    async def search_analyses(
+        self, query: str, limit: int = 10, offset: int = 0
+    ) -> Tuple[List[ArtworkAnalysisResponse], int, bool]:
         try:
-            return await self.db_service.search_analyses_by_name(artwork_name)
+            return await self.db_service.search_analyses(query, limit=limit, offset=offset)
         except Exception as e:
-            logger.error(f"Erro na pesquisa por nome no service: {e}")
+            logger.error(f"Erro na pesquisa de análises no service: {e}")
             raise e
+
+    def suggest_artwork_names(self, prefix: str, limit: int = 10) -> List[str]:
+        return self.db_service.suggest_artwork_names(prefix, limit=limit)
     
     async def get_recent_analyses(self, limit: int = 5) -> List[AnalysisResponse]:
         try:
@@ -1,159 +1,503 @@
 # backend/app/services/database_service.py
 
+import asyncio
 import logging
-from typing import Optional, List, Tuple
-from motor.motor_asyncio import AsyncIOMotorClient
+from datetime import datetime, timedelta
+from typing import Dict, Optional, List, Tuple, Union
 from bson import ObjectId
-from app.core.config import settings
-from app.models.artwork_analysis import ArtworkAnalysisDB, ArtworkAnalysisResponse, ArtworkAnalysisCreate
+from app.core.config import settings, worker_processes
+from app.core.cache import TTLCache
+from app.core.metrics import record_cache_lookup, stage
+from app.core.bktree import BKTree
+from app.core.search_index import SearchIndex
+from app.core.stats import stats_increments, merge_increments, summarize_stats
+from app.core.utils import normalize_artwork_name, encode_cursor, decode_cursor
+from app.models.artwork_analysis import (
+    ArtworkAnalysisDB, ArtworkAnalysisResponse, ArtworkAnalysisSummary
+)
+from app.storage import AnalysisStore, ListFilters, create_analysis_store
 from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Cada sincronização dos índices volta a ler este intervalo antes da última análise vista:
+# o created_at é atribuído antes da escrita, que pode ficar visível um pouco mais tarde
+INDEX_SYNC_OVERLAP = timedelta(seconds=60)
+
 class DatabaseService:
-    """Serviço para gerenciar operações na base de dados MongoDB"""
+    """
+    Serviço para gerenciar operações na base de dados (MongoDB ou SQLite, ver
+    STORAGE_BACKEND): caches e índices em memória à frente do armazenamento.
+
+    Com vários processos (WEB_CONCURRENCY > 1) nada disto é partilhado: o cache de
+    respostas fica desligado e os índices em memória leem periodicamente as análises
+    criadas pelos outros processos. As removidas noutro processo saem dos índices
+    quando uma pesquisa (ou uma procura por semelhança) deixa de as encontrar.
+    """
         
-    def __init__(self):
-        self.client: Optional[AsyncIOMotorClient] = None
-        self.db = None
-        self.collection_name = "artwork_analyses"
+    def __init__(self, store: Optional[AnalysisStore] = None):
+        self.store = store or create_analysis_store()
+        self.shared_by_workers = worker_processes() > 1
+        self.response_cache = TTLCache(
+            maxsize=0 if self.shared_by_workers else settings.ANALYSIS_CACHE_MAX_SIZE,
+            ttl=settings.ANALYSIS_CACHE_TTL_SECONDS
+        )
+        self.perceptual_index = BKTree()
+        self.search_index = SearchIndex()
+        # created_at da análise mais recente lida do armazenamento para os índices em memória
+        self._indexed_until: Optional[datetime] = None
+        self._index_sync_task: Optional[asyncio.Task] = None
+        # Contadores de pedidos (cache hit/miss) acumulados em memória e escritos periodicamente
+        self._pending_stats: Dict[str, float] = {}
+        self._stats_flush_task: Optional[asyncio.Task] = None
     
+    @property
+    def is_connected(self) -> bool:
+        return self.store.connected
+
     async def connect(self):
         try:
-            self.client = AsyncIOMotorClient(settings.MONGODB_URI)
-            self.db = self.client.artell
-            await self.client.admin.command('ping')
-            logger.info("✅ Conectado ao MongoDB com sucesso!")
-            await self._create_indexes()
+            await self.store.connect()
+            await self.store.create_indexes()
+            await self._load_memory_indexes()
+            self._stats_flush_task = asyncio.create_task(self._flush_stats_periodically())
+            if self.shared_by_workers:
+                logger.info(
+                    f"ℹ️ {worker_processes()} processos: cache de respostas desligado, índices "
+                    f"sincronizados a cada {settings.MEMORY_INDEX_SYNC_INTERVAL_SECONDS:g}s"
+                )
+                self._index_sync_task = asyncio.create_task(self._sync_memory_indexes_periodically())
         except Exception as e:
-            logger.error(f"❌ Erro ao conectar ao MongoDB: {e}")
+            logger.error(f"❌ Erro ao conectar à base de dados ({self.store.name}): {e}")
             raise e
     
     async def disconnect(self):
-        if self.client:
-            self.client.close()
-            logger.info("✅ Conexão com MongoDB fechada!")
+        if self._index_sync_task:
+            self._index_sync_task.cancel()
+            self._index_sync_task = None
+        if self._stats_flush_task:
+            self._stats_flush_task.cancel()
+            self._stats_flush_task = None
+            await self.flush_stats()
+        await self.store.close()
     
-    async def _create_indexes(self):
+    async def _load_memory_indexes(self):
+        """
+        Reconstrói numa única passagem pela coleção os índices em memória:
+        hashes perceptuais e pesquisa por texto. Os documentos são lidos por
+        ordem de criação para que o índice de pesquisa saiba quais são os mais recentes.
+        """
         try:
-            collection = self.db[self.collection_name]
-            await collection.create_index("artwork_name")
-            await collection.create_index("image_hash")
-            await collection.create_index("created_at")
-            await collection.create_index("artist")
-            logger.info("✅ Índices criados com sucesso!")
+            self.perceptual_index.clear()
+            self.search_index.clear()
+            self._indexed_until = None
+            async for doc in self.store.iter_index_entries():
+                self._index_document(doc)
+                self._indexed_until = doc.get("created_at") or self._indexed_until
+            logger.info(
+                f"✅ Índices em memória carregados: {len(self.search_index)} análises, "
+                f"{len(self.perceptual_index)} imagens"
+            )
         except Exception as e:
-            logger.error(f"❌ Erro ao criar índices: {e}")
-            logger.warning("⚠️ Aplicação continuará sem índices otimizados")
+            logger.error(f"❌ Erro ao carregar índices em memória: {e}")
+
+    async def sync_memory_indexes(self) -> int:
+        """
+        Acrescenta aos índices em memória as análises criadas (por outros processos) desde
+        a última leitura; devolve quantas foram acrescentadas. As análises guardadas por
+        este processo já estão nos índices e não avançam a marca: só o que é lido do
+        armazenamento conta, para não saltar análises de outro processo com um created_at anterior.
+        """
+        since = self._indexed_until - INDEX_SYNC_OVERLAP if self._indexed_until else None
+        added = 0
+        async for doc in self.store.iter_index_entries(since):
+            if self._indexed_until is None or doc["created_at"] > self._indexed_until:
+                self._indexed_until = doc["created_at"]
+            if str(doc["_id"]) not in self.search_index:
+                self._index_document(doc)
+                added += 1
+        return added
+
+    async def _sync_memory_indexes_periodically(self):
+        while True:
+            await asyncio.sleep(settings.MEMORY_INDEX_SYNC_INTERVAL_SECONDS)
+            try:
+                added = await self.sync_memory_indexes()
+                if added:
+                    logger.info(f"🔄 {added} análises de outros processos acrescentadas aos índices em memória")
+            except Exception as e:
+                logger.error(f"Erro ao sincronizar índices em memória: {e}")
+
+    def _index_document(self, doc: dict):
+        analysis_id = str(doc["_id"])
+        self.search_index.add(analysis_id, doc.get("artwork_name") or "", doc.get("artist"), doc.get("style"))
+        if doc.get("perceptual_hash"):
+            self.perceptual_index.add(int(doc["perceptual_hash"], 16), analysis_id)
 
     async def get_analysis_by_image_hash(self, image_hash: str) -> Optional[ArtworkAnalysisResponse]:
+        cached_response = self.response_cache.get(("hash", image_hash))
+        if cached_response:
+            record_cache_lookup("hash", "memory_hit")
+            return cached_response
         try:
-            collection = self.db[self.collection_name]
-            result = await collection.find_one({"image_hash": image_hash})
+            with stage("hash_cache_lookup"):
+                result = await self.store.find_by_image_hash(image_hash)
             if result:
                 logger.info(f"Análise encontrada em cache pelo hash da imagem: {image_hash[:10]}...")
-                return self._convert_to_response(result, cached=True)
+                record_cache_lookup("hash", "db_hit")
+                return self._remember(result)
+            record_cache_lookup("hash", "miss")
             return None
         except Exception as e:
             logger.error(f"Erro ao buscar análise por hash de imagem: {e}")
             return None
 
+    async def get_analysis_by_perceptual_hash(self, perceptual_hash: str, max_distance: int) -> Optional[ArtworkAnalysisResponse]:
+        """Procura a análise de uma imagem visualmente idêntica (distância de Hamming <= max_distance)."""
+        with stage("perceptual_lookup"):
+            matches = self.perceptual_index.search(int(perceptual_hash, 16), max_distance)
+        for distance, analysis_id in matches:
+            try:
+                result = await self._find_by_id(analysis_id)
+            except Exception as e:
+                # Uma falha da base de dados não diz nada sobre a análise: o índice fica como está
+                logger.error(f"Erro ao buscar análise por semelhança visual: {e}")
+                return None
+            if result:
+                logger.info(f"Análise encontrada em cache por semelhança visual (distância {distance})")
+                record_cache_lookup("phash", "memory_hit")
+                return result
+            # A análise já não existe: retira-a do índice
+            self.perceptual_index.remove(analysis_id)
+        record_cache_lookup("phash", "miss")
+        return None
+
     async def get_analysis_by_name(self, artwork_name: str) -> Optional[ArtworkAnalysisResponse]:
+        name_key = normalize_artwork_name(artwork_name)
+        cached_response = self.response_cache.get(("name", name_key))
+        if cached_response:
+            record_cache_lookup("name", "memory_hit")
+            return cached_response
         try:
-            collection = self.db[self.collection_name]
-            result = await collection.find_one({
-                "artwork_name": {"$regex": f"^{artwork_name}$", "$options": "i"}
-            })
+            with stage("name_cache_lookup"):
+                result = await self.store.find_by_name_key(name_key)
             if result:
                 logger.info(f"Análise encontrada em cache para: {artwork_name}")
-                return self._convert_to_response(result, cached=True)
+                record_cache_lookup("name", "db_hit")
+                return self._remember(result)
+            record_cache_lookup("name", "miss")
             return None
         except Exception as e:
             logger.error(f"Erro ao buscar análise por nome: {e}")
             return None
     
-    async def save_analysis(self, analysis_data: dict, image_hash: Optional[str] = None) -> ArtworkAnalysisResponse:
+    async def get_analyses_by_name_keys(self, name_keys: List[str]) -> Dict[str, ArtworkAnalysisResponse]:
+        """Procura várias obras pelo nome normalizado: primeiro no cache, o resto numa só consulta $in."""
+        found = {}
+        missing = []
+        for name_key in name_keys:
+            cached_response = self.response_cache.get(("name", name_key))
+            if cached_response:
+                found[name_key] = cached_response
+                record_cache_lookup("name", "memory_hit")
+            else:
+                missing.append(name_key)
+
+        if missing:
+            try:
+                with stage("name_cache_lookup"):
+                    docs = await self.store.find_by_name_keys(missing)
+                for doc in docs:
+                    # Com duplicados, fica o primeiro documento encontrado (como no find_one)
+                    if doc["artwork_name_key"] not in found:
+                        found[doc["artwork_name_key"]] = self._remember(doc)
+                        record_cache_lookup("name", "db_hit")
+            except Exception as e:
+                logger.error(f"Erro ao buscar análises por nomes: {e}")
+            for name_key in missing:
+                if name_key not in found:
+                    record_cache_lookup("name", "miss")
+
+        return found
+
+    async def save_analysis(
+        self,
+        analysis_data: dict,
+        image_hash: Optional[str] = None,
+        perceptual_hash: Optional[str] = None
+    ) -> ArtworkAnalysisResponse:
         try:
-            collection = self.db[self.collection_name]
-            if image_hash:
-                analysis_data['image_hash'] = image_hash
+            analysis_dict = self._build_document(analysis_data, image_hash, perceptual_hash)
+            analysis_dict["_id"] = ObjectId()
 
-            analysis_to_create = ArtworkAnalysisCreate(**analysis_data)
-            analysis_doc = ArtworkAnalysisDB(**analysis_to_create.dict())
-            analysis_dict = analysis_doc.dict()
-            
-            result = await collection.insert_one(analysis_dict)
-            analysis_dict["_id"] = result.inserted_id
+            # Se outro pedido guardou a mesma obra (ou imagem) primeiro, o documento
+            # existente é devolvido em vez de se criar um duplicado
+            with stage("mongo_save"):
+                existing = await self.store.insert_unique(analysis_dict)
+            if existing:
+                logger.info(f"♻️ Análise já existente reutilizada: {existing['artwork_name']}")
+                return await self._reuse_existing(existing, analysis_dict)
             
             logger.info(f"Análise salva na base de dados: {analysis_data['artwork_name']}")
+            self._remember(analysis_dict)
+            self._index_document(analysis_dict)
+            await self._update_stats(stats_increments(analysis_dict))
             return self._convert_to_response(analysis_dict, cached=False)
         except Exception as e:
             logger.error(f"Erro ao salvar análise: {e}")
             raise Exception(f"Erro ao salvar análise: {str(e)}")
     
+    async def _reuse_existing(self, existing: dict, new_doc: dict) -> ArtworkAnalysisResponse:
+        """
+        Devolve a análise que ganhou a corrida. Se a nova vinha de uma imagem e a
+        existente ainda não tem hash, a imagem fica associada para futuros uploads.
+        """
+        if new_doc.get("image_hash") and not existing.get("image_hash"):
+            link = {"image_hash": new_doc["image_hash"]}
+            if new_doc.get("perceptual_hash"):
+                link["perceptual_hash"] = new_doc["perceptual_hash"]
+            if await self.store.link_image(existing["_id"], link):
+                existing.update(link)
+                if link.get("perceptual_hash"):
+                    self.perceptual_index.add(int(link["perceptual_hash"], 16), str(existing["_id"]))
+        return self._remember(existing)
+
+    def _build_document(
+        self, analysis_data: dict, image_hash: Optional[str] = None, perceptual_hash: Optional[str] = None
+    ) -> dict:
+        """Valida os dados de uma nova análise e constrói o documento a inserir."""
+        if image_hash:
+            analysis_data['image_hash'] = image_hash
+        if perceptual_hash:
+            analysis_data['perceptual_hash'] = perceptual_hash
+
+        # Uma única validação: o ArtworkAnalysisDB já tem todos os campos do ArtworkAnalysisCreate
+        artwork_name = analysis_data.get("artwork_name")
+        analysis_doc = ArtworkAnalysisDB(
+            **analysis_data,
+            artwork_name_key=normalize_artwork_name(artwork_name) if isinstance(artwork_name, str) else ""
+        )
+        return analysis_doc.model_dump()
+
     async def get_recent_analyses(self, limit: int = 10) -> List[ArtworkAnalysisResponse]:
         try:
-            collection = self.db[self.collection_name]
-            cursor = collection.find().sort("created_at", -1).limit(limit)
-            analyses = [self._convert_to_response(doc, cached=True) async for doc in cursor]
-            return analyses
+            docs = await self.store.list_analyses(ListFilters(), after=None, skip=0, limit=limit, summary=False)
+            return [self._convert_to_response(doc, cached=True) for doc in docs]
         except Exception as e:
             logger.error(f"Erro ao buscar análises recentes: {e}")
             return []
 
     async def get_analysis_by_id(self, analysis_id: str) -> Optional[ArtworkAnalysisResponse]:
         try:
-            collection = self.db[self.collection_name]
-            if not ObjectId.is_valid(analysis_id):
-                return None
-            result = await collection.find_one({"_id": ObjectId(analysis_id)})
-            if result:
-                return self._convert_to_response(result, cached=True)
-            return None
+            return await self._find_by_id(analysis_id)
         except Exception as e:
             logger.error(f"Erro ao buscar análise por ID: {e}")
             return None
 
+    async def _find_by_id(self, analysis_id: str) -> Optional[ArtworkAnalysisResponse]:
+        """Como get_analysis_by_id, mas os erros do armazenamento são propagados (None é sempre "não existe")."""
+        cached_response = self.response_cache.get(("id", analysis_id))
+        if cached_response:
+            record_cache_lookup("id", "memory_hit")
+            return cached_response
+        if not ObjectId.is_valid(analysis_id):
+            return None
+        result = await self.store.find_by_id(ObjectId(analysis_id))
+        if result:
+            record_cache_lookup("id", "db_hit")
+            return self._remember(result)
+        record_cache_lookup("id", "miss")
+        return None
+
+    async def delete_analysis(self, analysis_id: str) -> bool:
+        try:
+            if not ObjectId.is_valid(analysis_id):
+                return False
+            result = await self.store.delete(ObjectId(analysis_id))
+            if not result:
+                return False
+            self._forget(result)
+            self.perceptual_index.remove(analysis_id)
+            self.search_index.remove(analysis_id)
+            await self._update_stats(stats_increments(result, direction=-1))
+            logger.info(f"Análise removida da base de dados: {result['artwork_name']}")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao remover análise: {e}")
+            raise Exception(f"Erro ao remover análise: {str(e)}")
+
     async def get_analyses(
         self, 
         page: int = 1, 
         limit: int = 10,
         artwork_name: Optional[str] = None,
         artist_name: Optional[str] = None,
-        style: Optional[str] = None
-    ) -> Tuple[List[ArtworkAnalysisResponse], int]:
+        style: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        summary: bool = False
+    ) -> Tuple[List[Union[ArtworkAnalysisResponse, ArtworkAnalysisSummary]], Optional[str], Optional[int]]:
+        """
+        Lista análises da mais recente para a mais antiga, com paginação por cursor
+        sobre (created_at, _id). Devolve (análises, próximo cursor, total opcional).
+        O parâmetro `page` só é usado quando não é indicado um cursor.
+        Com `summary=True`, uma projeção evita ler o texto longo de cada análise.
+        """
+        filters = ListFilters(artwork_name=artwork_name, artist=artist_name, style=style)
+
+        after = None
+        if cursor:
+            # Lança ValueError para cursores inválidos (tratado no router)
+            last_created_at, last_id = decode_cursor(cursor)
+            if not ObjectId.is_valid(last_id):
+                raise ValueError("Cursor de paginação inválido")
+            after = (last_created_at, ObjectId(last_id))
+
         try:
-            collection = self.db[self.collection_name]
-            query = {}
-            if artwork_name:
-                query["artwork_name"] = {"$regex": artwork_name, "$options": "i"}
-            if artist_name:
-                query["artist"] = {"$regex": artist_name, "$options": "i"}
-            if style:
-                query["style"] = {"$regex": style, "$options": "i"}
-
-            total = await collection.count_documents(query)
-            skip_count = (page - 1) * limit
-            cursor = collection.find(query).skip(skip_count).limit(limit)
-            analyses = [self._convert_to_response(doc, cached=True) async for doc in cursor]
-            
-            return analyses, total
+            skip = (page - 1) * limit if not cursor and page > 1 else 0
+            # Pede um documento extra para saber se existe uma página seguinte
+            docs = await self.store.list_analyses(filters, after=after, skip=skip, limit=limit + 1, summary=summary)
+
+            next_cursor = None
+            if len(docs) > limit:
+                docs = docs[:limit]
+                next_cursor = encode_cursor(docs[-1]["created_at"], str(docs[-1]["_id"]))
+            if summary:
+                analyses = [self._convert_to_summary(doc) for doc in docs]
+            else:
+                analyses = [self._convert_to_response(doc, cached=True) for doc in docs]
+
+            total = await self.store.count(filters) if include_total else None
+
+            return analyses, next_cursor, total
         except Exception as e:
             logger.error(f"Erro ao buscar análises paginadas: {e}")
-            return [], 0
+            return [], None, 0 if include_total else None
+
+    async def search_analyses(
+        self, query: str, limit: int = 10, offset: int = 0
+    ) -> Tuple[List[ArtworkAnalysisResponse], int, bool]:
+        """
+        Pesquisa ordenada por relevância (com prefixos) no índice em memória.
+        Devolve (análises, total, total estimado): ver SearchIndex.search.
+        """
+        analysis_ids, total, total_is_estimate = self.search_index.search(query, limit=limit, offset=offset)
+        try:
+            found = await self._find_by_ids(analysis_ids)
+        except Exception as e:
+            logger.error(f"Erro ao buscar resultados da pesquisa: {e}")
+            return [], total, total_is_estimate
+        for analysis_id in analysis_ids:
+            if analysis_id not in found:
+                # Removida (ex.: por outro processo): sai dos índices deste
+                self.search_index.remove(analysis_id)
+                self.perceptual_index.remove(analysis_id)
+        return [found[analysis_id] for analysis_id in analysis_ids if analysis_id in found], total, total_is_estimate
+
+    def suggest_artwork_names(self, prefix: str, limit: int = 10) -> List[str]:
+        """Sugestões de nomes de obras para autocomplete."""
+        return self.search_index.suggest(prefix, limit=limit)
+
+    async def get_analyses_by_ids(self, analysis_ids: List[str]) -> List[ArtworkAnalysisResponse]:
+        """Busca várias análises numa só consulta, mantendo a ordem dos IDs pedidos."""
+        try:
+            found = await self._find_by_ids(analysis_ids)
+        except Exception as e:
+            logger.error(f"Erro ao buscar análises por IDs: {e}")
+            return []
+        return [found[analysis_id] for analysis_id in analysis_ids if analysis_id in found]
+
+    async def _find_by_ids(self, analysis_ids: List[str]) -> Dict[str, ArtworkAnalysisResponse]:
+        """Análises encontradas (no cache ou numa só consulta), por ID; os erros do armazenamento são propagados."""
+        found = {}
+        missing = []
+        for analysis_id in analysis_ids:
+            cached_response = self.response_cache.get(("id", analysis_id))
+            if cached_response:
+                found[analysis_id] = cached_response
+            elif ObjectId.is_valid(analysis_id):
+                missing.append(ObjectId(analysis_id))
+
+        if missing:
+            for doc in await self.store.find_by_ids(missing):
+                found[str(doc["_id"])] = self._remember(doc)
+        return found
 
     async def get_analysis_stats(self) -> dict:
+        """Lê o documento de estatísticas materializado: O(1), sem agregar a coleção."""
         try:
-            collection = self.db[self.collection_name]
-            total = await collection.count_documents({})
-            return {"total_analyses": total}
+            await self.flush_stats()
+            stats = await self.store.get_stats()
+            return {**summarize_stats(stats), "cache": self.response_cache.stats()}
         except Exception as e:
             logger.error(f"Erro ao buscar estatísticas: {e}")
-            return {"total_analyses": 0}
+            return {**summarize_stats(None), "cache": self.response_cache.stats()}
+
+    def record_request(self, cached: bool):
+        """Conta um pedido de análise servido do cache (hit) ou gerado pela IA (miss)."""
+        merge_increments(self._pending_stats, {"requests.cache_hits" if cached else "requests.cache_misses": 1})
+
+    async def flush_stats(self):
+        """Escreve os contadores de pedidos acumulados em memória numa única atualização."""
+        if not self._pending_stats:
+            return
+        pending, self._pending_stats = self._pending_stats, {}
+        try:
+            await self.store.increment_stats(pending)
+        except Exception as e:
+            # Os contadores voltam à fila e são escritos na próxima tentativa
+            merge_increments(self._pending_stats, pending)
+            logger.error(f"Erro ao guardar contadores de estatísticas: {e}")
+
+    async def _flush_stats_periodically(self):
+        while True:
+            await asyncio.sleep(settings.STATS_FLUSH_INTERVAL_SECONDS)
+            await self.flush_stats()
+
+    async def _update_stats(self, increments: Dict[str, float]):
+        """Aplica os incrementos de uma análise guardada ou removida (numa só operação atómica)."""
+        try:
+            await self.store.increment_stats(increments)
+        except Exception as e:
+            # A análise já está guardada: uma falha aqui só desatualiza as estatísticas
+            logger.error(f"Erro ao atualizar estatísticas: {e}")
+            logger.warning("⚠️ Para corrigir, execute: python -m app.migrations.rebuild_stats")
+
+    def _convert_to_summary(self, doc: dict) -> ArtworkAnalysisSummary:
+        """Converte um documento (projetado) para a resposta resumida da galeria."""
+        # Os documentos foram validados ao serem guardados: model_construct evita revalidá-los
+        return ArtworkAnalysisSummary.model_construct(
+            id=str(doc['_id']),
+            artwork_name=doc["artwork_name"],
+            artist=doc.get("artist"),
+            year=doc.get("year"),
+            style=doc.get("style"),
+            emotions=doc.get("emotions", []),
+            image_url=doc.get("image_url")
+        )
+
+    def _cache_keys(self, doc: dict) -> List[tuple]:
+        """Chaves sob as quais um documento fica guardado no cache em memória."""
+        keys = [("id", str(doc["_id"])), ("name", normalize_artwork_name(doc["artwork_name"]))]
+        if doc.get("image_hash"):
+            keys.append(("hash", doc["image_hash"]))
+        return keys
+
+    def _remember(self, doc: dict) -> ArtworkAnalysisResponse:
+        """Converte o documento e guarda a resposta pronta no cache em memória."""
+        response = self._convert_to_response(doc, cached=True)
+        for key in self._cache_keys(doc):
+            self.response_cache.set(key, response)
+        return response
+
+    def _forget(self, doc: dict):
+        """Invalida todas as entradas do cache em memória associadas ao documento."""
+        for key in self._cache_keys(doc):
+            self.response_cache.pop(key)
             
     def _convert_to_response(self, doc: dict, cached: bool) -> ArtworkAnalysisResponse:
-        """Converte documento da base de dados para resposta da API."""
-        return ArtworkAnalysisResponse(
+        """Converte documento da base de dados para resposta da API (sem revalidar, ver _convert_to_summary)."""
+        return ArtworkAnalysisResponse.model_construct(
             id=str(doc['_id']),
             artwork_name=doc["artwork_name"],
             analysis=doc["analysis"],
@@ -1,23 +1,70 @@
 # backend/app/services/groq_service.py
 
+import asyncio
 import httpx
+import importlib.util
+import math
 import time
 import logging
 import json
-from typing import Dict, Any, List, Optional
-from app.core.config import settings
-from app.core.utils import image_to_base64
+import re
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from app.core.config import settings, worker_processes
+from app.core.metrics import GROQ_IN_FLIGHT, GROQ_RESPONSES, observe_stage, record_groq_usage, stage
+from app.core.rate_limit import RateLimiter, RateLimitExceeded, backoff_delay, parse_duration
 from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Respostas da Groq que justificam repetir o pedido (o chat/completions não tem efeitos secundários)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Tokens contados por cada imagem de um pedido de visão (as imagens chegam já reduzidas a IMAGE_MAX_EDGE)
+IMAGE_TOKEN_ESTIMATE = 1600
+
+class GroqRateLimitError(Exception):
+    """A Groq continua a limitar os pedidos; o cliente deve tentar de novo após `retry_after` segundos."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Limite de pedidos da Groq atingido (tente novamente dentro de {math.ceil(retry_after)}s)")
+        self.retry_after = retry_after
+
+_CODE_FENCE_RE = re.compile(r"^```[\w-]*\s*(.*?)\s*```$", re.DOTALL)
+
+def parse_json_response(response_text: str) -> Dict[str, Any]:
+    """
+    Lê o objeto JSON de uma resposta da IA. Sem o modo JSON (ex.: em streaming) o
+    modelo pode envolvê-lo num bloco ```json ... ``` ou juntar-lhe texto: o bloco é
+    retirado e, se preciso, é usado o trecho entre a primeira '{' e a última '}'.
+    Lança ValueError se não houver um objeto JSON válido.
+    """
+    text = response_text.strip()
+    fenced = _CODE_FENCE_RE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            data = json.loads(text[start:end + 1]) if 0 <= start < end else None
+        except json.JSONDecodeError:
+            data = None
+    if not isinstance(data, dict):
+        logger.error(f"Erro ao descodificar JSON da Groq. Resposta recebida: {response_text}")
+        raise ValueError("A IA devolveu uma resposta que não é um objeto JSON válido")
+    return data
+
 class GroqService:
     """Serviço para interagir com a API da Groq"""
     
     def __init__(self):
         self.api_key_text = settings.GROQ_API_KEY
         self.api_key_image = settings.GROQ_IMAGE_API_KEY or settings.GROQ_API_KEY
-        self.base_url = "https://api.groq.com/openai/v1"
+        self.base_url = settings.GROQ_BASE_URL
+        self.client: Optional[httpx.AsyncClient] = None
+        self.http2 = False
+        # Um limitador por par (chave de API, modelo)
+        self.limiters: Dict[Tuple[str, str], RateLimiter] = {}
         
         self.text_model = settings.GROQ_TEXT_MODEL
         self.vision_model = settings.GROQ_VISION_MODEL
@@ -25,54 +72,120 @@ class GroqService:
         self.max_tokens = settings.GROQ_MAX_TOKENS
         self.temperature = settings.GROQ_TEMPERATURE
 
-    async def analyze_artwork(self, artwork_name: str) -> Dict[str, Any]:
-        """Analisa uma obra de arte usando o modelo de texto."""
+    async def start(self):
+        """Abre o cliente HTTP partilhado usado em todas as chamadas à Groq."""
+        self._get_client()
+        logger.info(f"✅ Cliente HTTP da Groq pronto (HTTP/2: {self.http2})")
+
+    async def close(self):
+        """Fecha o cliente HTTP partilhado e liberta as ligações do pool."""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+            logger.info("✅ Cliente HTTP da Groq fechado!")
+
+    async def ping(self):
+        """Verifica que a API da Groq responde e aceita a chave (GET /models, não gasta tokens)."""
+        response = await self._get_client().get(
+            "/models", headers={"Authorization": f"Bearer {self.api_key_text}"}
+        )
+        response.raise_for_status()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Devolve o cliente partilhado, criando-o se ainda não existir."""
+        if self.client is None:
+            self.http2 = settings.GROQ_HTTP2
+            if self.http2 and importlib.util.find_spec("h2") is None:
+                logger.warning("⚠️ Pacote 'h2' não instalado, a usar HTTP/1.1 com a Groq")
+                self.http2 = False
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=settings.GROQ_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(
+                    connect=settings.GROQ_CONNECT_TIMEOUT,
+                    read=settings.GROQ_READ_TIMEOUT,
+                    write=settings.GROQ_WRITE_TIMEOUT,
+                    pool=settings.GROQ_POOL_TIMEOUT,
+                ),
+            )
+        return self.client
+
+    async def analyze_artwork(
+        self, artwork_name: str, on_delta: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analisa uma obra de arte usando o modelo de texto. Se `on_delta` for
+        indicado, a resposta é pedida em streaming e cada fragmento é entregue à medida que chega.
+        """
         start_time = time.time()
         try:
             prompt = self._build_powerful_analysis_prompt(artwork_name)
             logger.info(f"Iniciando análise aprofundada para: {artwork_name}")
             payload = self._build_text_payload(prompt)
-            response_text = await self._call_groq_api(payload)
+            with stage("groq_analyze"):
+                if on_delta:
+                    response_text = await self._stream_groq_api(payload, on_delta)
+                else:
+                    response_text = await self._call_groq_api(payload)
             processing_time = time.time() - start_time
             analysis_data = self._extract_analysis_data(response_text, artwork_name, processing_time)
             logger.info(f"Análise concluída para {artwork_name} em {processing_time:.2f}s")
             return analysis_data
+        except GroqRateLimitError:
+            raise
         except Exception as e:
             logger.error(f"Erro na análise da obra {artwork_name}: {str(e)}")
             raise Exception(f"Erro na análise da obra: {str(e)}")
 
-    async def analyze_artwork_from_image(self, image_data: bytes) -> Dict[str, Any]:
-        """Analisa uma obra de arte a partir de uma imagem usando o modelo de visão."""
+    async def analyze_artwork_from_image(
+        self,
+        base64_image: str,
+        mime_type: str = "image/jpeg",
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Analisa uma obra de arte a partir de uma imagem (já em base64) usando o modelo de visão."""
         start_time = time.time()
         try:
             prompt = self._build_powerful_analysis_prompt("a obra de arte na imagem")
-            base64_image = image_to_base64(image_data)
             logger.info("Iniciando análise de imagem com Groq...")
-            payload = self._build_vision_payload(prompt, base64_image)
-            response_text = await self._call_groq_api(payload, is_vision=True)
+            payload = self._build_vision_payload(prompt, base64_image, mime_type)
+            with stage("groq_analyze"):
+                if on_delta:
+                    response_text = await self._stream_groq_api(payload, on_delta, is_vision=True)
+                else:
+                    response_text = await self._call_groq_api(payload, is_vision=True)
             processing_time = time.time() - start_time
             analysis_data = self._extract_analysis_data(response_text, "Obra de arte da imagem", processing_time)
             logger.info(f"Análise de imagem concluída em {processing_time:.2f}s")
             return analysis_data
+        except GroqRateLimitError:
+            raise
         except Exception as e:
             logger.error(f"Erro na análise da imagem: {str(e)}")
             raise Exception(f"Erro na análise da imagem: {str(e)}")
 
-    async def identify_artwork_from_image(self, image_data: bytes) -> Optional[Dict[str, str]]:
-        """Identifica o nome de uma obra de arte a partir de uma imagem."""
+    async def identify_artwork_from_image(self, base64_image: str, mime_type: str = "image/jpeg") -> Optional[Dict[str, str]]:
+        """Identifica o nome de uma obra de arte a partir de uma imagem (já em base64)."""
         try:
             prompt = self._build_identification_prompt()
-            base64_image = image_to_base64(image_data)
             logger.info("Iniciando identificação de imagem com Groq...")
-            payload = self._build_vision_payload(prompt, base64_image, max_tokens=256)
-            response_text = await self._call_groq_api(payload, is_vision=True)
-            data = json.loads(response_text)
+            payload = self._build_vision_payload(prompt, base64_image, mime_type, max_tokens=256)
+            with stage("groq_identify"):
+                response_text = await self._call_groq_api(payload, is_vision=True)
+            data = parse_json_response(response_text)
             artwork_name = data.get("artwork_name")
             if artwork_name and artwork_name.lower() not in ["desconhecido", "não identificado"]:
                 logger.info(f"Obra identificada como: {artwork_name}")
                 return {"artwork_name": artwork_name}
             logger.warning("Não foi possível identificar a obra de arte na imagem.")
             return None
+        except GroqRateLimitError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao identificar obra na imagem: {str(e)}")
             return None
@@ -110,7 +223,9 @@ class GroqService:
         NÃO inclua nenhuma outra informação, apenas o JSON.
         """
 
-    def _build_vision_payload(self, prompt: str, base64_image: str, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    def _build_vision_payload(
+        self, prompt: str, base64_image: str, mime_type: str, max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
         """Constrói o payload para uma requisição de visão (com imagem)."""
         return {
             "model": self.vision_model,
@@ -121,7 +236,7 @@ class GroqService:
                         {"type": "text", "text": prompt},
                         {
                             "type": "image_url",
-                            "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
+                            "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}
                         }
                     ]
                 }
@@ -146,20 +261,15 @@ class GroqService:
     async def _call_groq_api(self, payload: Dict[str, Any], is_vision: bool = False) -> str:
         """Faz a chamada à API da Groq com o payload e tipo de modelo corretos."""
         try:
-            api_key_to_use = self.api_key_image if is_vision else self.api_key_text
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {api_key_to_use}"
-            }
-            async with httpx.AsyncClient(timeout=90.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                response_data = response.json()
-                return response_data["choices"][0]["message"]["content"]
+            with GROQ_IN_FLIGHT.labels(payload["model"]).track_inprogress():
+                response, limiter, estimated_tokens = await self._send(payload, is_vision)
+            response_data = response.json()
+            usage = response_data.get("usage") or {}
+            limiter.refund(estimated_tokens, usage.get("total_tokens"))
+            record_groq_usage(payload["model"], usage)
+            return response_data["choices"][0]["message"]["content"]
+        except GroqRateLimitError:
+            raise
         except httpx.TimeoutException:
             logger.error("Timeout na chamada à API da Groq")
             raise Exception("Timeout na comunicação com a Groq")
@@ -170,35 +280,190 @@ class GroqService:
             logger.error(f"Erro na chamada à API da Groq: {str(e)}")
             raise Exception(f"Erro na comunicação com a Groq: {str(e)}")
             
-    def _extract_analysis_data(self, response_text: str, original_artwork_name: str, processing_time: float) -> Dict[str, Any]:
+    async def _stream_groq_api(
+        self, payload: Dict[str, Any], on_delta: Callable[[str], None], is_vision: bool = False
+    ) -> str:
+        """Chama a Groq com stream=True, entrega cada fragmento a `on_delta` e devolve o texto completo."""
         try:
-            data = json.loads(response_text)
-
-            year_from_ai = data.get("year")
-            if year_from_ai is not None:
-                year_from_ai = str(year_from_ai)
-            return {
-                "artwork_name": data.get("artwork_name", original_artwork_name),
-                "analysis": data.get("analysis", "Análise não disponível.").strip(),
-                "artist": data.get("artist"),
-                "year": year_from_ai,
-                "style": data.get("style"),
-                "emotions": data.get("emotions", []),
-                "image_url": data.get("image_url"), # <-- Extrair o URL da imagem
-                "processing_time": processing_time
-            }
-        except json.JSONDecodeError:
-            logger.error(f"Erro ao descodificar JSON da Groq. Resposta recebida: {response_text}")
-            return {
-                "artwork_name": original_artwork_name,
-                "analysis": "A IA não conseguiu estruturar a análise, mas a mensagem central parece ser um poderoso manifesto sobre resiliência e a condição humana.",
-                "artist": "Desconhecido",
-                "year": "Desconhecido",
-                "style": "Contestatário",
-                "emotions": ["struggle", "resilience", "hope"],
-                "image_url": None,
-                "processing_time": processing_time
-            }
+            # O modo JSON da Groq não aceita streaming; o prompt já exige uma resposta em JSON
+            stream_payload = {k: v for k, v in payload.items() if k != "response_format"}
+            stream_payload["stream"] = True
+
+            chunks = []
+            used_tokens = None
+            # As repetições só acontecem antes do primeiro fragmento (o estado HTTP chega antes do corpo)
+            with GROQ_IN_FLIGHT.labels(payload["model"]).track_inprogress():
+                response, limiter, estimated_tokens = await self._send(stream_payload, is_vision, stream=True)
+                try:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        # A Groq envia o consumo de tokens no último fragmento, em x_groq.usage
+                        usage = (chunk.get("x_groq") or {}).get("usage")
+                        if usage:
+                            record_groq_usage(payload["model"], usage)
+                            used_tokens = usage.get("total_tokens")
+                        choices = chunk.get("choices") or [{}]
+                        delta = choices[0].get("delta", {}).get("content")
+                        if delta:
+                            chunks.append(delta)
+                            on_delta(delta)
+                finally:
+                    await response.aclose()
+                    if used_tokens is None:
+                        # Stream interrompido antes do consumo final: o prompt mais o texto já gerado
+                        prompt_tokens = estimated_tokens - stream_payload.get("max_tokens", self.max_tokens)
+                        used_tokens = prompt_tokens + sum(len(text) for text in chunks) // 4
+                    limiter.refund(estimated_tokens, used_tokens)
+            return "".join(chunks)
+        except GroqRateLimitError:
+            raise
+        except httpx.TimeoutException:
+            logger.error("Timeout na chamada à API da Groq")
+            raise Exception("Timeout na comunicação com a Groq")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Erro na API Groq: {e.response.status_code} - {e.response.text}")
+            raise Exception(f"Erro na API Groq: {e.response.status_code}")
+        except Exception as e:
+            logger.error(f"Erro na chamada à API da Groq: {str(e)}")
+            raise Exception(f"Erro na comunicação com a Groq: {str(e)}")
+
+    async def _send(
+        self, payload: Dict[str, Any], is_vision: bool, stream: bool = False
+    ) -> Tuple[httpx.Response, RateLimiter, int]:
+        """
+        Envia o pedido passando pelo limitador da chave e do modelo. Respostas 429/5xx
+        e falhas de ligação são repetidas com backoff exponencial (ou após o Retry-After).
+        Devolve a resposta bem-sucedida, o limitador usado e os tokens reservados.
+        """
+        api_key_to_use = self.api_key_image if is_vision else self.api_key_text
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key_to_use}"
+        }
+        limiter = self._get_limiter(api_key_to_use, payload["model"])
+        estimated_tokens = self._estimate_tokens(payload)
+        client = self._get_client()
+
+        for attempt in range(settings.GROQ_MAX_RETRIES + 1):
+            try:
+                waited = await limiter.acquire(estimated_tokens)
+            except RateLimitExceeded as e:
+                logger.warning(f"⏳ Limitador local da Groq cheio ({payload['model']}): {e}")
+                raise GroqRateLimitError(e.retry_after)
+            observe_stage("groq_limiter_wait", waited)
+            if waited > 0.1:
+                logger.info(f"⏳ Pedido à Groq esperou {waited:.2f}s no limitador ({payload['model']})")
+
+            try:
+                request = client.build_request("POST", "/chat/completions", headers=headers, json=payload)
+                response = await client.send(request, stream=stream)
+            except httpx.RequestError as e:
+                GROQ_RESPONSES.labels(payload["model"], "error").inc()
+                # O pedido não chegou à Groq: a reserva desta tentativa volta ao balde
+                limiter.refund(estimated_tokens, 0)
+                if not isinstance(e, (httpx.ConnectError, httpx.RemoteProtocolError)) or attempt >= settings.GROQ_MAX_RETRIES:
+                    raise
+                delay = backoff_delay(attempt, settings.GROQ_BACKOFF_BASE_SECONDS, settings.GROQ_BACKOFF_MAX_SECONDS)
+                logger.warning(f"⚠️ Falha de ligação à Groq ({e}), nova tentativa dentro de {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            GROQ_RESPONSES.labels(payload["model"], str(response.status_code)).inc()
+            limiter.learn(response.headers)
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                if response.is_error:
+                    await response.aread()
+                    await response.aclose()
+                    limiter.refund(estimated_tokens, 0)
+                response.raise_for_status()
+                return response, limiter, estimated_tokens
+
+            await response.aread()
+            await response.aclose()
+            # Cada tentativa volta a reservar tokens: a reserva da tentativa rejeitada é devolvida
+            limiter.refund(estimated_tokens, 0)
+            retry_after = parse_duration(response.headers.get("retry-after"))
+            delay = retry_after if retry_after is not None else backoff_delay(
+                attempt, settings.GROQ_BACKOFF_BASE_SECONDS, settings.GROQ_BACKOFF_MAX_SECONDS
+            )
+            if response.status_code == 429:
+                # Todos os pedidos desta chave e modelo esperam, não só este
+                limiter.block_for(delay)
+            if attempt >= settings.GROQ_MAX_RETRIES or delay > settings.GROQ_RATE_LIMIT_MAX_WAIT_SECONDS:
+                if response.status_code in (429, 503):
+                    raise GroqRateLimitError(delay)
+                response.raise_for_status()
+
+            logger.warning(
+                f"⚠️ Groq respondeu {response.status_code}, nova tentativa "
+                f"({attempt + 1}/{settings.GROQ_MAX_RETRIES}) dentro de {delay:.2f}s"
+            )
+            if response.status_code != 429:
+                await asyncio.sleep(delay)
+
+        raise RuntimeError("Número de tentativas à Groq esgotado")
+
+    def _get_limiter(self, api_key: str, model: str) -> RateLimiter:
+        limiter = self.limiters.get((api_key, model))
+        if limiter is None:
+            # Os processos do servidor partilham os limites da Groq: cada um fica com a sua
+            # parte, tanto dos limites configurados como dos anunciados nos cabeçalhos x-ratelimit-*
+            limiter = self.limiters[(api_key, model)] = RateLimiter(
+                requests_per_minute=settings.GROQ_RATE_LIMIT_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.GROQ_RATE_LIMIT_TOKENS_PER_MINUTE,
+                max_wait=settings.GROQ_RATE_LIMIT_MAX_WAIT_SECONDS,
+                share=1 / worker_processes(),
+            )
+        return limiter
+
+    def _estimate_tokens(self, payload: Dict[str, Any]) -> int:
+        """Estimativa grosseira (4 caracteres por token) do prompt e das imagens mais a resposta máxima."""
+        characters = images = 0
+        for message in payload["messages"]:
+            content = message["content"]
+            if isinstance(content, str):
+                characters += len(content)
+            else:
+                characters += sum(len(part.get("text", "")) for part in content)
+                images += sum(1 for part in content if part.get("type") == "image_url")
+        return characters // 4 + images * IMAGE_TOKEN_ESTIMATE + payload.get("max_tokens", self.max_tokens)
+
+    def rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        """Estatísticas dos limitadores (tempos de espera, pedidos limitados), sem expor as chaves."""
+        return {
+            f"{model} (…{api_key[-4:]})": limiter.stats()
+            for (api_key, model), limiter in self.limiters.items()
+        }
+
+    def _extract_analysis_data(self, response_text: str, original_artwork_name: str, processing_time: float) -> Dict[str, Any]:
+        """
+        Converte a resposta da IA nos campos da análise. Uma resposta que não seja JSON,
+        ou sem o campo "analysis", lança ValueError: um texto de recurso seria guardado
+        e servido para sempre.
+        """
+        data = parse_json_response(response_text)
+        analysis = data.get("analysis")
+        if not isinstance(analysis, str) or not analysis.strip():
+            raise ValueError("A resposta da IA não contém o campo 'analysis'")
+
+        year_from_ai = data.get("year")
+        if year_from_ai is not None:
+            year_from_ai = str(year_from_ai)
+        return {
+            "artwork_name": data.get("artwork_name", original_artwork_name),
+            "analysis": analysis.strip(),
+            "artist": data.get("artist"),
+            "year": year_from_ai,
+            "style": data.get("style"),
+            "emotions": data.get("emotions", []),
+            "image_url": data.get("image_url"), # <-- Extrair o URL da imagem
+            "processing_time": processing_time
+        }
 
 @lru_cache()
 def get_groq_service() -> GroqService:
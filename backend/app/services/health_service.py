@@ -0,0 +1,88 @@
+# backend/app/services/health_service.py
+
+import asyncio
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.database_service import get_database_service, DatabaseService
+from app.services.groq_service import get_groq_service, GroqService
+
+logger = logging.getLogger(__name__)
+
+class HealthService:
+    """
+    Sondas de saúde de cada processo. A vitalidade (live) só mostra que o event loop
+    responde; a prontidão (ready) exige que o arranque tenha terminado (clientes abertos,
+    índices em memória carregados) e que a base de dados responda.
+    Os resultados das verificações ficam em cache e as sondas simultâneas partilham a
+    mesma verificação: os health checks do balanceador nunca multiplicam os pedidos
+    ao MongoDB ou à Groq, nem quando estes estão em baixo.
+    """
+
+    def __init__(self, db_service: DatabaseService, groq_service: GroqService):
+        self.db_service = db_service
+        self.groq_service = groq_service
+        self.started = False
+        self.stopping = False
+        self.results = TTLCache(maxsize=8, ttl=settings.HEALTH_PROBE_TTL_SECONDS)
+        self.flights = SingleFlight("saúde")
+
+    def mark_started(self):
+        self.started = True
+
+    def mark_stopping(self):
+        self.started = False
+        self.stopping = True
+        # Nenhuma sonda seguinte pode reutilizar um resultado de antes do encerramento
+        self.results.clear()
+
+    async def check(self, name: str, probe: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        result = self.results.get(name)
+        if result is None:
+            result = await self.flights.do(name, lambda: self._run_probe(name, probe))
+        return result
+
+    async def _run_probe(self, name: str, probe: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+            result = {"status": "ok"}
+        except Exception as e:
+            logger.warning(f"⚠️ Sonda de saúde '{name}' falhou: {e!r}")
+            result = {"status": "error", "error": str(e) or type(e).__name__}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self.results.set(name, result)
+        return result
+
+    async def check_database(self) -> Dict[str, Any]:
+        return await self.check("database", self.db_service.store.ping)
+
+    async def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        if self.stopping:
+            # Antes de qualquer cache: o balanceador deixa logo de enviar tráfego a este processo
+            return False, {"status": "stopping", "started": False, "checks": {}}
+        database, groq = await asyncio.gather(
+            self.check_database(),
+            self.check("groq", self.groq_service.ping),
+        )
+        ready = (
+            self.started
+            and database["status"] == "ok"
+            and (groq["status"] == "ok" or not settings.HEALTH_READY_REQUIRES_GROQ)
+        )
+        return ready, {
+            "status": "ready" if ready else "not_ready",
+            "started": self.started,
+            "checks": {"database": database, "groq": groq},
+        }
+
+@lru_cache()
+def get_health_service() -> HealthService:
+    return HealthService(
+        db_service=get_database_service(),
+        groq_service=get_groq_service()
+    )
@@ -0,0 +1,84 @@
+# backend/app/services/image_service.py
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from typing import Optional
+from app.core.config import settings
+from app.core.images import PreparedImage, prepare_image
+
+logger = logging.getLogger(__name__)
+
+class ImageService:
+    """
+    Prepara as imagens enviadas antes das chamadas de visão. O trabalho do
+    Pillow corre num pool de processos para nunca bloquear o event loop.
+    """
+
+    def __init__(self):
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self._restart_lock = asyncio.Lock()
+
+    async def start(self):
+        if self.pool is None:
+            # "spawn" evita fazer fork de um processo que já tem threads (ex.: Motor)
+            self.pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            # Arranca os processos já no startup, para o primeiro upload não pagar esse custo
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[
+                loop.run_in_executor(self.pool, int) for _ in range(settings.IMAGE_PROCESS_WORKERS)
+            ])
+            logger.info(f"✅ Pool de processamento de imagens pronto ({settings.IMAGE_PROCESS_WORKERS} processos)")
+
+    async def close(self):
+        if self.pool:
+            pool, self.pool = self.pool, None
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+            logger.info("✅ Pool de processamento de imagens encerrado!")
+
+    async def prepare(self, image_data: bytes) -> PreparedImage:
+        """Normaliza a imagem (orientação, tamanho e formato) para enviar à Groq."""
+        task = partial(
+            prepare_image,
+            image_data,
+            settings.IMAGE_MAX_EDGE,
+            settings.IMAGE_OUTPUT_FORMAT,
+            settings.IMAGE_OUTPUT_QUALITY,
+        )
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            prepared = await loop.run_in_executor(pool, task)
+        except BrokenProcessPool:
+            await self._replace_broken_pool(pool)
+            prepared = await loop.run_in_executor(self.pool, task)
+
+        logger.info(
+            f"🖼️ Imagem preparada: {len(image_data) // 1024}KB → {len(prepared.data) // 1024}KB "
+            f"({prepared.width}x{prepared.height}, {prepared.mime_type})"
+        )
+        return prepared
+
+    async def _replace_broken_pool(self, broken_pool: Optional[ProcessPoolExecutor]):
+        """
+        Recria o pool uma única vez: vários pedidos podem ver o mesmo pool corrompido ao
+        mesmo tempo, e só o primeiro o substitui (os outros usam o novo, já saudável).
+        """
+        async with self._restart_lock:
+            if self.pool is not broken_pool:
+                return
+            logger.warning("⚠️ Pool de imagens corrompido, a recriar...")
+            if broken_pool:
+                broken_pool.shutdown(wait=False)
+            self.pool = None
+            await self.start()
+
+@lru_cache()
+def get_image_service() -> ImageService:
+    return ImageService()
@@ -0,0 +1,202 @@
+# backend/app/services/image_url_service.py
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import httpx
+from functools import lru_cache
+from typing import List, Optional
+from urllib.parse import urlsplit
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# Redirecionamentos seguidos por verificação (cada destino é validado antes do pedido)
+MAX_REDIRECTS = 3
+
+class UnsafeUrlError(Exception):
+    """O URL não é http(s) ou aponta para um endereço que não é público (rede interna, loopback, metadados da cloud)."""
+
+class ImageUrlService:
+    """
+    Encontra um URL de imagem válido para uma obra. Os candidatos são verificados
+    em paralelo com um cliente HTTP partilhado: o primeiro que responder com uma
+    imagem ganha e as restantes verificações são canceladas. Os resultados
+    (positivos e negativos) ficam em cache, tal como os servidores inacessíveis.
+
+    Os URLs vêm do modelo e são pedidos pelo servidor: só são contactados endereços
+    públicos, verificados de novo em cada redirecionamento. A ligação é feita ao
+    endereço verificado, para que o DNS não possa responder outro entretanto.
+    """
+
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+        self.cache = TTLCache(
+            maxsize=settings.IMAGE_URL_CACHE_MAX_SIZE,
+            ttl=settings.IMAGE_URL_CACHE_TTL_SECONDS
+        )
+
+    async def start(self):
+        self._get_client()
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+            logger.info("✅ Cliente HTTP de verificação de imagens fechado!")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=settings.IMAGE_URL_PROBE_TIMEOUT,
+                # Os redirecionamentos são seguidos em _fetch, que valida cada destino
+                follow_redirects=False,
+                limits=httpx.Limits(max_connections=settings.IMAGE_URL_MAX_CONNECTIONS),
+            )
+        return self.client
+
+    async def find_valid_image_url(
+        self, artwork_name: Optional[str], artist: Optional[str], suggested_url: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Devolve o primeiro URL de imagem válido entre os candidatos, começando pelo
+        `suggested_url` que o modelo indicou na análise.
+        """
+        candidates = self._candidate_urls(artwork_name, artist, suggested_url)
+
+        to_probe = []
+        for url in candidates:
+            valid = self.cache.get(("url", url))
+            if valid:
+                return url
+            if valid is None and self.cache.get(("host", urlsplit(url).netloc)) is None:
+                to_probe.append(url)
+
+        if not to_probe:
+            logger.warning("Nenhum URL de imagem válido (todos os candidatos já falharam recentemente).")
+            return None
+
+        tasks = [asyncio.create_task(self._probe(url)) for url in to_probe]
+        try:
+            with stage("url_probe"):
+                for next_done in asyncio.as_completed(tasks):
+                    url = await next_done
+                    if url:
+                        logger.info(f"URL de imagem válida encontrada: {url}")
+                        return url
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        logger.warning("Nenhum URL de imagem válido foi encontrado após todas as tentativas.")
+        return None
+
+    def _candidate_urls(
+        self, artwork_name: Optional[str], artist: Optional[str], suggested_url: Optional[str]
+    ) -> List[str]:
+        potential_urls = []
+        if suggested_url and suggested_url.startswith(("http://", "https://")):
+            potential_urls.append(suggested_url)
+
+        # AQUI É ONDE VOCÊ PRECISARÁ INTEGRAR O SEU SERVIÇO DE BUSCA DE IMAGENS.
+        # Exemplo de URLs que poderiam vir de uma API de busca:
+        # Por exemplo: google_search(f'{artwork_name} {artist} high quality image')
+        if artwork_name:
+            potential_urls.append(f"https://example.com/images/{artwork_name.replace(' ', '_')}.jpg")
+        potential_urls += [
+            "https://www.wikipedia.org/some_other_image.png",
+            "https://broken-link.com/image.jpg"
+        ]
+
+        return list(dict.fromkeys(potential_urls))
+
+    async def _probe(self, url: str) -> Optional[str]:
+        """Verifica se o URL aponta para uma imagem; devolve-o em caso afirmativo."""
+        try:
+            response = await self._fetch("HEAD", url)
+            if response.status_code in (403, 405):
+                # Alguns servidores não aceitam HEAD: pede só o primeiro byte
+                response = await self._fetch("GET", url, headers={"Range": "bytes=0-0"})
+            valid = response.status_code in (200, 206) and response.headers.get('content-type', '').startswith('image')
+        except (UnsafeUrlError, httpx.InvalidURL) as e:
+            logger.warning(f"URL de imagem recusado {url}: {e}")
+            valid = False
+        except httpx.ConnectError as e:
+            logger.warning(f"Erro ao verificar URL {url}: {e}")
+            # Servidor inacessível (DNS ou ligação recusada): nenhum URL desse servidor é verificado durante algum tempo
+            self.cache.set(("host", urlsplit(url).netloc), False, ttl=settings.IMAGE_URL_NEGATIVE_CACHE_TTL_SECONDS)
+            valid = False
+        except httpx.RequestError as e:
+            # Ex.: um timeout de leitura só diz respeito a este URL, não ao servidor inteiro
+            logger.warning(f"Erro ao verificar URL {url}: {e}")
+            valid = False
+
+        self.cache.set(
+            ("url", url), valid,
+            ttl=settings.IMAGE_URL_CACHE_TTL_SECONDS if valid else settings.IMAGE_URL_NEGATIVE_CACHE_TTL_SECONDS
+        )
+        return url if valid else None
+
+    async def _fetch(self, method: str, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """
+        Faz o pedido (sem ler o corpo) seguindo até MAX_REDIRECTS redirecionamentos.
+        Cada destino é validado antes de ser contactado, e a ligação vai para o endereço validado.
+        """
+        client = self._get_client()
+        request = client.build_request(method, url, headers=headers)
+        for _ in range(MAX_REDIRECTS + 1):
+            addresses = await self._check_public_url(request.url)
+            response = await client.send(self._pin(request, addresses[0]), stream=True)
+            await response.aclose()
+            if not response.has_redirect_location:
+                return response
+            # Resolvido a partir do URL original: o pedido enviado usa o endereço IP
+            location = request.url.join(response.headers["location"])
+            request = client.build_request(method, location, headers=headers)
+        raise UnsafeUrlError(f"mais de {MAX_REDIRECTS} redirecionamentos")
+
+    @staticmethod
+    def _pin(request: httpx.Request, address: str) -> httpx.Request:
+        """
+        Copia o pedido trocando o servidor pelo endereço já validado. O cabeçalho Host
+        e o nome enviado no TLS (SNI, também usado para validar o certificado) mantêm-se.
+        """
+        return httpx.Request(
+            request.method,
+            request.url.copy_with(host=address),
+            headers=request.headers,
+            extensions={**request.extensions, "sni_hostname": request.url.host},
+        )
+
+    async def _check_public_url(self, url: httpx.URL) -> List[str]:
+        """
+        Devolve os endereços para que o servidor do URL resolve. Lança UnsafeUrlError se
+        o URL não for http(s) ou se algum endereço não for público.
+        """
+        if url.scheme not in ("http", "https") or not url.host:
+            raise UnsafeUrlError(f"esquema ou servidor inválido ({url.scheme}://{url.host})")
+        addresses = await self._resolve(url.host, url.port or (443 if url.scheme == "https" else 80))
+        for address in addresses:
+            ip = ipaddress.ip_address(address.split("%", 1)[0])
+            if ip.version == 6 and ip.ipv4_mapped:
+                ip = ip.ipv4_mapped
+            # is_global exclui redes privadas, loopback, link-local (169.254.0.0/16), reservadas, etc.
+            if not ip.is_global or ip.is_multicast:
+                raise UnsafeUrlError(f"{url.host} resolve para um endereço não público ({ip})")
+        if not addresses:
+            raise httpx.ConnectError(f"Não foi possível resolver {url.host}")
+        return addresses
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise httpx.ConnectError(f"Não foi possível resolver {host}: {e}")
+        return [sockaddr[0] for *_, sockaddr in infos]
+
+@lru_cache()
+def get_image_url_service() -> ImageUrlService:
+    return ImageUrlService()
@@ -0,0 +1,296 @@
+# backend/app/services/job_service.py
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+from bson import Binary, ObjectId
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.core.images import InvalidImageError
+from app.models.analysis_job import AnalysisJobResponse, JobKind, JobStatus
+from app.models.artwork_analysis import ArtworkAnalysisResponse
+from app.services.database_service import get_database_service, DatabaseService
+from app.services.groq_service import GroqRateLimitError
+from app.services.pipeline_service import get_pipeline_service, PipelineService
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value)
+
+class JobService:
+    """
+    Fila de análises assíncronas guardada no MongoDB. O pedido HTTP só regista o
+    job; um conjunto limitado de trabalhadores por tipo de modelo (texto / visão)
+    executa o pipeline. Cada job é reservado com um prazo (lease) renovado enquanto
+    corre: se a instância morrer, o job volta a ficar disponível quando o prazo expira.
+    """
+
+    def __init__(self, db_service: DatabaseService, pipeline_service: PipelineService):
+        self.db_service = db_service
+        self.pipeline_service = pipeline_service
+        self.collection_name = "analysis_jobs"
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.workers: List[asyncio.Task] = []
+        self._wakeups: Dict[JobKind, asyncio.Event] = {kind: asyncio.Event() for kind in JobKind}
+        # Pedidos à espera de jobs que estão a correr nesta instância
+        self._finished: Dict[str, Set[asyncio.Event]] = {}
+
+    @property
+    def collection(self):
+        return self.db_service.store.db[self.collection_name]
+
+    @property
+    def available(self) -> bool:
+        """A fila usa operações atómicas do MongoDB: não existe com STORAGE_BACKEND=sqlite."""
+        return self.db_service.store.name == "mongodb"
+
+    async def start(self):
+        if self.workers:
+            return
+        if not self.available:
+            logger.warning("⚠️ Jobs assíncronos desativados: exigem STORAGE_BACKEND=mongodb")
+            return
+        await self._create_indexes()
+        concurrency = {JobKind.TEXT: settings.JOB_TEXT_CONCURRENCY, JobKind.VISION: settings.JOB_VISION_CONCURRENCY}
+        for kind, workers in concurrency.items():
+            for n in range(workers):
+                self.workers.append(asyncio.create_task(self._worker(kind), name=f"job-{kind.value}-{n}"))
+        logger.info(
+            f"✅ Trabalhadores de jobs iniciados ({settings.JOB_TEXT_CONCURRENCY} texto, "
+            f"{settings.JOB_VISION_CONCURRENCY} visão)"
+        )
+
+    async def close(self):
+        workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if workers:
+            logger.info("✅ Trabalhadores de jobs encerrados!")
+
+    async def _create_indexes(self):
+        try:
+            await asyncio.gather(
+                self.collection.create_index([("kind", 1), ("status", 1), ("created_at", 1)]),
+                # Os jobs terminados são apagados pelo MongoDB ao fim de JOB_RETENTION_SECONDS
+                self.collection.create_index("finished_at", expireAfterSeconds=settings.JOB_RETENTION_SECONDS),
+            )
+        except Exception as e:
+            logger.error(f"❌ Erro ao criar índices dos jobs: {e}")
+
+    async def submit_by_name(self, artwork_name: str) -> AnalysisJobResponse:
+        return await self._submit(JobKind.TEXT, {"artwork_name": artwork_name})
+
+    async def submit_by_image(self, image_data: bytes, image_hash: str) -> AnalysisJobResponse:
+        # A imagem fica no próprio job (o upload está limitado bem abaixo dos 16MB de um documento)
+        return await self._submit(JobKind.VISION, {"image_data": Binary(image_data), "image_hash": image_hash})
+
+    async def get_job(self, job_id: str, wait: float = 0) -> Optional[AnalysisJobResponse]:
+        """
+        Devolve o estado do job. Com `wait`, espera até esse número de segundos
+        que o job termine antes de responder (long polling).
+        """
+        if not ObjectId.is_valid(job_id):
+            return None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + min(wait, settings.JOB_MAX_WAIT_SECONDS)
+        # Um evento por pedido: cada um sai quando quer sem deixar os outros sem aviso
+        finished = asyncio.Event()
+        try:
+            while True:
+                # Registado antes da leitura: um job que termine entretanto acorda este pedido
+                finished.clear()
+                self._finished.setdefault(job_id, set()).add(finished)
+                job = await self.collection.find_one({"_id": ObjectId(job_id)}, {"image_data": 0})
+                if not job:
+                    return None
+                remaining = deadline - loop.time()
+                if job["status"] in FINISHED_STATUSES or remaining <= 0:
+                    return await self._convert_to_response(job)
+                # Acordado pelo trabalhador local; jobs de outras instâncias são consultados periodicamente
+                try:
+                    await asyncio.wait_for(finished.wait(), timeout=min(remaining, settings.JOB_POLL_INTERVAL_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            waiters = self._finished.get(job_id)
+            if waiters is not None:
+                waiters.discard(finished)
+                if not waiters:
+                    del self._finished[job_id]
+
+    async def _submit(self, kind: JobKind, payload: dict) -> AnalysisJobResponse:
+        try:
+            job = {
+                "kind": kind.value,
+                "status": JobStatus.QUEUED.value,
+                "attempts": 0,
+                "created_at": datetime.utcnow(),
+                "lease_expires_at": None,
+                **payload
+            }
+            result = await self.collection.insert_one(job)
+            job["_id"] = result.inserted_id
+            self._wakeups[kind].set()
+            logger.info(f"📥 Job {result.inserted_id} ({kind.value}) em fila")
+            return await self._convert_to_response(job)
+        except Exception as e:
+            logger.error(f"Erro ao criar job: {e}")
+            raise Exception(f"Erro ao criar job: {str(e)}")
+
+    async def _worker(self, kind: JobKind):
+        wakeup = self._wakeups[kind]
+        while True:
+            # Limpo antes de procurar: um job submetido entretanto volta a acordar o trabalhador
+            wakeup.clear()
+            try:
+                job = await self._claim(kind)
+            except Exception as e:
+                logger.error(f"Erro ao reservar job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    async def _claim(self, kind: JobKind) -> Optional[dict]:
+        """Reserva atomicamente o job mais antigo em fila (ou abandonado por uma instância que morreu)."""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "kind": kind.value,
+                "$or": [
+                    {"status": JobStatus.QUEUED.value},
+                    {"status": JobStatus.RUNNING.value, "lease_expires_at": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING.value,
+                    "worker_id": self.worker_id,
+                    "started_at": now,
+                    "lease_expires_at": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _run(self, job: dict):
+        job_id = job["_id"]
+        heartbeat = asyncio.create_task(self._renew_lease(job_id))
+        try:
+            if job["attempts"] > settings.JOB_MAX_ATTEMPTS:
+                raise RuntimeError("Número máximo de tentativas excedido")
+            analysis = await self._execute(job)
+        except asyncio.CancelledError:
+            # Encerramento da aplicação: o job volta à fila para ser retomado
+            await self._release(job)
+            raise
+        except Exception as e:
+            await self._fail(job, e)
+        else:
+            await self._complete(job, analysis)
+        finally:
+            heartbeat.cancel()
+            for finished in self._finished.pop(str(job_id), ()):
+                finished.set()
+
+    async def _execute(self, job: dict) -> ArtworkAnalysisResponse:
+        if job["kind"] == JobKind.TEXT.value:
+            return await self.pipeline_service.analyze_by_name(job["artwork_name"])
+        return await self.pipeline_service.analyze_by_image(bytes(job["image_data"]), image_hash=job["image_hash"])
+
+    async def _renew_lease(self, job_id: ObjectId):
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            try:
+                await self.collection.update_one(
+                    {"_id": job_id, "worker_id": self.worker_id},
+                    {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS)}}
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao renovar o prazo do job {job_id}: {e}")
+
+    async def _complete(self, job: dict, analysis: ArtworkAnalysisResponse):
+        await self._finish(job, {
+            "status": JobStatus.SUCCEEDED.value,
+            "artwork_name": analysis.artwork_name,
+            "result_id": analysis.id,
+            "error": None,
+        })
+        logger.info(f"✅ Job {job['_id']} concluído: {analysis.artwork_name}")
+
+    async def _fail(self, job: dict, error: Exception):
+        if isinstance(error, GroqRateLimitError):
+            # Não conta como tentativa: o trabalhador pausa e o job volta à fila
+            logger.warning(f"⏳ Job {job['_id']} limitado pela Groq, a pausar {error.retry_after:.1f}s")
+            await asyncio.sleep(min(error.retry_after, settings.JOB_LEASE_SECONDS / 2))
+            await self._release(job, refund_attempt=True)
+            return
+        if isinstance(error, InvalidImageError):
+            detail, retry = "Não foi possível ler a imagem enviada.", False
+        else:
+            detail, retry = "Ocorreu um erro interno ao processar a sua solicitação.", True
+        logger.error(f"❌ Erro no job {job['_id']} (tentativa {job['attempts']}): {str(error)}")
+
+        if retry and job["attempts"] < settings.JOB_MAX_ATTEMPTS:
+            await self._release(job, error=detail)
+        else:
+            await self._finish(job, {"status": JobStatus.FAILED.value, "error": detail})
+
+    async def _finish(self, job: dict, fields: dict):
+        try:
+            await self.collection.update_one(
+                {"_id": job["_id"], "worker_id": self.worker_id},
+                {
+                    "$set": {**fields, "finished_at": datetime.utcnow(), "lease_expires_at": None},
+                    "$unset": {"image_data": ""}
+                }
+            )
+        except Exception as e:
+            logger.error(f"Erro ao atualizar job {job['_id']}: {e}")
+
+    async def _release(self, job: dict, error: Optional[str] = None, refund_attempt: bool = False):
+        try:
+            update = {"$set": {"status": JobStatus.QUEUED.value, "lease_expires_at": None, "error": error}}
+            if refund_attempt:
+                update["$inc"] = {"attempts": -1}
+            await self.collection.update_one({"_id": job["_id"], "worker_id": self.worker_id}, update)
+        except Exception as e:
+            logger.error(f"Erro ao devolver job {job['_id']} à fila: {e}")
+
+    async def _convert_to_response(self, job: dict) -> AnalysisJobResponse:
+        """Converte o documento do job para a resposta da API, incluindo a análise se já existir."""
+        result = None
+        if job.get("result_id"):
+            result = await self.db_service.get_analysis_by_id(job["result_id"])
+        return AnalysisJobResponse(
+            id=str(job["_id"]),
+            kind=job["kind"],
+            status=job["status"],
+            artwork_name=job.get("artwork_name"),
+            attempts=job.get("attempts", 0),
+            created_at=job["created_at"],
+            started_at=job.get("started_at"),
+            finished_at=job.get("finished_at"),
+            error=job.get("error"),
+            result=result
+        )
+
+@lru_cache()
+def get_job_service() -> JobService:
+    return JobService(
+        db_service=get_database_service(),
+        pipeline_service=get_pipeline_service()
+    )
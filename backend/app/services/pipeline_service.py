@@ -0,0 +1,312 @@
+# backend/app/services/pipeline_service.py
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from functools import lru_cache
+from app.models.artwork_analysis import ArtworkAnalysisResponse, ArtworkAnalysisBatchItem
+from app.services.groq_service import get_groq_service, GroqService, GroqRateLimitError
+from app.services.database_service import get_database_service, DatabaseService
+from app.services.image_service import get_image_service, ImageService
+from app.services.image_url_service import get_image_url_service, ImageUrlService
+from app.core.images import PreparedImage
+from app.core.config import settings
+from app.core.metrics import ANALYSES_IN_FLIGHT, stage
+from app.core.singleflight import SingleFlight
+from app.core.utils import generate_image_hash, image_to_base64, normalize_artwork_name
+
+logger = logging.getLogger(__name__)
+
+class PipelineService:
+    """
+    Orquestra o fluxo cache → Groq → base de dados das análises.
+    Pedidos concorrentes para a mesma obra (ou a mesma imagem) partilham uma
+    única execução do pipeline, evitando chamadas e documentos duplicados.
+    """
+
+    def __init__(
+        self,
+        db_service: DatabaseService,
+        groq_service: GroqService,
+        image_service: ImageService,
+        image_url_service: ImageUrlService
+    ):
+        self.db_service = db_service
+        self.groq_service = groq_service
+        self.image_service = image_service
+        self.image_url_service = image_url_service
+        self.name_flights = SingleFlight("nome")
+        self.image_flights = SingleFlight("imagem")
+
+    async def analyze_by_name(
+        self, artwork_name: str, on_delta: Optional[Callable[[str], None]] = None
+    ) -> ArtworkAnalysisResponse:
+        cached_analysis = await self.db_service.get_analysis_by_name(artwork_name)
+        if cached_analysis:
+            return self._record(cached_analysis)
+
+        name_key = normalize_artwork_name(artwork_name)
+        with ANALYSES_IN_FLIGHT.labels("name").track_inprogress():
+            analysis = await self.name_flights.do(name_key, lambda: self._generate_by_name(artwork_name, on_delta))
+        return self._record(analysis)
+
+    async def analyze_batch_by_name(self, artwork_names: List[str]) -> List[ArtworkAnalysisBatchItem]:
+        """
+        Analisa uma lista de nomes. Os nomes repetidos (após normalização) são resolvidos
+        uma única vez, os que já existem vêm de uma só consulta $in e só os restantes
+        chamam a Groq, com concorrência limitada. Cada obra em falta passa pelo mesmo
+        SingleFlight de /analise-por-nome, para que pedidos simultâneos não a gerem duas vezes.
+        """
+        names = [name.strip() for name in artwork_names]
+        keys = [normalize_artwork_name(name) for name in names]
+        unique: Dict[str, str] = {}
+        for name, key in zip(names, keys):
+            if key and key not in unique:
+                unique[key] = name
+
+        found = await self.db_service.get_analyses_by_name_keys(list(unique))
+        outcomes: Dict[str, Tuple[str, Optional[ArtworkAnalysisResponse], Optional[str]]] = {
+            key: ("cached", analysis, None) for key, analysis in found.items()
+        }
+
+        misses = [key for key in unique if key not in found]
+        semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+        async def generate(key: str) -> ArtworkAnalysisResponse:
+            async with semaphore:
+                with ANALYSES_IN_FLIGHT.labels("name").track_inprogress():
+                    return await self.name_flights.do(key, lambda: self._generate_by_name(unique[key]))
+
+        if misses:
+            logger.info(f"📦 Lote de {len(unique)} obras: {len(found)} em cache, {len(misses)} a gerar")
+        generated = await asyncio.gather(*[generate(key) for key in misses], return_exceptions=True)
+
+        for key, result in zip(misses, generated):
+            if isinstance(result, ArtworkAnalysisResponse):
+                # Pode ter sido guardada entretanto por outro pedido (o voo devolve-a do cache)
+                outcomes[key] = ("cached" if result.cached else "created", result, None)
+            elif isinstance(result, GroqRateLimitError):
+                outcomes[key] = ("failed", None, "O serviço de análise está sobrecarregado. Tente novamente dentro de instantes.")
+            else:
+                logger.error(f"Erro na análise da obra {unique[key]} (lote): {str(result)}")
+                outcomes[key] = ("failed", None, "Ocorreu um erro interno ao processar a sua solicitação.")
+
+        for _, analysis, _ in outcomes.values():
+            if analysis:
+                self._record(analysis)
+
+        items = []
+        seen = set()
+        for name, key in zip(names, keys):
+            if not key:
+                items.append(ArtworkAnalysisBatchItem(
+                    artwork_name=name, status="invalid", error="O nome da obra de arte é obrigatório."
+                ))
+                continue
+            status, analysis, error = outcomes[key]
+            if key in seen and status == "created":
+                # A mesma obra repetida no lote: só a primeira ocorrência a criou
+                status, analysis = "cached", analysis.model_copy(update={"cached": True})
+            seen.add(key)
+            items.append(ArtworkAnalysisBatchItem(artwork_name=name, status=status, analysis=analysis, error=error))
+        return items
+
+    async def analyze_by_image(
+        self,
+        image_data: bytes,
+        image_hash: Optional[str] = None,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> ArtworkAnalysisResponse:
+        if image_hash is None:
+            image_hash = await asyncio.to_thread(generate_image_hash, image_data)
+        cached_analysis = await self.db_service.get_analysis_by_image_hash(image_hash)
+        if cached_analysis:
+            logger.info(f"✅ Análise encontrada em cache pelo HASH da imagem.")
+            return self._record(cached_analysis)
+
+        # Descodifica, orienta e reduz a imagem uma única vez (fora do event loop)
+        with stage("image_prepare"):
+            prepared = await self.image_service.prepare(image_data)
+        perceptual_hash = prepared.perceptual_hash if settings.PHASH_ENABLED else None
+        if perceptual_hash:
+            similar_analysis = await self.db_service.get_analysis_by_perceptual_hash(
+                perceptual_hash, settings.PHASH_MAX_DISTANCE
+            )
+            if similar_analysis:
+                logger.info(f"✅ Análise encontrada em cache por uma imagem visualmente idêntica.")
+                return self._record(similar_analysis)
+
+        with ANALYSES_IN_FLIGHT.labels("image").track_inprogress():
+            analysis = await self.image_flights.do(
+                image_hash, lambda: self._generate_by_image(prepared, image_hash, perceptual_hash, on_delta)
+            )
+        return self._record(analysis)
+
+    async def drain(self, timeout: float):
+        """
+        Antes de encerrar: espera pelas análises em curso cujos pedidos já se desligaram
+        (o SingleFlight continua-as), para que cheguem a ser guardadas.
+        """
+        started = time.monotonic()
+        remaining = 0
+        for flights in (self.name_flights, self.image_flights):
+            remaining += await flights.drain(max(0.0, timeout - (time.monotonic() - started)))
+        if remaining:
+            logger.warning(f"⚠️ {remaining} análises em curso interrompidas no encerramento")
+
+    def _record(self, analysis: ArtworkAnalysisResponse) -> ArtworkAnalysisResponse:
+        """Conta o pedido nas estatísticas de cache (hit quando não foi preciso chamar a IA)."""
+        self.db_service.record_request(cached=analysis.cached)
+        return analysis
+
+    async def stream_analysis(
+        self, run: Callable[[Callable[[str], None]], Awaitable[ArtworkAnalysisResponse]]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Executa um pipeline de análise emitindo ("delta", texto) à medida que a Groq
+        gera a resposta, e termina com ("result", análise guardada).
+        Se a análise já estiver em cache (ou a ser gerada por outro pedido), só é emitido o resultado.
+        """
+        deltas: asyncio.Queue = asyncio.Queue()
+        task = asyncio.ensure_future(run(deltas.put_nowait))
+        try:
+            while not task.done():
+                getter = asyncio.ensure_future(deltas.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield "delta", getter.result()
+                else:
+                    getter.cancel()
+            while not deltas.empty():
+                yield "delta", deltas.get_nowait()
+            yield "result", task.result()
+        finally:
+            # O cliente desligou-se: o trabalho partilhado continua (e é guardado) noutros voos
+            task.cancel()
+
+    async def _generate_by_name(
+        self, artwork_name: str, on_delta: Optional[Callable[[str], None]] = None
+    ) -> ArtworkAnalysisResponse:
+        # Um pedido anterior pode ter terminado entre a verificação de cache e o início deste voo
+        cached_analysis = await self.db_service.get_analysis_by_name(artwork_name)
+        if cached_analysis:
+            return cached_analysis
+
+        analysis_data = await self._generate_analysis_data(artwork_name, on_delta)
+        return await self.db_service.save_analysis(analysis_data)
+
+    async def _generate_analysis_data(
+        self, artwork_name: str, on_delta: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Gera (sem guardar) a análise de uma obra pelo nome, já com o URL da imagem validado."""
+        # 1. Obter a análise textual da IA
+        analysis_data = await self.groq_service.analyze_artwork(artwork_name, on_delta=on_delta)
+
+        # 2. Usar o nome e o artista para encontrar e validar um URL de imagem
+        confirmed_artwork_name = analysis_data.get("artwork_name")
+        artist = analysis_data.get("artist")
+        image_url = await self.image_url_service.find_valid_image_url(
+            confirmed_artwork_name, artist, analysis_data.get("image_url")
+        )
+
+        # 3. Adicionar o URL encontrado à análise
+        analysis_data["image_url"] = image_url
+        return analysis_data
+
+    async def _generate_by_image(
+        self,
+        image: PreparedImage,
+        image_hash: str,
+        perceptual_hash: Optional[str],
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> ArtworkAnalysisResponse:
+        cached_analysis = await self.db_service.get_analysis_by_image_hash(image_hash)
+        if cached_analysis:
+            return cached_analysis
+
+        # A imagem é codificada uma única vez e partilhada pelas duas chamadas de visão
+        base64_image = await asyncio.to_thread(image_to_base64, image.data)
+
+        if settings.VISION_PIPELINE_MODE == "concurrent":
+            identification_result, analysis_data, cached_by_name = await self._identify_and_analyze(
+                base64_image, image.mime_type, on_delta
+            )
+            if cached_by_name:
+                return cached_by_name
+        else:
+            identification_result, cached_by_name = await self._identify_and_lookup(base64_image, image.mime_type)
+            if cached_by_name:
+                return cached_by_name
+
+            logger.info(f"🤖 Nenhuma análise em cache. A gerar nova análise completa para a imagem...")
+            analysis_data = await self.groq_service.analyze_artwork_from_image(
+                base64_image, image.mime_type, on_delta=on_delta
+            )
+
+        if identification_result and identification_result.get("artwork_name"):
+             analysis_data["artwork_name"] = identification_result.get("artwork_name")
+
+        # Usar o nome da obra para encontrar uma imagem válida para a análise
+        confirmed_artwork_name = analysis_data.get("artwork_name")
+        artist = analysis_data.get("artist")
+        image_url = await self.image_url_service.find_valid_image_url(
+            confirmed_artwork_name, artist, analysis_data.get("image_url")
+        )
+        analysis_data["image_url"] = image_url
+
+        saved_analysis = await self.db_service.save_analysis(
+            analysis_data, image_hash=image_hash, perceptual_hash=perceptual_hash
+        )
+        logger.info(f"💾 Nova análise de imagem salva na base de dados.")
+
+        return saved_analysis
+
+    async def _identify_and_lookup(
+        self, base64_image: str, mime_type: str
+    ) -> Tuple[Optional[Dict[str, str]], Optional[ArtworkAnalysisResponse]]:
+        """Identifica a obra na imagem e procura uma análise já existente com esse nome."""
+        logger.info("🔍 Hash não encontrado. A tentar identificar a obra na imagem...")
+        identification_result = await self.groq_service.identify_artwork_from_image(base64_image, mime_type)
+
+        if identification_result:
+            artwork_name = identification_result.get("artwork_name")
+            cached_by_name = await self.db_service.get_analysis_by_name(artwork_name)
+            if cached_by_name:
+                logger.info(f"✅ Obra identificada como '{artwork_name}'. Análise encontrada em cache pelo nome.")
+                return identification_result, cached_by_name
+
+        return identification_result, None
+
+    async def _identify_and_analyze(
+        self, base64_image: str, mime_type: str, on_delta: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Arranca a identificação e a análise completa em paralelo. Se a identificação
+        encontrar a obra em cache, a análise (a chamada mais cara) é cancelada.
+        """
+        logger.info(f"🤖 A gerar a análise completa em paralelo com a identificação...")
+        analysis_task = asyncio.create_task(
+            self.groq_service.analyze_artwork_from_image(base64_image, mime_type, on_delta=on_delta)
+        )
+        try:
+            identification_result, cached_by_name = await self._identify_and_lookup(base64_image, mime_type)
+            if cached_by_name:
+                analysis_task.cancel()
+                logger.info("✂️ Análise completa cancelada: a obra já estava em cache.")
+                return identification_result, None, cached_by_name
+
+            analysis_data = await analysis_task
+            return identification_result, analysis_data, None
+        except BaseException:
+            analysis_task.cancel()
+            raise
+
+@lru_cache()
+def get_pipeline_service() -> PipelineService:
+    return PipelineService(
+        db_service=get_database_service(),
+        groq_service=get_groq_service(),
+        image_service=get_image_service(),
+        image_url_service=get_image_url_service()
+    )
@@ -0,0 +1,18 @@
+# Storage backends for the analyses (MongoDB or embedded SQLite)
+from app.core.config import settings
+from app.storage.base import AnalysisStore, ListFilters
+from app.storage.mongo import MongoAnalysisStore
+from app.storage.sqlite import SQLiteAnalysisStore
+
+STORES = {
+    MongoAnalysisStore.name: MongoAnalysisStore,
+    SQLiteAnalysisStore.name: SQLiteAnalysisStore,
+}
+
+def create_analysis_store() -> AnalysisStore:
+    try:
+        return STORES[settings.STORAGE_BACKEND]()
+    except KeyError:
+        raise ValueError(
+            f"STORAGE_BACKEND inválido: '{settings.STORAGE_BACKEND}' (opções: {', '.join(STORES)})"
+        )
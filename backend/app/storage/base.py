@@ -0,0 +1,116 @@
+# backend/app/storage/base.py
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+
+class ListFilters:
+    """Filtros da listagem (texto contido no campo, sem distinguir maiúsculas)."""
+
+    def __init__(self, artwork_name: Optional[str] = None, artist: Optional[str] = None, style: Optional[str] = None):
+        self.artwork_name = artwork_name
+        self.artist = artist
+        self.style = style
+
+    def __bool__(self) -> bool:
+        return bool(self.artwork_name or self.artist or self.style)
+
+class AnalysisStore(ABC):
+    """
+    Armazenamento persistente das análises e do documento de estatísticas.
+    Os documentos são dicionários com os campos do ArtworkAnalysisDB e um `_id`
+    (ObjectId gerado pelo DatabaseService). As caches, os índices em memória e a
+    lógica das estatísticas ficam no DatabaseService; aqui só há persistência.
+    """
+
+    name: str
+
+    @property
+    @abstractmethod
+    def connected(self) -> bool:
+        ...
+
+    @abstractmethod
+    async def connect(self):
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+    @abstractmethod
+    async def ping(self):
+        """Verifica que o armazenamento responde (lança uma exceção se não responder)."""
+
+    @abstractmethod
+    async def create_indexes(self):
+        """Cria (de forma idempotente) os índices: únicos sobre o nome normalizado e o hash da imagem."""
+
+    @abstractmethod
+    def iter_index_entries(self, since: Optional[datetime] = None) -> AsyncIterator[dict]:
+        """
+        As análises (todas, ou as criadas a partir de `since`, inclusive) por ordem de criação,
+        só com created_at, artwork_name, artist, style e perceptual_hash.
+        """
+
+    @abstractmethod
+    async def find_by_id(self, analysis_id: ObjectId) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def find_by_name_key(self, name_key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def find_by_image_hash(self, image_hash: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def find_by_ids(self, analysis_ids: List[ObjectId]) -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def find_by_name_keys(self, name_keys: List[str]) -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def insert_unique(self, doc: dict) -> Optional[dict]:
+        """
+        Insere a análise, a menos que outra já tenha o mesmo hash de imagem ou o
+        mesmo nome normalizado: nesse caso não insere e devolve a existente.
+        """
+
+    @abstractmethod
+    async def link_image(self, analysis_id: ObjectId, link: Dict[str, str]) -> bool:
+        """Associa image_hash (e perceptual_hash) a uma análise que ainda não tem hash."""
+
+    @abstractmethod
+    async def delete(self, analysis_id: ObjectId) -> Optional[dict]:
+        """Remove a análise e devolve o documento removido."""
+
+    @abstractmethod
+    async def list_analyses(
+        self,
+        filters: ListFilters,
+        after: Optional[Tuple[datetime, ObjectId]],
+        skip: int,
+        limit: int,
+        summary: bool
+    ) -> List[dict]:
+        """
+        Análises da mais recente para a mais antiga, ordenadas por (created_at, _id),
+        a partir de `after` (exclusivo). Com `summary`, o texto da análise pode ser omitido.
+        """
+
+    @abstractmethod
+    async def count(self, filters: ListFilters) -> int:
+        """Total de análises (estimado quando não há filtros)."""
+
+    @abstractmethod
+    async def get_stats(self) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def increment_stats(self, increments: Dict[str, float]):
+        """Soma os incrementos (caminhos com ponto, ex.: "styles.barroco") ao documento de estatísticas."""
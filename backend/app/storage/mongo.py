@@ -0,0 +1,257 @@
+# backend/app/storage/mongo.py
+
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from app.core.config import settings
+from app.core.stats import STATS_DOCUMENT_ID
+from app.storage.base import AnalysisStore, ListFilters
+
+logger = logging.getLogger(__name__)
+
+# Campos lidos na vista resumida: o texto da análise nunca sai do MongoDB.
+# O created_at é necessário para construir o cursor de paginação.
+SUMMARY_PROJECTION = {
+    "artwork_name": 1, "artist": 1, "year": 1, "style": 1, "emotions": 1, "image_url": 1, "created_at": 1
+}
+
+# Versão dos índices criados por create_indexes: incrementar sempre que a lista mudar,
+# para que os arranques seguintes voltem a criá-los (e guardem a nova versão)
+INDEX_VERSION = 2
+
+class MongoAnalysisStore(AnalysisStore):
+    """Análises na coleção `artwork_analyses` e estatísticas em `analysis_stats` (MongoDB)."""
+
+    name = "mongodb"
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db = None
+        self.collection_name = "artwork_analyses"
+        self.stats_collection_name = "analysis_stats"
+        self.meta_collection_name = "app_meta"
+
+    @property
+    def collection(self):
+        return self.db[self.collection_name]
+
+    @property
+    def stats_collection(self):
+        return self.db[self.stats_collection_name]
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None
+
+    async def connect(self):
+        self.client = AsyncIOMotorClient(settings.MONGODB_URI)
+        self.db = self.client[settings.MONGODB_DB_NAME]
+        await self.client.admin.command('ping')
+        logger.info("✅ Conectado ao MongoDB com sucesso!")
+
+    async def close(self):
+        if self.client:
+            self.client.close()
+            self.client = None
+            logger.info("✅ Conexão com MongoDB fechada!")
+
+    async def ping(self):
+        await self.client.admin.command('ping')
+
+    async def create_indexes(self):
+        """
+        Cria os índices uma vez por versão: com o marcador em `app_meta` já na versão
+        atual, o arranque faz uma única leitura. Os índices são criados em paralelo.
+        """
+        try:
+            meta = self.db[self.meta_collection_name]
+            marker = await meta.find_one({"_id": "indexes"})
+            if marker and marker.get("version", 0) >= INDEX_VERSION:
+                logger.info(f"✅ Índices já criados (versão {INDEX_VERSION})")
+                return
+            collection = self.collection
+            results = await asyncio.gather(
+                collection.create_index("artwork_name"),
+                collection.create_index("created_at"),
+                collection.create_index([("created_at", -1), ("_id", -1)]),
+                collection.create_index("artist"),
+                self._create_perceptual_hash_index(),
+                self._create_unique_index("artwork_name_key"),
+                self._create_unique_index("image_hash"),
+                self._warn_pending_migrations(),
+            )
+            logger.info("✅ Índices criados com sucesso!")
+            # Com migrações pendentes (ou sem os índices únicos), o próximo arranque verifica de novo
+            if all(results[5:]):
+                await meta.update_one(
+                    {"_id": "indexes"},
+                    {"$set": {"version": INDEX_VERSION, "updated_at": datetime.utcnow()}},
+                    upsert=True
+                )
+        except Exception as e:
+            logger.error(f"❌ Erro ao criar índices: {e}")
+            logger.warning("⚠️ Aplicação continuará sem índices otimizados")
+
+    async def _create_perceptual_hash_index(self):
+        """
+        Índice parcial só com os hashes de texto: o índice esparso antigo também
+        guardava as análises com `perceptual_hash: null` explícito (documentos antigos).
+        """
+        collection = self.collection
+        if "perceptual_hash_1" in await collection.index_information():
+            await collection.drop_index("perceptual_hash_1")
+        await collection.create_index(
+            "perceptual_hash", name="perceptual_hash_partial",
+            partialFilterExpression={"perceptual_hash": {"$type": "string"}}
+        )
+
+    async def _warn_pending_migrations(self) -> bool:
+        """Avisa das migrações por executar; devolve True se não houver nenhuma."""
+        collection = self.collection
+        up_to_date = True
+        if await collection.find_one({"artwork_name_key": None}, {"_id": 1}):
+            logger.warning(
+                "⚠️ Existem análises sem 'artwork_name_key'. "
+                "Execute: python -m app.migrations.backfill_artwork_name_key"
+            )
+            up_to_date = False
+        stats = await self.stats_collection.find_one({"_id": STATS_DOCUMENT_ID}, {"_id": 1})
+        if not stats and await collection.find_one({}, {"_id": 1}):
+            logger.warning(
+                "⚠️ As estatísticas materializadas ainda não existem. "
+                "Execute: python -m app.migrations.rebuild_stats"
+            )
+            up_to_date = False
+        return up_to_date
+
+    async def _create_unique_index(self, field: str) -> bool:
+        """
+        Índice único (parcial: só valores de texto) sobre uma chave de cache, para que
+        pedidos concorrentes nunca criem análises duplicadas. Substitui o índice simples
+        antigo; se existirem duplicados, mantém o índice simples e pede a migração.
+        Devolve False nesse caso.
+        """
+        collection = self.collection
+        unique_name = f"{field}_unique"
+        if unique_name in await collection.index_information():
+            return True
+        try:
+            await collection.create_index(
+                field, name=unique_name, unique=True, partialFilterExpression={field: {"$gt": ""}}
+            )
+        except (DuplicateKeyError, OperationFailure) as e:
+            logger.warning(
+                f"⚠️ Não foi possível criar o índice único sobre '{field}' ({e}). "
+                "Execute: python -m app.migrations.merge_duplicates"
+            )
+            await collection.create_index(field)
+            return False
+        # O índice único serve as mesmas consultas: o índice simples deixa de ser necessário
+        if f"{field}_1" in await collection.index_information():
+            await collection.drop_index(f"{field}_1")
+        logger.info(f"✅ Índice único criado sobre '{field}'")
+        return True
+
+    async def iter_index_entries(self, since: Optional[datetime] = None) -> AsyncIterator[dict]:
+        projection = {"created_at": 1, "artwork_name": 1, "artist": 1, "style": 1, "perceptual_hash": 1}
+        query = {"created_at": {"$gte": since}} if since else {}
+        async for doc in self.collection.find(query, projection).sort([("created_at", 1), ("_id", 1)]):
+            yield doc
+
+    async def find_by_id(self, analysis_id: ObjectId) -> Optional[dict]:
+        return await self.collection.find_one({"_id": analysis_id})
+
+    async def find_by_name_key(self, name_key: str) -> Optional[dict]:
+        return await self.collection.find_one({"artwork_name_key": name_key})
+
+    async def find_by_image_hash(self, image_hash: str) -> Optional[dict]:
+        return await self.collection.find_one({"image_hash": image_hash})
+
+    async def find_by_ids(self, analysis_ids: List[ObjectId]) -> List[dict]:
+        return await self.collection.find({"_id": {"$in": analysis_ids}}).to_list(length=None)
+
+    async def find_by_name_keys(self, name_keys: List[str]) -> List[dict]:
+        return await self.collection.find({"artwork_name_key": {"$in": name_keys}}).to_list(length=None)
+
+    async def insert_unique(self, doc: dict) -> Optional[dict]:
+        # Upsert sobre a chave de cache: se outro pedido guardou a mesma obra (ou imagem)
+        # primeiro, o documento existente é devolvido em vez de se criar um duplicado
+        if doc.get("image_hash"):
+            key_filter = {"image_hash": doc["image_hash"]}
+        else:
+            key_filter = {"artwork_name_key": doc["artwork_name_key"]}
+        try:
+            return await self.collection.find_one_and_update(
+                key_filter,
+                {"$setOnInsert": doc},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # A outra chave única (ex.: o nome de uma imagem nova) já pertence a outra análise
+            filters = [{"artwork_name_key": doc["artwork_name_key"]}]
+            if doc.get("image_hash"):
+                filters.append({"image_hash": doc["image_hash"]})
+            existing = await self.collection.find_one({"$or": filters})
+            if existing is None:
+                raise
+            return existing
+
+    async def link_image(self, analysis_id: ObjectId, link: Dict[str, str]) -> bool:
+        try:
+            result = await self.collection.update_one({"_id": analysis_id, "image_hash": None}, {"$set": link})
+        except DuplicateKeyError:
+            return False
+        return bool(result.modified_count)
+
+    async def delete(self, analysis_id: ObjectId) -> Optional[dict]:
+        return await self.collection.find_one_and_delete({"_id": analysis_id})
+
+    def _filter_query(self, filters: ListFilters) -> dict:
+        query = {}
+        if filters.artwork_name:
+            query["artwork_name"] = {"$regex": re.escape(filters.artwork_name), "$options": "i"}
+        if filters.artist:
+            query["artist"] = {"$regex": re.escape(filters.artist), "$options": "i"}
+        if filters.style:
+            query["style"] = {"$regex": re.escape(filters.style), "$options": "i"}
+        return query
+
+    async def list_analyses(
+        self,
+        filters: ListFilters,
+        after: Optional[Tuple[datetime, ObjectId]],
+        skip: int,
+        limit: int,
+        summary: bool
+    ) -> List[dict]:
+        query = self._filter_query(filters)
+        if after:
+            last_created_at, last_id = after
+            query["$or"] = [
+                {"created_at": {"$lt": last_created_at}},
+                {"created_at": last_created_at, "_id": {"$lt": last_id}},
+            ]
+        projection = SUMMARY_PROJECTION if summary else None
+        find = self.collection.find(query, projection).sort([("created_at", -1), ("_id", -1)])
+        if skip:
+            find = find.skip(skip)
+        return await find.limit(limit).to_list(length=limit)
+
+    async def count(self, filters: ListFilters) -> int:
+        if filters:
+            return await self.collection.count_documents(self._filter_query(filters))
+        return await self.collection.estimated_document_count()
+
+    async def get_stats(self) -> Optional[dict]:
+        return await self.stats_collection.find_one({"_id": STATS_DOCUMENT_ID})
+
+    async def increment_stats(self, increments: Dict[str, float]):
+        # Atómico no MongoDB: várias instâncias podem atualizar o mesmo documento
+        await self.stats_collection.update_one({"_id": STATS_DOCUMENT_ID}, {"$inc": increments}, upsert=True)
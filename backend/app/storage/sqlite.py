@@ -0,0 +1,332 @@
+# backend/app/storage/sqlite.py
+
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import orjson
+from bson import ObjectId
+from app.core.config import settings
+from app.core.stats import STATS_DOCUMENT_ID, apply_increments
+from app.storage.base import AnalysisStore, ListFilters
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Versão do esquema (PRAGMA user_version): incrementar sempre que o SCHEMA mudar
+SCHEMA_VERSION = 1
+
+# As chaves de cache e os campos de ordenação/filtro são colunas indexadas;
+# o documento completo fica em JSON na coluna `doc`.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    artwork_name TEXT NOT NULL,
+    artwork_name_key TEXT,
+    image_hash TEXT,
+    perceptual_hash TEXT,
+    artist TEXT,
+    style TEXT,
+    created_at INTEGER NOT NULL,
+    doc BLOB NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS analyses_artwork_name_key_unique ON analyses (artwork_name_key) WHERE artwork_name_key > '';
+CREATE UNIQUE INDEX IF NOT EXISTS analyses_image_hash_unique ON analyses (image_hash) WHERE image_hash > '';
+CREATE INDEX IF NOT EXISTS analyses_created_at ON analyses (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS analyses_artist ON analyses (artist);
+CREATE TABLE IF NOT EXISTS stats (
+    id TEXT PRIMARY KEY,
+    doc BLOB NOT NULL
+);
+"""
+
+INSERT_SQL = """
+INSERT INTO analyses (id, artwork_name, artwork_name_key, image_hash, perceptual_hash, artist, style, created_at, doc)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _to_micros(value: datetime) -> int:
+    return (value - EPOCH) // MICROSECOND
+
+def _icontains(value: Optional[str], needle: str) -> bool:
+    """Equivalente ao $regex com re.escape e a opção "i" usado no MongoDB."""
+    return value is not None and needle.casefold() in value.casefold()
+
+class SQLiteAnalysisStore(AnalysisStore):
+    """
+    Análises num ficheiro SQLite local (modo WAL), para instalações num só servidor:
+    sem contentor do MongoDB nem ida à rede em cada verificação de cache.
+
+    As leituras por chave (índices únicos) correm diretamente no event loop: no modo
+    WAL nunca esperam pelas escritas e demoram microssegundos, menos do que passar a
+    consulta a outra thread. Nos raros casos em que a base está ocupada (ex.: um
+    checkpoint de outro processo), a ligação de leitura desiste ao fim de
+    SQLITE_READ_BUSY_TIMEOUT_SECONDS e a leitura é repetida na thread das consultas
+    longas, sem bloquear o event loop. As escritas passam por uma única thread (o
+    SQLite só tem um escritor de cada vez) e as consultas que percorrem a tabela
+    (filtros, contagens, carregamento dos índices em memória) por outra.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.SQLITE_PATH
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer: Optional[sqlite3.Connection] = None
+        self._scanner: Optional[sqlite3.Connection] = None
+        self._writer_executor: Optional[ThreadPoolExecutor] = None
+        self._scan_executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._reader is not None
+
+    async def connect(self):
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._scan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-scan")
+        # Cada ligação só é usada pela sua thread
+        self._writer = await self._write(self._open)
+        self._scanner = await self._scan(self._open)
+        self._reader = self._open(busy_timeout=settings.SQLITE_READ_BUSY_TIMEOUT_SECONDS)
+        logger.info(f"✅ Base de dados SQLite aberta: {self.path}")
+
+    async def close(self):
+        if self._reader is None:
+            return
+        await self._write(self._writer.close)
+        await self._scan(self._scanner.close)
+        self._reader.close()
+        self._reader = self._writer = self._scanner = None
+        self._writer_executor.shutdown()
+        self._scan_executor.shutdown()
+        logger.info("✅ Base de dados SQLite fechada!")
+
+    def _open(self, busy_timeout: Optional[float] = None) -> sqlite3.Connection:
+        # isolation_level=None: as transações de escrita são abertas explicitamente (BEGIN IMMEDIATE)
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Em WAL, NORMAL só sincroniza o disco nos checkpoints: um corte de energia pode
+        # perder as últimas análises (que seriam geradas de novo), nunca corromper a base
+        connection.execute("PRAGMA synchronous=NORMAL")
+        if busy_timeout is None:
+            busy_timeout = settings.SQLITE_BUSY_TIMEOUT_SECONDS
+        connection.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        connection.create_function("icontains", 2, _icontains, deterministic=True)
+        return connection
+
+    async def _write(self, fn: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._writer_executor, fn, *args)
+
+    async def _scan(self, fn: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._scan_executor, fn, *args)
+
+    async def _read(self, fn: Callable, *args) -> Any:
+        """Corre `fn(ligação, *args)` no event loop; com a base ocupada, repete-a na thread das consultas."""
+        try:
+            return fn(self._reader, *args)
+        except sqlite3.OperationalError as e:
+            if e.sqlite_errorcode not in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED):
+                raise
+            return await self._scan(fn, self._scanner, *args)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transação de escrita; o IMMEDIATE reserva logo o escritor (também entre processos)."""
+        connection = self._writer
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    async def ping(self):
+        await self._read(lambda connection: connection.execute("SELECT 1 FROM analyses LIMIT 1").fetchall())
+
+    async def create_indexes(self):
+        if await self._write(self._create_schema):
+            logger.info("✅ Tabelas e índices SQLite criados!")
+        else:
+            logger.info(f"✅ Tabelas e índices SQLite já criados (versão {SCHEMA_VERSION})")
+
+    def _create_schema(self) -> bool:
+        connection = self._writer
+        if connection.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return False
+        connection.executescript(SCHEMA)
+        connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return True
+
+    # Conversões
+
+    def _row(self, doc: dict) -> tuple:
+        data = {key: value for key, value in doc.items() if key != "_id"}
+        return (
+            str(doc["_id"]), doc["artwork_name"], doc.get("artwork_name_key"), doc.get("image_hash"),
+            doc.get("perceptual_hash"), doc.get("artist"), doc.get("style"), _to_micros(doc["created_at"]),
+            orjson.dumps(data),
+        )
+
+    def _to_doc(self, analysis_id: str, data: bytes) -> dict:
+        doc = orjson.loads(data)
+        for field in ("created_at", "updated_at"):
+            if doc.get(field):
+                doc[field] = datetime.fromisoformat(doc[field])
+        doc["_id"] = ObjectId(analysis_id)
+        return doc
+
+    def _fetch_one(self, connection: sqlite3.Connection, where: str, params: tuple) -> Optional[dict]:
+        row = connection.execute(f"SELECT id, doc FROM analyses WHERE {where}", params).fetchone()
+        return self._to_doc(*row) if row else None
+
+    def _fetch_all(self, connection: sqlite3.Connection, sql: str, params: tuple) -> List[dict]:
+        return [self._to_doc(*row) for row in connection.execute(sql, params).fetchall()]
+
+    # Leituras
+
+    async def iter_index_entries(self, since: Optional[datetime] = None) -> AsyncIterator[dict]:
+        rows = await self._scan(lambda: self._scanner.execute(
+            "SELECT id, created_at, artwork_name, artist, style, perceptual_hash FROM analyses "
+            "WHERE created_at >= ? ORDER BY created_at, id",
+            (_to_micros(since) if since else 0,)
+        ).fetchall())
+        for analysis_id, created_at, artwork_name, artist, style, perceptual_hash in rows:
+            yield {
+                "_id": analysis_id, "created_at": EPOCH + created_at * MICROSECOND, "artwork_name": artwork_name,
+                "artist": artist, "style": style, "perceptual_hash": perceptual_hash,
+            }
+
+    async def find_by_id(self, analysis_id: ObjectId) -> Optional[dict]:
+        return await self._read(self._fetch_one, "id = ?", (str(analysis_id),))
+
+    async def find_by_name_key(self, name_key: str) -> Optional[dict]:
+        return await self._read(self._fetch_one, "artwork_name_key = ?", (name_key,))
+
+    async def find_by_image_hash(self, image_hash: str) -> Optional[dict]:
+        return await self._read(self._fetch_one, "image_hash = ?", (image_hash,))
+
+    async def find_by_ids(self, analysis_ids: List[ObjectId]) -> List[dict]:
+        placeholders = ",".join("?" * len(analysis_ids))
+        return await self._read(
+            self._fetch_all, f"SELECT id, doc FROM analyses WHERE id IN ({placeholders})",
+            tuple(str(analysis_id) for analysis_id in analysis_ids)
+        )
+
+    async def find_by_name_keys(self, name_keys: List[str]) -> List[dict]:
+        placeholders = ",".join("?" * len(name_keys))
+        return await self._read(
+            self._fetch_all, f"SELECT id, doc FROM analyses WHERE artwork_name_key IN ({placeholders})", tuple(name_keys)
+        )
+
+    def _filter_clauses(self, filters: ListFilters) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        for column, needle in (("artwork_name", filters.artwork_name), ("artist", filters.artist), ("style", filters.style)):
+            if needle:
+                clauses.append(f"icontains({column}, ?)")
+                params.append(needle)
+        return clauses, params
+
+    async def list_analyses(
+        self,
+        filters: ListFilters,
+        after: Optional[Tuple[datetime, ObjectId]],
+        skip: int,
+        limit: int,
+        summary: bool
+    ) -> List[dict]:
+        clauses, params = self._filter_clauses(filters)
+        if after:
+            created_at, last_id = _to_micros(after[0]), str(after[1])
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params += [created_at, created_at, last_id]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT id, doc FROM analyses {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+        params += [limit, skip]
+
+        if filters:
+            # Os filtros de texto percorrem a tabela: fora do event loop
+            return await self._scan(self._fetch_all, self._scanner, sql, tuple(params))
+        # Sem filtros, a página é lida pelo índice (created_at, id)
+        return await self._read(self._fetch_all, sql, tuple(params))
+
+    async def count(self, filters: ListFilters) -> int:
+        clauses, params = self._filter_clauses(filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        row = await self._scan(lambda: self._scanner.execute(f"SELECT COUNT(*) FROM analyses {where}", params).fetchone())
+        return row[0]
+
+    async def get_stats(self) -> Optional[dict]:
+        row = await self._read(
+            lambda connection: connection.execute("SELECT doc FROM stats WHERE id = ?", (STATS_DOCUMENT_ID,)).fetchone()
+        )
+        return orjson.loads(row[0]) if row else None
+
+    # Escritas (na thread do escritor)
+
+    async def insert_unique(self, doc: dict) -> Optional[dict]:
+        return await self._write(self._insert_unique, doc)
+
+    def _insert_unique(self, doc: dict) -> Optional[dict]:
+        try:
+            with self._transaction() as connection:
+                connection.execute(INSERT_SQL, self._row(doc))
+            return None
+        except sqlite3.IntegrityError:
+            # Como no MongoDB: o hash da imagem tem prioridade sobre o nome
+            existing = None
+            if doc.get("image_hash"):
+                existing = self._fetch_one(self._writer, "image_hash = ?", (doc["image_hash"],))
+            if existing is None:
+                existing = self._fetch_one(self._writer, "artwork_name_key = ?", (doc["artwork_name_key"],))
+            if existing is None:
+                raise
+            return existing
+
+    async def link_image(self, analysis_id: ObjectId, link: Dict[str, str]) -> bool:
+        return await self._write(self._link_image, analysis_id, link)
+
+    def _link_image(self, analysis_id: ObjectId, link: Dict[str, str]) -> bool:
+        try:
+            with self._transaction() as connection:
+                doc = self._fetch_one(
+                    connection, "id = ? AND (image_hash IS NULL OR image_hash = '')", (str(analysis_id),)
+                )
+                if doc is None:
+                    return False
+                doc.update(link)
+                connection.execute(
+                    "UPDATE analyses SET image_hash = ?, perceptual_hash = ?, doc = ? WHERE id = ?",
+                    (doc["image_hash"], doc.get("perceptual_hash"), self._row(doc)[-1], str(analysis_id))
+                )
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    async def delete(self, analysis_id: ObjectId) -> Optional[dict]:
+        return await self._write(self._delete, analysis_id)
+
+    def _delete(self, analysis_id: ObjectId) -> Optional[dict]:
+        with self._transaction() as connection:
+            doc = self._fetch_one(connection, "id = ?", (str(analysis_id),))
+            if doc:
+                connection.execute("DELETE FROM analyses WHERE id = ?", (str(analysis_id),))
+        return doc
+
+    async def increment_stats(self, increments: Dict[str, float]):
+        await self._write(self._increment_stats, increments)
+
+    def _increment_stats(self, increments: Dict[str, float]):
+        with self._transaction() as connection:
+            row = connection.execute("SELECT doc FROM stats WHERE id = ?", (STATS_DOCUMENT_ID,)).fetchone()
+            stats = apply_increments(orjson.loads(row[0]) if row else {}, increments)
+            connection.execute(
+                "INSERT OR REPLACE INTO stats (id, doc) VALUES (?, ?)", (STATS_DOCUMENT_ID, orjson.dumps(stats))
+            )
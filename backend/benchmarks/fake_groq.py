@@ -0,0 +1,195 @@
+# backend/benchmarks/fake_groq.py
+"""
+Servidor falso da API da Groq (POST /chat/completions), para testes de carga sem
+rede nem custos. Responde com análises sintéticas em JSON (ou em streaming SSE)
+após uma latência configurável, e pode simular erros 500 e limites 429.
+Também serve as imagens indicadas no campo image_url, para que a verificação
+dos URLs não saia da máquina.
+
+Uso (a partir da pasta backend/):
+    python -m benchmarks.fake_groq [--port 9100] [--latency-ms 800] [--error-rate 0.01] [--rate-limit-rate 0.02]
+
+A aplicação usa-o com GROQ_BASE_URL=http://127.0.0.1:9100
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STYLES = ["Impressionismo", "Barroco", "Renascimento", "Cubismo", "Surrealismo", "Expressionismo"]
+EMOTIONS = ["melancolia", "esperança", "inquietação", "serenidade", "euforia", "nostalgia", "angústia"]
+
+class UsageBucket:
+    """Balde que se esvazia ao ritmo do limite por minuto, como os da Groq."""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.used = 0.0
+        self.updated = time.monotonic()
+
+    def take(self, amount: float):
+        now = time.monotonic()
+        self.used = max(0.0, self.used - (now - self.updated) * self.limit / 60) + amount
+        self.updated = now
+
+    def headers(self, kind: str) -> dict:
+        # O reset é o tempo até o balde voltar a estar cheio (formato "7.66s")
+        return {
+            f"x-ratelimit-limit-{kind}": str(int(self.limit)),
+            f"x-ratelimit-remaining-{kind}": str(int(max(0.0, self.limit - self.used))),
+            f"x-ratelimit-reset-{kind}": f"{self.used * 60 / self.limit:.3f}s",
+        }
+
+class FakeGroqConfig:
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        jitter_ms: float = 200.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.5,
+        requests_per_minute: int = 100_000,
+        tokens_per_minute: int = 100_000_000,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+def create_app(config: FakeGroqConfig) -> FastAPI:
+    app = FastAPI(title="Fake Groq")
+    requests_bucket = UsageBucket(config.requests_per_minute)
+    tokens_bucket = UsageBucket(config.tokens_per_minute)
+
+    def rate_limit_headers(tokens: int) -> dict:
+        requests_bucket.take(1)
+        tokens_bucket.take(tokens)
+        return {**requests_bucket.headers("requests"), **tokens_bucket.headers("tokens")}
+
+    def latency() -> float:
+        return max(0.0, random.gauss(config.latency_ms, config.jitter_ms)) / 1000
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        prompt, image_url = _read_messages(payload["messages"])
+        content = _fake_content(prompt, image_url, str(request.base_url).rstrip("/"))
+        usage = {"prompt_tokens": len(prompt) // 4 + (1000 if image_url else 0), "completion_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        headers = rate_limit_headers(usage["total_tokens"])
+
+        roll = random.random()
+        if roll < config.rate_limit_rate:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                status_code=429, headers={**headers, "retry-after": str(config.retry_after)}
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            await asyncio.sleep(latency() / 4)
+            return JSONResponse({"error": {"message": "Internal server error"}}, status_code=500, headers=headers)
+
+        if payload.get("stream"):
+            return StreamingResponse(
+                _stream(payload["model"], content, usage, latency()), media_type="text/event-stream", headers=headers
+            )
+
+        await asyncio.sleep(latency())
+        return JSONResponse({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "model": payload["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }, headers=headers)
+
+    @app.get("/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "fake"}]}
+
+    @app.api_route("/images/{name}", methods=["GET", "HEAD"])
+    async def image(name: str):
+        return Response(b"\xff\xd8\xff", media_type="image/jpeg")
+
+    return app
+
+def _read_messages(messages: list) -> tuple:
+    """Devolve o texto do prompt e o data URL da imagem (se existir)."""
+    prompt, image_url = "", None
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            prompt += content
+            continue
+        for part in content:
+            if part["type"] == "text":
+                prompt += part["text"]
+            elif part["type"] == "image_url":
+                image_url = part["image_url"]["url"]
+    return prompt, image_url
+
+def _fake_content(prompt: str, image_url: str, public_url: str) -> str:
+    # A mesma imagem é sempre "identificada" como a mesma obra
+    if image_url:
+        artwork_name = f"Obra da imagem {hashlib.sha1(image_url.encode()).hexdigest()[:12]}"
+    else:
+        match = re.search(r'por trás da obra "(.+?)"', prompt)
+        artwork_name = match.group(1) if match else "Obra desconhecida"
+
+    if "identificar a obra" in prompt:
+        return json.dumps({"artwork_name": artwork_name}, ensure_ascii=False)
+
+    seed = int(hashlib.sha1(artwork_name.encode()).hexdigest()[:8], 16)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", artwork_name)
+    return json.dumps({
+        "artwork_name": artwork_name,
+        "artist": f"Artista {seed % 97}",
+        "year": str(1500 + seed % 500),
+        "style": STYLES[seed % len(STYLES)],
+        "analysis": f"Análise sintética de {artwork_name}. " + "Contexto, técnica e intenção do artista. " * 40,
+        "emotions": [EMOTIONS[(seed + i) % len(EMOTIONS)] for i in range(4)],
+        "image_url": f"{public_url}/images/{slug}.jpg",
+    }, ensure_ascii=False)
+
+async def _stream(model: str, content: str, usage: dict, latency: float):
+    pieces = [content[i:i + 64] for i in range(0, len(content), 64)]
+    for piece in pieces:
+        await asyncio.sleep(latency / len(pieces))
+        chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": piece}}]}
+        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+    last = {"model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}}
+    yield f"data: {json.dumps(last)}\n\n"
+    yield "data: [DONE]\n\n"
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Latência média de cada resposta")
+    parser.add_argument("--jitter-ms", type=float, default=200.0, help="Desvio padrão da latência")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After (s) das respostas 429")
+    parser.add_argument("--rpm", type=int, default=100_000, help="Limite de pedidos por minuto anunciado")
+    parser.add_argument("--tpm", type=int, default=100_000_000, help="Limite de tokens por minuto anunciado")
+    args = parser.parse_args()
+
+    config = FakeGroqConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+# backend/benchmarks/load.py
+"""
+Teste de carga da API com a Groq simulada (benchmarks.fake_groq).
+
+Arranca o servidor falso da Groq e a aplicação (uvicorn, um processo) numa base
+de dados MongoDB própria, que é apagada no início. Depois, para cada cenário,
+mantém N clientes em ciclo fechado durante algum tempo, com uma mistura de
+pedidos em cache (obras/imagens já analisadas no aquecimento) e pedidos novos:
+
+    nome    POST /analise-por-nome
+    imagem  POST /analise-por-imagem (imagens geradas; as novas nunca se repetem)
+    lista   GET /analyses/?view=summary
+
+Regista débito, latências p50/p95/p99, códigos de resposta e memória (RSS) da
+aplicação num ficheiro JSON em benchmarks/results/. Com --compare, compara com
+um resultado anterior e termina com código 1 se houver regressões.
+
+É necessário um MongoDB local (ex.: docker compose up -d mongo).
+
+Uso (a partir da pasta backend/):
+    python -m benchmarks.load [--duration 20] [--concurrency 16] [--hit-ratio 0.8]
+                              [--groq-latency-ms 800] [--groq-error-rate 0.01] [--groq-429-rate 0.02]
+                              [--scenarios nome,imagem,lista] [--compare benchmarks/results/anterior.json]
+    python -m benchmarks.load --base-url http://localhost:8000   # aplicação já em execução
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+import httpx
+from PIL import Image
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+Request = Callable[[httpx.AsyncClient, bool], Awaitable[httpx.Response]]
+
+class Workload:
+    """Gera os pedidos de cada cenário: os "em cache" vêm do conjunto aquecido."""
+
+    def __init__(self, warm_size: int, image_size: int):
+        self.image_size = image_size
+        self.warm_names = [f"Obra de carga {i}" for i in range(warm_size)]
+        self.warm_images = [self.make_image(i) for i in range(warm_size)]
+
+    def make_image(self, seed: Optional[int] = None) -> bytes:
+        # Ruído aleatório: imagens diferentes nunca coincidem no hash perceptual
+        rng = random.Random(seed)
+        size = (self.image_size, self.image_size)
+        image = Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85)
+        return buffer.getvalue()
+
+    async def by_name(self, client: httpx.AsyncClient, cached: bool) -> httpx.Response:
+        name = random.choice(self.warm_names) if cached else f"Obra nova {uuid.uuid4().hex[:12]}"
+        return await client.post("/analise-por-nome", json={"artwork_name": name})
+
+    async def by_image(self, client: httpx.AsyncClient, cached: bool) -> httpx.Response:
+        data = random.choice(self.warm_images) if cached else self.make_image()
+        return await client.post("/analise-por-imagem", files={"file": ("obra.jpg", data, "image/jpeg")})
+
+    async def list_summary(self, client: httpx.AsyncClient, cached: bool) -> httpx.Response:
+        return await client.get("/analyses/", params={"limit": 20, "view": "summary"})
+
+    def scenarios(self) -> Dict[str, Request]:
+        return {"nome": self.by_name, "imagem": self.by_image, "lista": self.list_summary}
+
+    async def warm_up(self, client: httpx.AsyncClient, concurrency: int):
+        """Analisa o conjunto aquecido, para que os pedidos "em cache" o sejam de facto."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(request: Callable[[], Awaitable[httpx.Response]]):
+            async with semaphore:
+                response = await request()
+                if response.is_error:
+                    raise RuntimeError(f"Aquecimento falhou: {response.status_code} {response.text[:200]}")
+
+        await asyncio.gather(
+            *[send(lambda name=name: client.post("/analise-por-nome", json={"artwork_name": name}))
+              for name in self.warm_names],
+            *[send(lambda data=data: client.post("/analise-por-imagem", files={"file": ("obra.jpg", data, "image/jpeg")}))
+              for data in self.warm_images],
+        )
+
+def read_rss_mb(pid: Optional[int]) -> Optional[float]:
+    """Memória residente do processo (Linux); None se não for possível lê-la."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def summarize_latencies(samples: List[float]) -> Dict[str, float]:
+    if len(samples) < 2:
+        return {"mean": samples[0] if samples else 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": max(samples, default=0.0)}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "mean": round(statistics.fmean(samples), 2),
+        "p50": round(cuts[49], 2),
+        "p95": round(cuts[94], 2),
+        "p99": round(cuts[98], 2),
+        "max": round(max(samples), 2),
+    }
+
+async def run_scenario(
+    client: httpx.AsyncClient, request: Request, duration: float, concurrency: int,
+    hit_ratio: float, app_pid: Optional[int]
+) -> dict:
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    memory = [m for m in [read_rss_mb(app_pid)] if m is not None]
+    deadline = loop.time() + duration
+
+    async def worker():
+        while loop.time() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await request(client, random.random() < hit_ratio)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] += 1
+
+    async def sample_memory():
+        while True:
+            await asyncio.sleep(0.25)
+            rss = read_rss_mb(app_pid)
+            if rss is not None:
+                memory.append(rss)
+
+    sampler = asyncio.create_task(sample_memory())
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "throughput_rps": round(ok / elapsed, 2),
+        "latency_ms": summarize_latencies(latencies),
+        "status_codes": dict(statuses),
+        "memory_mb": {
+            "start": round(memory[0], 1), "peak": round(max(memory), 1), "end": round(memory[-1], 1)
+        } if memory else None,
+    }
+
+def compare(results: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Imprime a comparação e devolve as regressões acima de `max_regression` (fração)."""
+    regressions = []
+    print(f"\n📈 Comparação com {baseline.get('git_commit') or 'o resultado anterior'}")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        checks = [("débito", previous["throughput_rps"], current["throughput_rps"], False)]
+        checks += [
+            (key, previous["latency_ms"][key], current["latency_ms"][key], True) for key in ("p50", "p95", "p99")
+        ]
+        for metric, before, after, higher_is_worse in checks:
+            if not before:
+                continue
+            change = (after - before) / before
+            worse = change > max_regression if higher_is_worse else -change > max_regression
+            flag = "❌" if worse else "  "
+            print(f"{flag} {name:<8} {metric:<7} {before:10.2f} → {after:10.2f} ({change:+.1%})")
+            if worse:
+                regressions.append(f"{name} {metric} {change:+.1%}")
+    return regressions
+
+class Stack:
+    """Processos do servidor falso da Groq e da aplicação."""
+
+    def __init__(self, args):
+        self.args = args
+        self.processes: List[subprocess.Popen] = []
+        self.log = tempfile.NamedTemporaryFile(prefix="artell-bench-", suffix=".log", delete=False)
+        self.app: Optional[subprocess.Popen] = None
+
+    def start(self) -> str:
+        args = self.args
+        if not args.mongodb_db.endswith("_bench"):
+            raise SystemExit("A base de dados do benchmark é apagada no início: o nome tem de terminar em _bench.")
+        from pymongo import MongoClient
+        from pymongo.errors import PyMongoError
+        try:
+            MongoClient(args.mongodb_uri, serverSelectionTimeoutMS=5000).drop_database(args.mongodb_db)
+        except PyMongoError as e:
+            raise SystemExit(f"MongoDB indisponível em {args.mongodb_uri} (ex.: docker compose up -d mongo): {e}")
+
+        self._spawn([
+            "-m", "benchmarks.fake_groq", "--port", str(args.groq_port),
+            "--latency-ms", str(args.groq_latency_ms), "--jitter-ms", str(args.groq_jitter_ms),
+            "--error-rate", str(args.groq_error_rate), "--rate-limit-rate", str(args.groq_429_rate),
+        ], os.environ.copy())
+
+        env = {
+            **os.environ,
+            "GROQ_API_KEY": "bench",
+            "GROQ_IMAGE_API_KEY": "bench",
+            "GROQ_BASE_URL": f"http://127.0.0.1:{args.groq_port}",
+            "MONGODB_URI": args.mongodb_uri,
+            "MONGODB_DB_NAME": args.mongodb_db,
+            # O limitador local não deve ser o gargalo: os limites reais vêm dos cabeçalhos do servidor falso
+            "GROQ_RATE_LIMIT_REQUESTS_PER_MINUTE": "100000",
+            "GROQ_RATE_LIMIT_TOKENS_PER_MINUTE": "100000000",
+        }
+        self.app = self._spawn(
+            ["-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.app_port), "--log-level", "warning"],
+            env
+        )
+        return f"http://127.0.0.1:{args.app_port}"
+
+    def _spawn(self, argv: List[str], env: dict) -> subprocess.Popen:
+        process = subprocess.Popen(
+            [sys.executable, *argv], cwd=BACKEND_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT
+        )
+        self.processes.append(process)
+        return process
+
+    async def wait_ready(self, base_url: str, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            while time.monotonic() < deadline:
+                for process in self.processes:
+                    if process.poll() is not None:
+                        raise SystemExit(f"Um processo terminou no arranque; ver {self.log.name}")
+                try:
+                    if (await client.get("/health/ready")).status_code == 200:
+                        return
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise SystemExit(f"A aplicação não ficou pronta em {timeout:.0f}s; ver {self.log.name}")
+
+    def stop(self):
+        for process in reversed(self.processes):
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+async def run(args, base_url: str, app_pid: Optional[int]) -> dict:
+    workload = Workload(args.warm_size, args.image_size)
+    scenarios = workload.scenarios()
+    timeout = httpx.Timeout(120.0, connect=10.0)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    results = {
+        "started_at": datetime.utcnow().isoformat(),
+        "git_commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("compare", "output")},
+        "scenarios": {},
+    }
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        print(f"🔥 Aquecimento: {args.warm_size} obras e {args.warm_size} imagens")
+        await workload.warm_up(client, args.concurrency)
+        for name in args.scenarios.split(","):
+            print(f"🚀 Cenário {name}: {args.concurrency} clientes durante {args.duration:.0f}s")
+            result = await run_scenario(client, scenarios[name], args.duration, args.concurrency, args.hit_ratio, app_pid)
+            results["scenarios"][name] = result
+            latency = result["latency_ms"]
+            print(
+                f"   {result['throughput_rps']:8.1f} req/s   p50 {latency['p50']:8.1f} ms   p95 {latency['p95']:8.1f} ms   "
+                f"p99 {latency['p99']:8.1f} ms   erros {result['errors']}   {result['status_codes']}"
+            )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Usar uma aplicação já em execução (sem arrancar processos)")
+    parser.add_argument("--app-pid", type=int, help="PID da aplicação indicada em --base-url, para medir a memória")
+    parser.add_argument("--scenarios", default="nome,imagem,lista")
+    parser.add_argument("--duration", type=float, default=20.0, help="Segundos por cenário")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clientes em simultâneo")
+    parser.add_argument("--hit-ratio", type=float, default=0.8, help="Fração de pedidos já em cache")
+    parser.add_argument("--warm-size", type=int, default=50, help="Obras e imagens analisadas no aquecimento")
+    parser.add_argument("--image-size", type=int, default=512, help="Lado (px) das imagens geradas")
+    parser.add_argument("--groq-latency-ms", type=float, default=800.0)
+    parser.add_argument("--groq-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--groq-429-rate", type=float, default=0.0)
+    parser.add_argument("--groq-port", type=int, default=9100)
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--mongodb-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--mongodb-db", default="artell_bench", help="Apagada no início; tem de terminar em _bench")
+    parser.add_argument("--output", help="Ficheiro JSON dos resultados (por omissão em benchmarks/results/)")
+    parser.add_argument("--compare", help="Resultado anterior (JSON) com que comparar")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Variação tolerada antes de falhar")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(",")) - {"nome", "imagem", "lista"}
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(sorted(unknown))}")
+
+    stack = None
+    if args.base_url:
+        base_url, app_pid = args.base_url, args.app_pid
+    else:
+        stack = Stack(args)
+        base_url = stack.start()
+        app_pid = stack.app.pid
+    try:
+        if stack:
+            asyncio.run(stack.wait_ready(base_url))
+        results = asyncio.run(run(args, base_url, app_pid))
+    finally:
+        if stack:
+            stack.stop()
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{results['git_commit'] or 'local'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n💾 Resultados guardados em {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n❌ Regressões acima de {args.max_regression:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ Sem regressões.")
+
+if __name__ == "__main__":
+    main()
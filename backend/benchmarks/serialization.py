@@ -0,0 +1,162 @@
+# backend/benchmarks/serialization.py
+"""
+Compara o caminho antigo de serialização das análises (validação Pydantic em
+cada conversão + revalidação do response_model pelo FastAPI + json) com o
+caminho rápido (model_construct + model_response, serializado pelo pydantic-core).
+
+Os pedidos são feitos diretamente à aplicação ASGI, sem rede nem MongoDB.
+
+Uso (a partir da pasta backend/):
+    python -m benchmarks.serialization [--items 50] [--rounds 300]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import warnings
+from datetime import datetime
+from typing import Callable, List
+from bson import ObjectId
+from fastapi import FastAPI
+from app.core.responses import model_response
+from app.models.artwork_analysis import (
+    ArtworkAnalysisCreate, ArtworkAnalysisDB, ArtworkAnalysisResponse, ArtworkAnalysisSummary
+)
+
+def make_documents(count: int) -> List[dict]:
+    return [
+        {
+            "_id": ObjectId(),
+            "artwork_name": f"Obra de teste número {i}",
+            "artwork_name_key": f"obra de teste numero {i}",
+            "analysis": "Uma análise profunda da obra, explicando o contexto, a técnica e a intenção do artista. " * 12,
+            "artist": "Artista de Teste",
+            "year": "1889",
+            "style": "Pós-Impressionismo",
+            "emotions": ["melancolia", "esperança", "inquietação", "serenidade"],
+            "image_url": f"https://example.com/images/{i}.jpg",
+            "processing_time": 3.21,
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(count)
+    ]
+
+def convert_validated(doc: dict) -> ArtworkAnalysisResponse:
+    """Conversão antiga: o modelo é validado a partir do documento."""
+    return ArtworkAnalysisResponse(
+        id=str(doc["_id"]), artwork_name=doc["artwork_name"], analysis=doc["analysis"],
+        artist=doc.get("artist"), year=doc.get("year"), style=doc.get("style"),
+        emotions=doc.get("emotions", []), image_url=doc.get("image_url"),
+        processing_time=doc.get("processing_time", 0.0), cached=True
+    )
+
+def convert_constructed(doc: dict) -> ArtworkAnalysisResponse:
+    """Conversão atual (DatabaseService._convert_to_response): sem revalidar."""
+    return ArtworkAnalysisResponse.model_construct(
+        id=str(doc["_id"]), artwork_name=doc["artwork_name"], analysis=doc["analysis"],
+        artist=doc.get("artist"), year=doc.get("year"), style=doc.get("style"),
+        emotions=doc.get("emotions", []), image_url=doc.get("image_url"),
+        processing_time=doc.get("processing_time", 0.0), cached=True
+    )
+
+def summary_validated(doc: dict) -> ArtworkAnalysisSummary:
+    return ArtworkAnalysisSummary(
+        id=str(doc["_id"]), artwork_name=doc["artwork_name"], artist=doc.get("artist"), year=doc.get("year"),
+        style=doc.get("style"), emotions=doc.get("emotions", []), image_url=doc.get("image_url")
+    )
+
+def summary_constructed(doc: dict) -> ArtworkAnalysisSummary:
+    return ArtworkAnalysisSummary.model_construct(
+        id=str(doc["_id"]), artwork_name=doc["artwork_name"], artist=doc.get("artist"), year=doc.get("year"),
+        style=doc.get("style"), emotions=doc.get("emotions", []), image_url=doc.get("image_url")
+    )
+
+def build_app(docs: List[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/antes/full", response_model=List[ArtworkAnalysisResponse])
+    async def full_before():
+        return [convert_validated(doc) for doc in docs]
+
+    @app.get("/depois/full", response_model=List[ArtworkAnalysisResponse])
+    async def full_after():
+        return model_response([convert_constructed(doc) for doc in docs])
+
+    @app.get("/antes/summary", response_model=List[ArtworkAnalysisSummary])
+    async def summary_before():
+        return [summary_validated(doc) for doc in docs]
+
+    @app.get("/depois/summary", response_model=List[ArtworkAnalysisSummary])
+    async def summary_after():
+        return model_response([summary_constructed(doc) for doc in docs])
+
+    return app
+
+async def request(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "path": path, "raw_path": path.encode(),
+        "root_path": "", "scheme": "http", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 8000),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+async def measure(fn: Callable, rounds: int) -> List[float]:
+    await fn()  # aquecimento
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def report(name: str, before: List[float], after: List[float]):
+    b, a = statistics.median(before), statistics.median(after)
+    print(f"{name:<28} antes {b:8.3f} ms   depois {a:8.3f} ms   {b / a:5.1f}x")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="Análises por resposta (a galeria pede até 50)")
+    parser.add_argument("--rounds", type=int, default=300, help="Repetições por cenário (usa-se a mediana)")
+    args = parser.parse_args()
+
+    docs = make_documents(args.items)
+    app = build_app(docs)
+    print(f"📊 {args.items} análises por resposta, mediana de {args.rounds} repetições\n")
+
+    for view in ("full", "summary"):
+        before = await measure(lambda: request(app, f"/antes/{view}"), args.rounds)
+        after = await measure(lambda: request(app, f"/depois/{view}"), args.rounds)
+        report(f"GET lista ({view})", before, after)
+
+    payloads = [{k: v for k, v in doc.items() if k not in ("_id", "artwork_name_key", "created_at")} for doc in docs]
+
+    async def save_before():
+        # Código antigo de save_analysis: duas validações e .dict() (obsoleto no Pydantic 2)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for data in payloads:
+                create = ArtworkAnalysisCreate(**data)
+                ArtworkAnalysisDB(**create.dict(), artwork_name_key=create.artwork_name.lower()).dict()
+
+    async def save_after():
+        # DatabaseService._build_document: validação única diretamente no modelo do documento
+        for data in payloads:
+            ArtworkAnalysisDB(**data, artwork_name_key=data["artwork_name"].lower()).model_dump()
+
+    before = await measure(save_before, args.rounds)
+    after = await measure(save_after, args.rounds)
+    report("Construir documentos", before, after)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+# backend/gunicorn.conf.py
+"""
+Configuração do Gunicorn para produção: vários processos Uvicorn, reciclados ao
+fim de WORKER_MAX_REQUESTS pedidos e encerrados sem perder pedidos em curso.
+
+Uso (a partir da pasta backend/):
+    gunicorn -c gunicorn.conf.py main:app
+
+Os valores vêm do .env (app/core/config.py); as opções da linha de comando
+(ex.: -w 4, -b 0.0.0.0:9000) têm prioridade.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from app.core.config import settings
+
+bind = "0.0.0.0:8000"
+workers = settings.WEB_CONCURRENCY or multiprocessing.cpu_count()
+worker_class = "app.core.server.GracefulUvicornWorker"
+
+# Reciclagem: cada processo é substituído ao fim de N pedidos (com jitter, para que
+# não reiniciem todos ao mesmo tempo), o que também recarrega os índices em memória
+max_requests = settings.WORKER_MAX_REQUESTS
+max_requests_jitter = settings.WORKER_MAX_REQUESTS_JITTER
+
+# Depois de SHUTDOWN_READINESS_DELAY_SECONDS a responder 503 à prontidão, o Uvicorn espera
+# SHUTDOWN_DRAIN_SECONDS pelos pedidos e a aplicação outros tantos pelas análises em curso;
+# só depois disso o Gunicorn mata o processo
+graceful_timeout = int(settings.SHUTDOWN_READINESS_DELAY_SECONDS + 2 * settings.SHUTDOWN_DRAIN_SECONDS) + 10
+# Um processo cujo event loop fique bloqueado este tempo é reiniciado
+timeout = 60
+keepalive = 5
+
+# A aplicação é importada em cada processo, depois do fork: os clientes do MongoDB
+# (Motor) e os pools HTTP são criados no startup de cada processo, nunca partilhados
+preload_app = False
+
+if settings.METRICS_ENABLED:
+    # Tem de estar definido antes de o prometheus_client ser importado nos processos
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "artell-prometheus"))
+
+def on_starting(server):
+    # Os processos leem o número de processos com worker_processes() (para dividir os
+    # limites da Groq e desligar as caches locais): as settings já foram carregadas acima
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Métricas de uma execução anterior seriam somadas às novas
+        metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+
+def child_exit(server, worker):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Os gauges dos pedidos em curso deixam de contar o processo terminado
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
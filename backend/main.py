@@ -1,16 +1,28 @@
 # /backend/main.py
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
+from prometheus_client import CONTENT_TYPE_LATEST
 from dotenv import load_dotenv
+import asyncio
 import logging
 from app.routers.analyze import router as analyze_router
 from app.models.artwork_analysis import ArtworkAnalysisRequest, ArtworkAnalysisResponse
 from app.services.groq_service import get_groq_service, GroqService
 from app.services.database_service import get_database_service, DatabaseService
+from app.services.image_service import get_image_service
+from app.services.image_url_service import get_image_url_service
+from app.services.job_service import get_job_service
+from app.services.pipeline_service import get_pipeline_service
+from app.services.health_service import get_health_service, HealthService
 from app.core.config import settings
+from app.core.metrics import InFlightMiddleware, render_metrics
+from app.core.profiling import ServerTimingMiddleware
+from app.core.uploads import UploadSizeLimitMiddleware
 from app.routers.analyses import router as analyses_router
+from app.routers.jobs import router as jobs_router
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,7 +34,15 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="API para análise de obras de arte usando IA (Groq)",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # Respostas que não passam por model_response (dicionários simples) são serializadas com orjson
+    default_response_class=ORJSONResponse
+)
+
+# Adicionado antes do CORS para que as respostas 413 também levem os cabeçalhos CORS
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=settings.MAX_FILE_SIZE + 64 * 1024
 )
 
 app.add_middleware(
@@ -31,18 +51,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing"],
 )
 
+# Server-Timing (e perfis a pedido) nas rotas /analise-*
+app.add_middleware(ServerTimingMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(InFlightMiddleware)
+
 # Incluir os routers
 app.include_router(analyze_router, tags=["Analysis"])
 app.include_router(analyses_router, prefix="/analyses", tags=["Analyses"])
+app.include_router(jobs_router, prefix="/jobs", tags=["Jobs"])
 
 @app.on_event("startup")
 async def startup_event():
     try:
         logger.info("🚀 Iniciando aplicação Artell com Groq...")
         db_service = get_database_service()
-        await db_service.connect()
+        groq_service = get_groq_service()
+        image_service = get_image_service()
+        # Independentes entre si: arrancam em paralelo (os jobs precisam da base de dados)
+        await asyncio.gather(
+            db_service.connect(),
+            groq_service.start(),
+            image_service.start(),
+            get_image_url_service().start(),
+        )
+        job_service = get_job_service()
+        await job_service.start()
+        get_health_service().mark_started()
         logger.info("✅ Aplicação iniciada com sucesso!")
     except Exception as e:
         logger.error(f"❌ Erro ao iniciar aplicação: {e}")
@@ -52,8 +91,21 @@ async def startup_event():
 async def shutdown_event():
     try:
         logger.info("🔄 Encerrando aplicação...")
+        # Com o Gunicorn já foi marcado ao receber o sinal (ver app/core/server.py);
+        # aqui cobre o Uvicorn direto e a reciclagem ao fim de WORKER_MAX_REQUESTS
+        get_health_service().mark_stopping()
+        # As análises em curso (mesmo de clientes que já se desligaram) terminam e são guardadas
+        await get_pipeline_service().drain(settings.SHUTDOWN_DRAIN_SECONDS)
+        # Depois os jobs: os que estão a correr voltam à fila enquanto a base de dados ainda está ligada
+        job_service = get_job_service()
+        await job_service.close()
         db_service = get_database_service()
         await db_service.disconnect()
+        groq_service = get_groq_service()
+        await groq_service.close()
+        image_service = get_image_service()
+        await image_service.close()
+        await get_image_url_service().close()
         logger.info("✅ Aplicação encerrada com sucesso!")
     except Exception as e:
         logger.error(f"❌ Erro ao encerrar aplicação: {e}")
@@ -68,15 +120,35 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health_check(
-    db_service: DatabaseService = Depends(get_database_service)
+    health_service: HealthService = Depends(get_health_service)
 ):
+    database = await health_service.check_database()
     return {
         "status": "healthy",
         "service": "Artell API",
-        "database": "connected" if db_service.client else "disconnected"
+        "database": "connected" if database["status"] == "ok" else "disconnected"
     }
 
+@app.get("/health/live", tags=["Health"])
+async def liveness():
+    """O processo está vivo (o event loop responde). Não verifica dependências."""
+    return {"status": "alive"}
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness(
+    health_service: HealthService = Depends(get_health_service)
+):
+    """O processo terminou o arranque e a base de dados responde: pode receber tráfego."""
+    ready, report = await health_service.readiness()
+    return ORJSONResponse(report, status_code=200 if ready else 503)
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        # O CONTENT_TYPE_LATEST já inclui o charset (media_type voltaria a acrescentá-lo)
+        return Response(render_metrics(), headers={"Content-Type": CONTENT_TYPE_LATEST})
 
+# Desenvolvimento (um processo, com reload). Em produção: gunicorn -c gunicorn.conf.py main:app
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+
+import os
+
+# As settings são carregadas na importação: os testes nunca usam a API da Groq
+os.environ.setdefault("GROQ_API_KEY", "test-key")
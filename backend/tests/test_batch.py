@@ -0,0 +1,75 @@
+# backend/tests/test_batch.py
+
+import asyncio
+import pytest
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.utils import normalize_artwork_name
+from app.models.artwork_analysis import ArtworkAnalysisBatchRequest, ArtworkAnalysisResponse
+from app.services.pipeline_service import PipelineService
+
+class FakeDatabase:
+    def __init__(self):
+        self.saved = {}
+
+    async def get_analyses_by_name_keys(self, name_keys):
+        return {key: self.saved[key].model_copy(update={"cached": True}) for key in name_keys if key in self.saved}
+
+    async def get_analysis_by_name(self, artwork_name):
+        saved = self.saved.get(normalize_artwork_name(artwork_name))
+        return saved.model_copy(update={"cached": True}) if saved else None
+
+    async def save_analysis(self, analysis_data):
+        analysis = ArtworkAnalysisResponse(id=str(len(self.saved)), cached=False, **analysis_data)
+        self.saved[normalize_artwork_name(analysis.artwork_name)] = analysis
+        return analysis
+
+    def record_request(self, cached):
+        pass
+
+class FakeGroq:
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def analyze_artwork(self, artwork_name, on_delta=None):
+        self.calls.append(artwork_name)
+        await self.release.wait()
+        return {"artwork_name": artwork_name, "analysis": "...", "processing_time": 1.0}
+
+class FakeImageUrls:
+    async def find_valid_image_url(self, artwork_name, artist, image_url):
+        return None
+
+def _pipeline() -> PipelineService:
+    return PipelineService(FakeDatabase(), FakeGroq(), image_service=None, image_url_service=FakeImageUrls())
+
+async def test_repeated_names_are_created_once():
+    pipeline = _pipeline()
+    items = await pipeline.analyze_batch_by_name(["Mona Lisa", "mona lisa", " ", "Guernica"])
+
+    assert [item.status for item in items] == ["created", "cached", "invalid", "created"]
+    assert items[0].analysis.id == items[1].analysis.id
+    assert items[1].analysis.cached
+    assert pipeline.groq_service.calls == ["Mona Lisa", "Guernica"]
+
+async def test_batch_and_single_request_share_one_generation():
+    pipeline = _pipeline()
+    pipeline.groq_service.release.clear()
+
+    single = asyncio.create_task(pipeline.analyze_by_name("Mona Lisa"))
+    batch = asyncio.create_task(pipeline.analyze_batch_by_name(["MONA LISA"]))
+    await asyncio.sleep(0.01)
+    pipeline.groq_service.release.set()
+    analysis, items = await asyncio.gather(single, batch)
+
+    assert pipeline.groq_service.calls == ["Mona Lisa"]
+    assert items[0].analysis.id == analysis.id
+
+def test_batch_request_limits():
+    with pytest.raises(ValidationError):
+        ArtworkAnalysisBatchRequest(artwork_names=["x" * 201])
+    with pytest.raises(ValidationError):
+        ArtworkAnalysisBatchRequest(artwork_names=["Mona Lisa"] * (settings.BATCH_MAX_NAMES + 1))
+    assert ArtworkAnalysisBatchRequest(artwork_names=["x" * 200]).artwork_names == ["x" * 200]
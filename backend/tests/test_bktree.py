@@ -0,0 +1,81 @@
+# backend/tests/test_bktree.py
+
+import random
+from bson import ObjectId
+from app.core.bktree import BKTree
+from app.core.utils import hamming_distance
+from app.services.database_service import DatabaseService
+
+def test_radius_query_matches_linear_scan():
+    rng = random.Random(7)
+    values = {f"id{i}": rng.getrandbits(64) for i in range(300)}
+    tree = BKTree()
+    for item_id, value in values.items():
+        tree.add(value, item_id)
+
+    for _ in range(20):
+        query = rng.choice(list(values.values())) ^ (1 << rng.randrange(64))
+        for radius in (0, 3, 12):
+            expected = sorted(
+                (hamming_distance(query, value), item_id)
+                for item_id, value in values.items()
+                if hamming_distance(query, value) <= radius
+            )
+            assert tree.search(query, radius) == expected
+
+def test_identical_hashes_share_a_node_and_results_are_sorted():
+    tree = BKTree()
+    tree.add(0b1111, "a")
+    tree.add(0b1111, "b")
+    tree.add(0b1110, "c")
+    tree.add(0b0000, "d")
+
+    assert tree.search(0b1111, 1) == [(0, "a"), (0, "b"), (1, "c")]
+    assert tree.search(0b1111, 0) == [(0, "a"), (0, "b")]
+
+def test_remove_keeps_other_items_reachable():
+    tree = BKTree()
+    tree.add(0b0000, "root")
+    tree.add(0b0011, "child")
+    tree.add(0b0111, "grandchild")
+    tree.remove("root")
+
+    assert len(tree) == 2
+    assert tree.search(0b0111, 1) == [(0, "grandchild"), (1, "child")]
+    assert tree.search(0b0000, 0) == []
+
+def test_re_adding_an_item_moves_it():
+    tree = BKTree()
+    tree.add(0b0000, "a")
+    tree.add(0b1111, "a")
+
+    assert len(tree) == 1
+    assert tree.search(0b0000, 0) == []
+    assert tree.search(0b1111, 0) == [(0, "a")]
+
+class _FlakyStore:
+    """Armazenamento que falha nas leituras por ID, ou não encontra nada."""
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+
+    async def find_by_id(self, analysis_id):
+        if self.fail:
+            raise ConnectionError("MongoDB indisponível")
+        return None
+
+async def test_storage_error_does_not_evict_perceptual_hash():
+    service = DatabaseService(store=_FlakyStore(fail=True))
+    analysis_id = str(ObjectId())
+    service.perceptual_index.add(0xABCD, analysis_id)
+
+    assert await service.get_analysis_by_perceptual_hash(f"{0xABCD:016x}", 2) is None
+    assert len(service.perceptual_index) == 1
+
+async def test_missing_analysis_is_evicted():
+    service = DatabaseService(store=_FlakyStore(fail=False))
+    analysis_id = str(ObjectId())
+    service.perceptual_index.add(0xABCD, analysis_id)
+
+    assert await service.get_analysis_by_perceptual_hash(f"{0xABCD:016x}", 2) is None
+    assert len(service.perceptual_index) == 0
@@ -0,0 +1,32 @@
+# backend/tests/test_cursor.py
+
+import base64
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from app.core.utils import decode_cursor, encode_cursor
+from app.services.database_service import DatabaseService
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 13, 45, 12, 123456)
+    document_id = str(ObjectId())
+    cursor = encode_cursor(created_at, document_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, document_id)
+
+@pytest.mark.parametrize("cursor", [
+    "não-é-base64!",
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(b'{"t": "ontem", "id": "x"}').decode(),
+    base64.urlsafe_b64encode(b'{"id": "x"}').decode(),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+async def test_cursor_with_invalid_object_id_is_rejected_before_querying():
+    # Sem armazenamento: o cursor tem de ser rejeitado antes de qualquer consulta
+    service = DatabaseService(store=object())
+    with pytest.raises(ValueError):
+        await service.get_analyses(cursor=encode_cursor(datetime(2024, 1, 1), "nao-e-um-objectid"))
@@ -0,0 +1,36 @@
+# backend/tests/test_groq_parsing.py
+
+import pytest
+from app.services.groq_service import GroqService, parse_json_response
+
+def test_plain_json():
+    assert parse_json_response('{"artist": "Picasso"}') == {"artist": "Picasso"}
+
+def test_fenced_json_from_streaming():
+    text = '```json\n{"artwork_name": "Guernica", "artist": "Picasso"}\n```\n'
+    assert parse_json_response(text) == {"artwork_name": "Guernica", "artist": "Picasso"}
+
+def test_json_surrounded_by_prose():
+    text = 'Aqui está a análise:\n{"artist": "Picasso"}\nEspero que ajude.'
+    assert parse_json_response(text) == {"artist": "Picasso"}
+
+@pytest.mark.parametrize("text", ["Não sei responder.", "", "[1, 2]", "{incompleto"])
+def test_invalid_responses_raise(text):
+    with pytest.raises(ValueError):
+        parse_json_response(text)
+
+def test_unparseable_analysis_is_never_replaced_by_a_placeholder():
+    with pytest.raises(ValueError):
+        GroqService()._extract_analysis_data("A Guernica é uma obra de Picasso.", "Guernica", 1.0)
+
+@pytest.mark.parametrize("text", ['{"artist": "Picasso"}', '{"analysis": "   "}', '{"analysis": null}'])
+def test_missing_analysis_is_never_replaced_by_a_placeholder(text):
+    with pytest.raises(ValueError):
+        GroqService()._extract_analysis_data(text, "Guernica", 1.0)
+
+def test_analysis_is_extracted():
+    data = GroqService()._extract_analysis_data('{"analysis": " Uma obra. ", "year": 1937}', "Guernica", 1.0)
+
+    assert data["analysis"] == "Uma obra."
+    assert data["artwork_name"] == "Guernica"
+    assert data["year"] == "1937"
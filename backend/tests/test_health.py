@@ -0,0 +1,72 @@
+# backend/tests/test_health.py
+
+import asyncio
+import signal
+from types import SimpleNamespace
+from uvicorn import Config
+from app.core.config import settings
+from app.core.server import DrainingServer
+from app.services import health_service
+from app.services.health_service import HealthService
+
+class CountingProbe:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+
+def _service():
+    database, groq = CountingProbe(), CountingProbe()
+    service = HealthService(
+        db_service=SimpleNamespace(store=SimpleNamespace(ping=database)),
+        groq_service=SimpleNamespace(ping=groq),
+    )
+    return service, database
+
+async def test_readiness_results_are_cached():
+    service, database = _service()
+    service.mark_started()
+
+    assert (await service.readiness())[0]
+    assert (await service.readiness())[0]
+    assert database.calls == 1
+
+async def test_stopping_is_reported_before_the_cache():
+    service, database = _service()
+    service.mark_started()
+    await service.readiness()
+
+    service.mark_stopping()
+    ready, report = await service.readiness()
+    assert not ready
+    assert report["status"] == "stopping"
+    assert len(service.results) == 0
+    assert database.calls == 1
+
+async def test_exit_signal_marks_the_worker_as_stopping_before_closing(monkeypatch):
+    service, _ = _service()
+    service.mark_started()
+    monkeypatch.setattr(health_service, "get_health_service", lambda: service)
+    monkeypatch.setattr(settings, "SHUTDOWN_READINESS_DELAY_SECONDS", 0.05)
+    server = DrainingServer(Config(app=None))
+
+    server.handle_exit(signal.SIGTERM, None)
+    # O socket continua aberto, mas o balanceador já recebe 503
+    assert not (await service.readiness())[0]
+    assert not server.should_exit
+
+    await asyncio.sleep(0.1)
+    assert server.should_exit
+    assert not server.force_exit
+
+async def test_second_exit_signal_does_not_wait_for_the_delay(monkeypatch):
+    service, _ = _service()
+    monkeypatch.setattr(health_service, "get_health_service", lambda: service)
+    monkeypatch.setattr(settings, "SHUTDOWN_READINESS_DELAY_SECONDS", 30.0)
+    server = DrainingServer(Config(app=None))
+
+    server.handle_exit(signal.SIGINT, None)
+    server.handle_exit(signal.SIGINT, None)
+    assert server.should_exit
+    assert not server.force_exit
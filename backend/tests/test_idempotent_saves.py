@@ -0,0 +1,47 @@
+# backend/tests/test_idempotent_saves.py
+
+import asyncio
+import pytest
+from app.services.database_service import DatabaseService
+from app.storage import ListFilters
+from app.storage.sqlite import SQLiteAnalysisStore
+
+@pytest.fixture
+async def db_service(tmp_path):
+    service = DatabaseService(store=SQLiteAnalysisStore(str(tmp_path / "artell.db")))
+    await service.connect()
+    yield service
+    await service.disconnect()
+
+def _analysis(artwork_name: str) -> dict:
+    return {"artwork_name": artwork_name, "analysis": "...", "style": "Renascimento", "processing_time": 2.0}
+
+async def test_saving_the_same_artwork_twice_returns_the_first_analysis(db_service):
+    first = await db_service.save_analysis(_analysis("Mona Lisa"))
+    second = await db_service.save_analysis(_analysis("  MONA lisa "))
+
+    assert second.id == first.id
+    assert (first.cached, second.cached) == (False, True)
+    assert (await db_service.store.get_stats())["total"] == 1
+
+async def test_concurrent_saves_create_a_single_document(db_service):
+    results = await asyncio.gather(*(db_service.save_analysis(_analysis("Guernica")) for _ in range(5)))
+
+    assert len({result.id for result in results}) == 1
+    assert sum(not result.cached for result in results) == 1
+    assert await db_service.store.count(ListFilters()) == 1
+
+async def test_image_is_linked_to_an_existing_analysis_by_name(db_service):
+    by_name = await db_service.save_analysis(_analysis("O Grito"))
+    by_image = await db_service.save_analysis(_analysis("O Grito"), image_hash="a" * 64, perceptual_hash="00ff00ff00ff00ff")
+
+    assert by_image.id == by_name.id
+    db_service.response_cache.clear()
+    assert (await db_service.get_analysis_by_image_hash("a" * 64)).id == by_name.id
+    assert (await db_service.get_analysis_by_perceptual_hash("00ff00ff00ff00fe", 2)).id == by_name.id
+
+async def test_same_image_under_another_name_reuses_the_analysis(db_service):
+    first = await db_service.save_analysis(_analysis("Girassóis"), image_hash="b" * 64)
+    second = await db_service.save_analysis(_analysis("Os Girassóis"), image_hash="b" * 64)
+
+    assert second.id == first.id
@@ -0,0 +1,44 @@
+# backend/tests/test_image_service.py
+
+import asyncio
+import io
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PIL import Image
+from app.services.image_service import ImageService
+
+class _BrokenPool(Executor):
+    def __init__(self):
+        self.shutdowns = 0
+
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("um processo do pool terminou")
+
+    def shutdown(self, wait=True, **kwargs):
+        self.shutdowns += 1
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 16), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+async def test_concurrent_failures_replace_the_pool_once():
+    service = ImageService()
+    broken = service.pool = _BrokenPool()
+    started = []
+
+    async def start():
+        await asyncio.sleep(0.01)
+        service.pool = ThreadPoolExecutor(max_workers=2)
+        started.append(service.pool)
+
+    service.start = start
+    try:
+        results = await asyncio.gather(*(service.prepare(_png()) for _ in range(4)))
+    finally:
+        for pool in started:
+            pool.shutdown()
+
+    assert len(started) == 1
+    assert broken.shutdowns == 1
+    assert all(result.width == 32 for result in results)
@@ -0,0 +1,99 @@
+# backend/tests/test_image_url_service.py
+
+import ipaddress
+import httpx
+import pytest
+from app.services.image_url_service import ImageUrlService, UnsafeUrlError
+
+PUBLIC_HOSTS = {"images.example": "93.184.216.34", "cdn.example": "151.101.1.1"}
+
+def _service(handler) -> ImageUrlService:
+    service = ImageUrlService()
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=False)
+    requested = service.requested = []
+
+    async def resolve(host, port):
+        requested.append(host)
+        if host in PUBLIC_HOSTS:
+            return [PUBLIC_HOSTS[host]]
+        if host == "rebind.example":
+            return ["93.184.216.34", "10.0.0.5"]
+        # Endereços literais resolvem para eles próprios (como no getaddrinfo)
+        ipaddress.ip_address(host)
+        return [host]
+
+    service._resolve = resolve
+    return service
+
+def _image(request):
+    return httpx.Response(200, headers={"content-type": "image/jpeg"})
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/a.jpg",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.1.2.3/a.jpg",
+    "http://192.168.0.1/a.jpg",
+    "http://[::1]/a.jpg",
+    "http://[::ffff:127.0.0.1]/a.jpg",
+    "http://rebind.example/a.jpg",
+    "ftp://images.example/a.jpg",
+])
+async def test_internal_addresses_are_never_requested(url):
+    contacted = []
+    service = _service(lambda request: contacted.append(request) or _image(request))
+
+    with pytest.raises(UnsafeUrlError):
+        await service._check_public_url(httpx.URL(url))
+    assert await service._probe(url) is None
+    assert contacted == []
+
+async def test_redirect_to_internal_address_is_rejected():
+    def handler(request):
+        if request.headers["host"] == "images.example":
+            return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data/"})
+        return _image(request)
+
+    service = _service(handler)
+    assert await service._probe("https://images.example/a.jpg") is None
+    assert service.requested == ["images.example", "169.254.169.254"]
+
+async def test_public_redirects_are_followed_up_to_the_limit():
+    def handler(request):
+        if request.headers["host"] == "images.example":
+            return httpx.Response(301, headers={"location": "https://cdn.example/a.jpg"})
+        return _image(request)
+
+    assert await _service(handler)._probe("https://images.example/a.jpg") == "https://images.example/a.jpg"
+
+    loop = _service(lambda request: httpx.Response(302, headers={"location": str(request.url)}))
+    assert await loop._probe("https://images.example/a.jpg") is None
+
+async def test_only_connection_failures_mark_the_host_as_dead():
+    def handler(request):
+        if request.url.path == "/lento.jpg":
+            raise httpx.ReadTimeout("timeout", request=request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    service = _service(handler)
+    await service._probe("https://images.example/lento.jpg")
+    assert service.cache.get(("host", "images.example")) is None
+
+    await service._probe("https://cdn.example/a.jpg")
+    assert service.cache.get(("host", "cdn.example")) is False
+
+async def test_connection_goes_to_the_validated_address():
+    sent = []
+    service = _service(lambda request: sent.append(request) or _image(request))
+    resolve = service._resolve
+
+    async def rebinding_resolve(host, port):
+        # Um DNS malicioso responde com um endereço público só à primeira pergunta
+        addresses = await resolve(host, port)
+        return addresses if len(service.requested) == 1 else ["127.0.0.1"]
+
+    service._resolve = rebinding_resolve
+    assert await service._probe("https://images.example/a.jpg") == "https://images.example/a.jpg"
+
+    assert [request.url.host for request in sent] == ["93.184.216.34"]
+    assert sent[0].headers["host"] == "images.example"
+    assert sent[0].extensions["sni_hostname"] == "images.example"
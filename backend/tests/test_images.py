@@ -0,0 +1,40 @@
+# backend/tests/test_images.py
+
+import io
+import pytest
+from PIL import Image
+from app.core import images
+from app.core.images import InvalidImageError, prepare_image
+
+# Cabeçalho TIFF cujo primeiro IFD aponta para fora do bloco EXIF
+MALFORMED_EXIF = b"Exif\x00\x00II*\x00\xff\xff\xff\x7f\x01\x00\x12\x01\x03\x00"
+
+def _jpeg(**save_options) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 8), (200, 40, 40)).save(buffer, format="JPEG", **save_options)
+    return buffer.getvalue()
+
+def test_valid_image_is_prepared():
+    prepared = prepare_image(_jpeg(), max_edge=8, output_format="JPEG", quality=80)
+
+    assert prepared.mime_type == "image/jpeg"
+    assert max(prepared.width, prepared.height) == 8
+    assert prepared.perceptual_hash
+
+def test_malformed_exif_is_reported_as_invalid_image(monkeypatch):
+    original = images.ImageOps.exif_transpose
+
+    def strict_exif_transpose(image):
+        # Algumas versões do Pillow rejeitam este EXIF em vez de o ignorarem
+        if image.info.get("exif") == MALFORMED_EXIF:
+            raise SyntaxError("not a TIFF file")
+        return original(image)
+
+    monkeypatch.setattr(images.ImageOps, "exif_transpose", strict_exif_transpose)
+
+    with pytest.raises(InvalidImageError):
+        prepare_image(_jpeg(exif=MALFORMED_EXIF), max_edge=8, output_format="JPEG", quality=80)
+
+def test_garbage_bytes_are_reported_as_invalid_image():
+    with pytest.raises(InvalidImageError):
+        prepare_image(b"not an image", max_edge=8, output_format="JPEG", quality=80)
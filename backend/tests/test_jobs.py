@@ -0,0 +1,197 @@
+# backend/tests/test_jobs.py
+
+import asyncio
+import copy
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import httpx
+from bson import ObjectId
+from fastapi import FastAPI
+from app.core.config import settings
+from app.models.analysis_job import JobKind
+from app.models.artwork_analysis import ArtworkAnalysisResponse
+from app.routers.jobs import router
+from app.services.job_service import JobService, get_job_service
+
+def _matches(document, query):
+    for key, expected in query.items():
+        if key == "$or":
+            if not any(_matches(document, option) for option in expected):
+                return False
+        elif isinstance(expected, dict):
+            value = document.get(key)
+            if value is None or not value < expected["$lt"]:
+                return False
+        elif document.get(key) != expected:
+            return False
+    return True
+
+class FakeCollection:
+    """O suficiente de uma coleção do Motor para a fila de jobs."""
+
+    def __init__(self):
+        self.documents = []
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def insert_one(self, document):
+        document.setdefault("_id", ObjectId())
+        self.documents.append(copy.deepcopy(document))
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def find_one(self, query, projection=None):
+        for document in self.documents:
+            if _matches(document, query):
+                return copy.deepcopy(document)
+        return None
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=None):
+        candidates = sorted((d for d in self.documents if _matches(d, query)), key=lambda d: d["created_at"])
+        if not candidates:
+            return None
+        self._apply(candidates[0], update)
+        return copy.deepcopy(candidates[0])
+
+    async def update_one(self, query, update):
+        for document in self.documents:
+            if _matches(document, query):
+                self._apply(document, update)
+                return SimpleNamespace(modified_count=1)
+        return SimpleNamespace(modified_count=0)
+
+    def _apply(self, document, update):
+        document.update(update.get("$set", {}))
+        for key, amount in update.get("$inc", {}).items():
+            document[key] = document.get(key, 0) + amount
+        for key in update.get("$unset", {}):
+            document.pop(key, None)
+
+class FakePipeline:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def analyze_by_name(self, artwork_name):
+        self.calls.append(artwork_name)
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return ArtworkAnalysisResponse(id="a1", artwork_name=artwork_name, analysis="...", processing_time=1.0)
+
+def _service(collection=None, pipeline=None, backend="mongodb", worker_id="worker-1"):
+    collection = collection or FakeCollection()
+    db_service = SimpleNamespace(
+        store=SimpleNamespace(name=backend, db={"analysis_jobs": collection}),
+        get_analysis_by_id=lambda analysis_id: _analysis(analysis_id),
+    )
+    service = JobService(db_service, pipeline or FakePipeline())
+    service.worker_id = worker_id
+    return service
+
+async def _analysis(analysis_id):
+    return ArtworkAnalysisResponse(id=analysis_id, artwork_name="Guernica", analysis="...", processing_time=1.0)
+
+def _client(service):
+    app = FastAPI()
+    app.include_router(router, prefix="/jobs")
+    app.dependency_overrides[get_job_service] = lambda: service
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+async def test_claim_takes_a_lease_on_the_oldest_job():
+    service = _service()
+    first = await service.submit_by_name("Guernica")
+    await service.submit_by_name("Mona Lisa")
+
+    job = await service._claim(JobKind.TEXT)
+    assert str(job["_id"]) == first.id
+    assert job["status"] == "running"
+    assert job["attempts"] == 1
+    assert job["worker_id"] == "worker-1"
+    assert job["lease_expires_at"] > datetime.utcnow()
+
+    second = await service._claim(JobKind.TEXT)
+    assert second["artwork_name"] == "Mona Lisa"
+    # Os dois jobs estão reservados com prazos válidos: não há mais nada a fazer
+    assert await service._claim(JobKind.TEXT) is None
+
+async def test_heartbeat_renews_the_lease(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_LEASE_SECONDS", 0.06)
+    service = _service()
+    await service.submit_by_name("Guernica")
+    job = await service._claim(JobKind.TEXT)
+
+    heartbeat = asyncio.create_task(service._renew_lease(job["_id"]))
+    await asyncio.sleep(0.1)
+    heartbeat.cancel()
+
+    stored = await service.collection.find_one({"_id": job["_id"]})
+    assert stored["lease_expires_at"] > job["lease_expires_at"]
+
+async def test_expired_lease_is_claimed_by_another_worker():
+    collection = FakeCollection()
+    dead, alive = _service(collection, worker_id="dead"), _service(collection, worker_id="alive")
+    await dead.submit_by_name("Guernica")
+    job = await dead._claim(JobKind.TEXT)
+
+    assert await alive._claim(JobKind.TEXT) is None
+    collection.documents[0]["lease_expires_at"] = datetime.utcnow() - timedelta(seconds=1)
+
+    reclaimed = await alive._claim(JobKind.TEXT)
+    assert reclaimed["worker_id"] == "alive"
+    assert reclaimed["attempts"] == 2
+
+    # A instância antiga já não pode escrever no job que perdeu
+    await dead._complete(job, await _analysis("a1"))
+    assert collection.documents[0]["status"] == "running"
+
+async def test_failing_job_is_retried_then_marked_failed():
+    pipeline = FakePipeline(error=RuntimeError("Groq indisponível"))
+    service = _service(pipeline=pipeline)
+    await service.submit_by_name("Guernica")
+
+    while (job := await service._claim(JobKind.TEXT)) is not None:
+        await service._run(job)
+
+    stored = await service.collection.find_one({})
+    assert stored["status"] == "failed"
+    assert stored["attempts"] == settings.JOB_MAX_ATTEMPTS
+    assert stored["error"]
+    assert len(pipeline.calls) == settings.JOB_MAX_ATTEMPTS
+
+async def test_jobs_are_unavailable_with_sqlite():
+    async with _client(_service(backend="sqlite")) as client:
+        response = await client.get("/jobs/0123456789abcdef01234567")
+
+    assert response.status_code == 503
+
+async def test_long_poll_returns_when_the_job_finishes(monkeypatch):
+    # Um intervalo longo garante que a resposta vem do aviso do trabalhador e não da consulta periódica
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL_SECONDS", 30.0)
+    pipeline = FakePipeline()
+    pipeline.release.clear()
+    service = _service(pipeline=pipeline)
+    submitted = await service.submit_by_name("Guernica")
+    running = asyncio.create_task(service._run(await service._claim(JobKind.TEXT)))
+
+    async with _client(service) as client:
+        impatient = asyncio.create_task(client.get(f"/jobs/{submitted.id}", params={"wait": 0.05}))
+        patient = asyncio.create_task(client.get(f"/jobs/{submitted.id}", params={"wait": 20}))
+
+        # O primeiro pedido desiste sem tirar o aviso ao segundo
+        assert (await impatient).json()["status"] == "running"
+        pipeline.release.set()
+        response = await asyncio.wait_for(patient, timeout=2)
+
+    await running
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["result"]["id"] == "a1"
+    assert service._finished == {}
+
+async def test_unknown_job_is_not_found():
+    async with _client(_service()) as client:
+        assert (await client.get("/jobs/0123456789abcdef01234567")).status_code == 404
+        assert (await client.get("/jobs/not-an-id")).status_code == 404
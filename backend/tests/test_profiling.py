@@ -0,0 +1,22 @@
+# backend/tests/test_profiling.py
+
+import pytest
+from app.core.config import settings
+from app.core.profiling import PROFILE_HEADER, RequestProfiler
+
+def _scope(token: bytes) -> dict:
+    return {"type": "http", "headers": [(PROFILE_HEADER.lower().encode(), token)]}
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "segredo-çã")
+    monkeypatch.setattr(settings, "PROFILER_SAMPLE_RATE", 0.0)
+
+@pytest.mark.parametrize("token, expected", [
+    ("segredo-çã".encode(), True),
+    (b"segredo", False),
+    ("çççç".encode(), False),
+    (b"\xff\xfe", False),
+])
+def test_profile_header_is_compared_safely(token, expected):
+    assert RequestProfiler().should_profile(_scope(token)) is expected
@@ -0,0 +1,143 @@
+# backend/tests/test_rate_limit.py
+
+import json
+import httpx
+import pytest
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter, RateLimitExceeded, TokenBucket, parse_duration
+from app.services.groq_service import IMAGE_TOKEN_ESTIMATE, GroqService
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+@pytest.mark.parametrize("value, seconds", [
+    ("7.66s", 7.66), ("2m59.56s", 179.56), ("120ms", 0.12), ("1h", 3600.0), ("3", 3.0), (" 0.5 ", 0.5),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+@pytest.mark.parametrize("value", [None, "", "amanhã"])
+def test_parse_duration_rejects_unknown_values(value):
+    assert parse_duration(value) is None
+
+def test_bucket_refills_at_its_rate_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=10, per_second=2)
+    bucket.tokens = 0
+    assert bucket.wait_time(4) == 2.0
+
+    clock.now += 1.5
+    bucket.refill()
+    assert bucket.tokens == 3.0
+
+    clock.now += 100
+    assert bucket.wait_time(50) == 0.0
+    assert bucket.tokens == 10
+
+def test_bucket_learns_limits_from_headers(clock):
+    bucket = TokenBucket(capacity=30, per_second=0.5)
+    bucket.learn(limit=60, remaining=20, reset=10)
+    assert (bucket.capacity, bucket.tokens, bucket.per_second) == (60, 20, 4.0)
+
+async def test_block_for_delays_every_request(clock, monkeypatch):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000, max_wait=5)
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    limiter.block_for(3)
+    assert await limiter.acquire(100) == pytest.approx(3)
+    assert slept == [pytest.approx(3)]
+    assert limiter.throttled == 1
+
+    limiter.block_for(10)
+    with pytest.raises(RateLimitExceeded) as error:
+        await limiter.acquire(100)
+    assert error.value.retry_after == pytest.approx(10)
+
+def test_refund_returns_unused_tokens(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000, max_wait=5)
+    limiter.tokens.tokens = 1000
+    limiter.refund(800, 300)
+    assert limiter.tokens.tokens == 1500
+    limiter.refund(800, None)
+    limiter.refund(800, 900)
+    assert limiter.tokens.tokens == 1500
+
+def _sse(*events) -> bytes:
+    return b"".join(b"data: " + json.dumps(event).encode() + b"\n\n" for event in events) + b"data: [DONE]\n\n"
+
+def _service(body: bytes) -> GroqService:
+    service = GroqService()
+    service.client = httpx.AsyncClient(
+        base_url="https://groq.test",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)),
+    )
+    return service
+
+def _delta(text: str) -> dict:
+    return {"choices": [{"delta": {"content": text}}]}
+
+async def test_streaming_refunds_reserved_tokens_from_final_usage(clock):
+    service = _service(_sse(_delta('{"a"'), _delta(': 1}'), {"choices": [], "x_groq": {"usage": {"total_tokens": 150}}}))
+    payload = service._build_text_payload("prompt")
+    limiter = service._get_limiter(service.api_key_text, payload["model"])
+    before = limiter.tokens.tokens
+
+    assert await service._stream_groq_api(payload, lambda delta: None) == '{"a": 1}'
+    assert limiter.tokens.tokens == pytest.approx(before - 150)
+
+async def test_aborted_stream_still_refunds(clock):
+    service = _service(_sse(_delta("x" * 40), _delta("y" * 40), {"x_groq": {"usage": {"total_tokens": 5000}}}))
+    payload = service._build_text_payload("p" * 400)
+    limiter = service._get_limiter(service.api_key_text, payload["model"])
+    before = limiter.tokens.tokens
+
+    def on_delta(delta):
+        raise RuntimeError("cliente desligou-se")
+
+    with pytest.raises(Exception):
+        await service._stream_groq_api(payload, on_delta)
+    # Só ficam reservados o prompt (~100 tokens) e o texto recebido (~10 tokens), não os max_tokens
+    assert limiter.tokens.tokens == pytest.approx(before - service._estimate_tokens(payload) + payload["max_tokens"] - 10)
+
+async def test_retried_attempts_do_not_keep_their_reservation(clock, monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_BACKOFF_BASE_SECONDS", 0.0)
+    responses = iter([httpx.ConnectError("recusada"), httpx.Response(503), httpx.Response(200, json={})])
+
+    def handler(request):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    service = GroqService()
+    service.client = httpx.AsyncClient(base_url="https://groq.test", transport=httpx.MockTransport(handler))
+    payload = service._build_text_payload("prompt")
+    limiter = service._get_limiter(service.api_key_text, payload["model"])
+    before = limiter.tokens.tokens
+
+    response, _, estimated_tokens = await service._send(payload, is_vision=False)
+    assert response.status_code == 200
+    # Três tentativas, mas só a que teve êxito continua reservada
+    assert limiter.tokens.tokens == pytest.approx(before - estimated_tokens)
+
+def test_vision_estimate_counts_the_image():
+    service = GroqService()
+    text = service._estimate_tokens(service._build_text_payload("prompt"))
+    vision = service._estimate_tokens(service._build_vision_payload("prompt", "QUJD" * 1000, "image/jpeg"))
+
+    assert vision - text >= IMAGE_TOKEN_ESTIMATE
@@ -0,0 +1,68 @@
+# backend/tests/test_search_index.py
+
+from app.core import search_index
+from app.core.search_index import SearchIndex, tokenize
+
+def _index() -> SearchIndex:
+    index = SearchIndex()
+    index.add("1", "A Noite Estrelada", "Vincent van Gogh", "Pós-Impressionismo")
+    index.add("2", "Os Girassóis", "Vincent van Gogh", "Pós-Impressionismo")
+    index.add("3", "Guernica", "Pablo Picasso", "Cubismo")
+    index.add("4", "Les Demoiselles d'Avignon", "Pablo Picasso", "Cubismo")
+    return index
+
+def test_tokenize_removes_accents_and_case():
+    assert tokenize("Pós-Impressionismo Ã") == ["pos", "impressionismo", "a"]
+
+def test_prefix_search_requires_every_word():
+    index = _index()
+    ids, total, is_estimate = index.search("pic cub")
+    assert sorted(ids) == ["3", "4"]
+    assert (total, is_estimate) == (2, False)
+    assert index.search("pic gogh") == ([], 0, False)
+
+def test_artwork_name_and_exact_matches_rank_higher():
+    index = _index()
+    index.add("5", "Retrato", "Guernicano", None)
+    ids, _, _ = index.search("guernica")
+    assert ids == ["3", "5"]
+
+def test_ties_prefer_most_recent_and_offset_pages():
+    index = _index()
+    assert index.search("gogh")[0] == ["2", "1"]
+    assert index.search("gogh", limit=1, offset=1)[0] == ["1"]
+
+def test_removed_entries_and_words_disappear():
+    index = _index()
+    index.remove("3")
+    assert index.search("guernica") == ([], 0, False)
+    assert index.search("picasso")[0] == ["4"]
+    assert len(index) == 3
+
+def test_candidate_cap_marks_total_as_estimate(monkeypatch):
+    monkeypatch.setattr(search_index, "MAX_CANDIDATES", 5)
+    index = SearchIndex()
+    for i in range(8):
+        index.add(str(i), f"Estudo {i}", "Monet", None)
+
+    ids, total, is_estimate = index.search("monet", limit=10)
+    # Só os 5 mais recentes são avaliados
+    assert ids == ["7", "6", "5", "4", "3"]
+    assert (total, is_estimate) == (5, True)
+    # Uma palavra rara gera os candidatos: a contagem volta a ser exata
+    assert index.search("estudo 1") == (["1"], 1, False)
+
+def test_prefix_expansion_cap_marks_total_as_estimate(monkeypatch):
+    monkeypatch.setattr(search_index, "MAX_PREFIX_EXPANSIONS", 2)
+    index = SearchIndex()
+    for i, word in enumerate(["casa", "casal", "casamento"]):
+        index.add(str(i), word)
+
+    _, total, is_estimate = index.search("cas")
+    assert (total, is_estimate) == (2, True)
+    assert index.search("casam") == (["2"], 1, False)
+
+def test_suggest_returns_distinct_names():
+    index = _index()
+    index.add("5", "a noite estrelada", "Outro", None)
+    assert index.suggest("noite") == ["a noite estrelada"]
@@ -0,0 +1,64 @@
+# backend/tests/test_singleflight.py
+
+import asyncio
+import pytest
+from app.core.singleflight import SingleFlight
+
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "resultado"
+
+    results = await asyncio.gather(*(flights.do("chave", work) for _ in range(5)))
+    assert results == ["resultado"] * 5
+    assert calls == 1
+    assert not flights.in_flight("chave")
+
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flights = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(flights.do("chave", work))
+    second = asyncio.create_task(flights.do("chave", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    assert flights.in_flight("chave")
+    release.set()
+    assert await second == 42
+
+async def test_work_finishes_after_every_caller_gives_up():
+    flights = SingleFlight("test")
+    finished = asyncio.Event()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        finished.set()
+
+    caller = asyncio.create_task(flights.do("chave", work))
+    await asyncio.sleep(0)
+    caller.cancel()
+    assert await flights.drain(1.0) == 0
+    assert finished.is_set()
+
+async def test_exception_is_shared_and_key_is_released():
+    flights = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("falhou")
+
+    results = await asyncio.gather(flights.do("chave", fail), flights.do("chave", fail), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not flights.in_flight("chave")
@@ -0,0 +1,47 @@
+# backend/tests/test_sqlite_store.py
+
+import sqlite3
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from app.core.config import settings
+from app.storage.sqlite import SQLiteAnalysisStore
+
+class BusyConnection:
+    """Ligação de leitura que encontra a base ocupada (ex.: checkpoint do WAL de outro processo)."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def execute(self, *args):
+        self.calls += 1
+        error = sqlite3.OperationalError("database is locked")
+        error.sqlite_errorcode = sqlite3.SQLITE_BUSY
+        raise error
+
+@pytest.fixture
+async def store(tmp_path):
+    store = SQLiteAnalysisStore(str(tmp_path / "artell.db"))
+    await store.connect()
+    await store.create_indexes()
+    yield store
+    await store.close()
+
+async def test_reads_on_the_event_loop_give_up_quickly(store):
+    (reader_timeout,) = store._reader.execute("PRAGMA busy_timeout").fetchone()
+    (scanner_timeout,) = store._scanner.execute("PRAGMA busy_timeout").fetchone()
+
+    assert reader_timeout == int(settings.SQLITE_READ_BUSY_TIMEOUT_SECONDS * 1000)
+    assert scanner_timeout == int(settings.SQLITE_BUSY_TIMEOUT_SECONDS * 1000)
+
+async def test_busy_read_is_retried_off_the_event_loop(store, monkeypatch):
+    analysis_id = ObjectId()
+    await store.insert_unique({
+        "_id": analysis_id, "artwork_name": "Guernica", "artwork_name_key": "guernica", "created_at": datetime.utcnow()
+    })
+    busy = BusyConnection()
+    monkeypatch.setattr(store, "_reader", busy)
+
+    assert (await store.find_by_id(analysis_id))["artwork_name"] == "Guernica"
+    assert [doc["_id"] for doc in await store.find_by_name_keys(["guernica"])] == [analysis_id]
+    assert busy.calls == 2
@@ -0,0 +1,54 @@
+# backend/tests/test_stats.py
+
+from app.core.stats import (
+    apply_increments, merge_increments, processing_time_bucket, stats_increments, summarize_stats
+)
+
+def _doc(style: str, processing_time: float, emotions=("calma",)) -> dict:
+    return {"style": style, "artist": "Monet", "processing_time": processing_time, "emotions": list(emotions)}
+
+def _materialize(*docs) -> dict:
+    increments = {}
+    for doc in docs:
+        merge_increments(increments, stats_increments(doc))
+    return apply_increments({}, increments)
+
+def test_processing_time_bucket_boundaries():
+    assert processing_time_bucket(0.1) == 0
+    assert processing_time_bucket(0.25) == 0
+    assert processing_time_bucket(0.3) == 1
+    assert processing_time_bucket(1000) == 13
+
+def test_percentiles_interpolate_within_buckets():
+    stats = summarize_stats(_materialize(
+        _doc("Impressionismo", 0.1), _doc("Impressionismo", 0.3), _doc("Barroco", 0.3), _doc("Barroco", 1.5)
+    ))
+    timing = stats["processing_time"]
+    assert timing["avg"] == 0.55
+    assert timing["p50"] == 0.375
+    assert timing["p99"] == 1.96
+
+def test_removal_reverts_the_increments():
+    kept, removed = _doc("Impressionismo", 2.0), _doc("Cubismo", 5.0, ("tensão", "medo"))
+    doc = _materialize(kept, removed)
+    apply_increments(doc, stats_increments(removed, direction=-1))
+
+    assert doc["total"] == 1
+    assert doc["styles"] == {"impressionismo": 1, "cubismo": 0}
+    assert doc["emotions"] == {"calma": 1, "tensao": 0, "medo": 0}
+    assert doc["processing_time"]["sum"] == 2.0
+    assert doc["processing_time"]["count"] == 1
+    summary = summarize_stats(doc)
+    assert summary["total_analyses"] == 1
+    assert summary["by_style"] == [{"name": "impressionismo", "count": 1}]
+
+def test_keys_with_dots_are_escaped_and_restored():
+    increments = stats_increments(_doc("Arte.Nova", 1.0))
+    assert "styles.arte．nova" in increments
+    assert summarize_stats(apply_increments({}, increments))["by_style"] == [{"name": "arte.nova", "count": 1}]
+
+def test_empty_stats():
+    summary = summarize_stats(None)
+    assert summary["total_analyses"] == 0
+    assert summary["processing_time"] == {"avg": None, "p50": None, "p90": None, "p99": None}
+    assert summary["requests"]["cache_hit_ratio"] == 0.0
@@ -0,0 +1,21 @@
+# backend/tests/test_uploads.py
+
+import hashlib
+import io
+import pytest
+from fastapi import UploadFile
+from app.core.uploads import UploadTooLargeError, read_upload
+
+async def test_hash_matches_content_read_in_chunks():
+    data = bytes(range(256)) * 1000
+    content, digest = await read_upload(UploadFile(io.BytesIO(data)), max_size=len(data), chunk_size=4096)
+
+    assert content == data
+    assert digest == hashlib.sha256(data).hexdigest()
+
+async def test_oversized_upload_is_rejected_before_reading_everything():
+    stream = io.BytesIO(b"x" * 100_000)
+    with pytest.raises(UploadTooLargeError):
+        await read_upload(UploadFile(stream), max_size=10_000, chunk_size=4096)
+
+    assert stream.tell() < 20_000
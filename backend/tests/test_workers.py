@@ -0,0 +1,80 @@
+# backend/tests/test_workers.py
+
+import os
+import runpy
+from types import SimpleNamespace
+import pytest
+from app.core.config import settings
+from app.services.database_service import DatabaseService
+from app.services.groq_service import GroqService
+from app.storage.sqlite import SQLiteAnalysisStore
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_gunicorn_workers_split_the_groq_limits(monkeypatch, tmp_path):
+    # As settings já estão carregadas (como no processo principal do Gunicorn)
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path / "metrics"))
+    # Vazio e não removido: o monkeypatch só repõe as variáveis que ele próprio alterou,
+    # e o on_starting escreve WEB_CONCURRENCY diretamente em os.environ
+    monkeypatch.setenv("WEB_CONCURRENCY", "")
+    config = runpy.run_path(os.path.join(BACKEND_DIR, "gunicorn.conf.py"))
+    config["on_starting"](SimpleNamespace(cfg=SimpleNamespace(workers=3)))
+
+    limiter = GroqService()._get_limiter("chave", "modelo")
+    assert limiter.requests.capacity == pytest.approx(settings.GROQ_RATE_LIMIT_REQUESTS_PER_MINUTE / 3)
+    assert limiter.tokens.capacity == pytest.approx(settings.GROQ_RATE_LIMIT_TOKENS_PER_MINUTE / 3)
+
+    # Os cabeçalhos da Groq descrevem a chave inteira: o processo continua só com a sua parte
+    limiter.learn({
+        "x-ratelimit-limit-tokens": "60000", "x-ratelimit-remaining-tokens": "30000", "x-ratelimit-reset-tokens": "30s",
+    })
+    assert limiter.tokens.capacity == pytest.approx(20000)
+    assert limiter.tokens.tokens <= 10000
+    assert limiter.tokens.per_second == pytest.approx(1000 / 3)
+
+def test_single_process_keeps_the_full_budget(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", None)
+    limiter = GroqService()._get_limiter("chave", "modelo")
+    assert limiter.requests.capacity == settings.GROQ_RATE_LIMIT_REQUESTS_PER_MINUTE
+
+def _analysis(artwork_name: str, perceptual_hash: str) -> dict:
+    return {"artwork_name": artwork_name, "analysis": "...", "processing_time": 1.0, "perceptual_hash": perceptual_hash}
+
+@pytest.fixture
+async def workers(monkeypatch, tmp_path):
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    path = str(tmp_path / "artell.db")
+    services = [DatabaseService(store=SQLiteAnalysisStore(path)) for _ in range(2)]
+    for service in services:
+        await service.connect()
+    yield services
+    for service in services:
+        await service.disconnect()
+
+async def test_saves_reach_the_other_workers_indexes(workers):
+    worker_a, worker_b = workers
+    assert worker_b.response_cache.maxsize == 0
+
+    saved = await worker_a.save_analysis(_analysis("Mona Lisa", "0f0f0f0f0f0f0f0f"))
+    assert (await worker_b.search_analyses("mona"))[0] == []
+
+    assert await worker_b.sync_memory_indexes() == 1
+    results, _, _ = await worker_b.search_analyses("mona")
+    assert [result.id for result in results] == [saved.id]
+    assert (await worker_b.get_analysis_by_perceptual_hash("0f0f0f0f0f0f0f0e", 2)).id == saved.id
+    # Uma nova sincronização não repete as análises já indexadas
+    assert await worker_b.sync_memory_indexes() == 0
+
+async def test_deletes_are_not_served_by_the_other_workers(workers):
+    worker_a, worker_b = workers
+    saved = await worker_a.save_analysis(_analysis("Guernica", "00000000ffffffff"))
+    await worker_b.sync_memory_indexes()
+    assert (await worker_b.get_analysis_by_id(saved.id)).id == saved.id
+
+    assert await worker_a.delete_analysis(saved.id)
+    assert await worker_b.get_analysis_by_id(saved.id) is None
+    assert await worker_b.get_analysis_by_perceptual_hash("00000000ffffffff", 0) is None
+    assert (await worker_b.search_analyses("guernica"))[0] == []
+    assert saved.id not in worker_b.search_index
+    assert len(worker_b.perceptual_index) == 0
@@ -10,6 +10,7 @@ export interface Analysis {
   year: string | null;
   style: string | null;
   emotions: string[];
+  image_url?: string | null;
   created_at?: string; // Adicionado para consistência, se o backend o enviar
 }
 
@@ -29,8 +30,8 @@ export const useGallery = (): UseGalleryReturn => {
     setIsLoading(true);
     setError(null);
     try {
-      // Chamada ao endpoint GET /analyses que já existe no seu backend
-      const response = await fetch('http://localhost:8001/analyses/?page=1&limit=50');
+      // Chamada ao endpoint GET /analyses na vista resumida (sem o texto longo da análise)
+      const response = await fetch('http://localhost:8001/analyses/?page=1&limit=50&view=summary');
 
       if (!response.ok) {
         throw new Error('Não foi possível carregar as análises da galeria.');